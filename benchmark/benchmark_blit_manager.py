@@ -0,0 +1,63 @@
+"""ビューアと同じレイアウト(スティックピクチャ + 3つのグラフ)での再生時のフレームレートのベンチマーク (Aggバックエンド)
+
+python -m benchmark.benchmark_blit_manager
+"""
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from src.model.skeleton_data import MotionData, MultiPlotGraphData
+from src.presenter.blit_manager import BlitManager
+from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.presenter.graph_data_drawer import GraphDataDrawer, MultiPlotGraphDataDrawer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+N_FRAMES = 100
+
+
+def frames_per_second(motion_data: MotionData, blit: bool) -> float:
+    fig = plt.figure(figsize=(10, 5))
+    coordinate_drawer = CoordinateDataDrawer(ax=fig.add_subplot(121, projection='3d'),
+                                             coordinate_data=motion_data.coordinate_data)
+    coordinate_drawer.draw_local_pos_at_initial_frame()
+    graph_drawers = []
+    for i, (graph_data, position) in enumerate(zip(motion_data.graph_data_list, [322, 324, 326])):
+        ax = fig.add_subplot(position)
+        if isinstance(graph_data, MultiPlotGraphData):
+            graph_drawers.append(MultiPlotGraphDataDrawer(ax=ax, multi_graph_data=graph_data, blit=False))
+        else:
+            graph_drawers.append(GraphDataDrawer(ax=ax, graph_data=graph_data, line_color=["r", "g", "b"][i],
+                                                 blit=False))
+    animated_artists = list(coordinate_drawer.animated_artists)
+    for drawer in graph_drawers:
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+        animated_artists.extend(drawer.animated_artists)
+    blit_manager = BlitManager(fig.canvas, animated_artists=animated_artists, enabled=blit)
+    fig.canvas.draw()
+
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        coordinate_drawer.draw_local_pos_at_specific_frame(frame=frame)
+        for drawer in graph_drawers:
+            drawer.draw_graph_data_at_specific_frame(frame=frame)
+        # blitしない場合はdraw_idleによりキャンバス全体を描画する(Aggではその場で描画される)
+        blit_manager.update()
+    elapsed = time.perf_counter() - start
+    plt.close(fig)
+    return N_FRAMES / elapsed
+
+
+def main():
+    motion_data = LoadBvhUsecase().load(FILE_NAME)
+    full_redraw_fps = frames_per_second(motion_data, blit=False)
+    blit_fps = frames_per_second(motion_data, blit=True)
+    print(f"full canvas redraw: {full_redraw_fps:8.1f} fps")
+    print(f"blit              : {blit_fps:8.1f} fps ({blit_fps / full_redraw_fps:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
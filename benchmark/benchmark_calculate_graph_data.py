@@ -0,0 +1,59 @@
+"""グラフデータの計算のベンチマーク
+
+python -m benchmark.benchmark_calculate_graph_data
+
+全ての関節の組 (親関節, 子関節, 親の親関節) の角度を、従来のフレームごとの内積とarccosで1組ずつ計算する場合と、
+batch_joint_anglesでまとめて計算する場合を比較する。
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmark.synthetic_bvh import make_long_bvh, read_test_bvh
+from src.service.calculate_graph_data import CalculateGraphData
+from src.service.graph_metrics import batch_joint_angles
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+REPEAT = 50  # 369 * 50 フレーム
+
+
+def legacy_angle(positions: np.ndarray, origin: int, a: int, b: int) -> np.ndarray:
+    vec_a = positions[:, a].astype(np.float64) - positions[:, origin]
+    vec_b = positions[:, b].astype(np.float64) - positions[:, origin]
+    inner = np.array([np.dot(vec_a_i, vec_b_i) for vec_a_i, vec_b_i in zip(vec_a, vec_b)])
+    norm_dot = np.linalg.norm(vec_a, axis=1) * np.linalg.norm(vec_b, axis=1)
+    norm_dot = [data if data != 0 else 1 for data in norm_dot]
+    return np.rad2deg(np.arccos(inner / norm_dot))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, "long.bvh")
+        with open(file_name, "w") as f:
+            f.write(make_long_bvh(read_test_bvh(), REPEAT))
+        coordinate_data = LoadBvhUsecase().load(file_name).coordinate_data
+    parents = coordinate_data.parent_indices
+    triplets = np.array([[parent, child, parents[parent]] for child, parent in enumerate(parents)
+                         if parent >= 0 and parents[parent] >= 0], dtype=np.int64)
+
+    start = time.perf_counter()
+    for origin, a, b in triplets:
+        legacy_angle(coordinate_data.local_pos, origin, a, b)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_joint_angles(coordinate_data.local_pos, triplets)
+    batch = time.perf_counter() - start
+    print(f"{len(triplets)} joint angles x {coordinate_data.n_frames} frames")
+    print(f"per-frame dot + arccos : {legacy * 1000:8.1f} ms")
+    print(f"batch einsum + atan2   : {batch * 1000:8.1f} ms ({legacy / batch:.0f}x)")
+
+    start = time.perf_counter()
+    CalculateGraphData.calculate_default_graph_data(coordinate_data)
+    print(f"default graph data     : {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""順運動学 (CoordinateDataConverter) のベンチマーク
+
+python -m benchmark.benchmark_coordinate_data_converter
+"""
+import time
+
+from benchmark.synthetic_bvh import read_test_bvh, make_synthetic_bvh
+from src.interface.bvh_reader import BvhReader
+from src.model.skeleton_data import SkeletonData
+from src.service.coordinate_data_converter import CoordinateDataConverter
+
+
+def skeleton_data_from_text(text: str) -> SkeletonData:
+    return BvhReader(data=text).create_skeleton_data()
+
+
+def frames_per_second(skeleton_data: SkeletonData, engine: str) -> float:
+    converter = CoordinateDataConverter(engine=engine)
+    start = time.perf_counter()
+    converter.convert_to_coordinate_data(skeleton_data=skeleton_data)
+    return len(skeleton_data.joints_rotations) / (time.perf_counter() - start)
+
+
+def main():
+    cases = [
+        ("test BVH (27 joints)", read_test_bvh(), read_test_bvh()),
+        ("synthetic (120 joints)", make_synthetic_bvh(120, 2000), make_synthetic_bvh(120, 50)),
+    ]
+    for name, text, short_text in cases:
+        vectorized = frames_per_second(skeleton_data_from_text(text), "vectorized")
+        # 従来の実装は遅いので短いクリップで計測する
+        loop = frames_per_second(skeleton_data_from_text(short_text), "loop")
+        print(f"{name:<24} loop: {loop:10.1f} frames/s  vectorized: {vectorized:10.1f} frames/s  "
+              f"speedup: {vectorized / loop:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
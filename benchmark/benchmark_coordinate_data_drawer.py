@@ -0,0 +1,77 @@
+"""スティックピクチャー描画のフレームレートのベンチマーク (Aggバックエンド)
+
+python -m benchmark.benchmark_coordinate_data_drawer
+"""
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from src.model.skeleton_data import CoordinateData
+from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+N_FRAMES = 200
+
+
+class LegacyCoordinateDataDrawer(CoordinateDataDrawer):
+    """従来の実装: 骨ごとに1つのLine3Dを作り、フレームごとに関節名で位置を参照して更新する"""
+
+    def draw_local_pos_at_initial_frame(self):
+        self.lines_dict = {}
+        local_pos = self.coordinate_data.local_pos_list[0]
+        for joint_name in self.coordinate_data.joint_names[1:]:
+            parent_joint = self.coordinate_data.joints_hierarchy[joint_name][0]
+            if parent_joint == "root": continue
+            self.lines_dict[joint_name] = self.ax.plot(xs=[local_pos[parent_joint][0], local_pos[joint_name][0]],
+                                                       zs=[local_pos[parent_joint][1], local_pos[joint_name][1]],
+                                                       ys=[local_pos[parent_joint][2], local_pos[joint_name][2]],
+                                                       c='red', lw=2.5)
+        self.ax.set_xlim(self.local_pos_min[0], self.local_pos_max[0])
+        self.ax.set_ylim(self.local_pos_min[2], self.local_pos_max[2])
+        self.ax.set_zlim(self.local_pos_min[1], self.local_pos_max[1])
+
+    def draw_local_pos_at_specific_frame(self, frame: int):
+        local_pos = self.coordinate_data.local_pos_list[frame]
+        for joint_name, lines in self.lines_dict.items():
+            parent_joint = self.coordinate_data.joints_hierarchy[joint_name][0]
+            lines[0].set_data_3d([local_pos[parent_joint][0], local_pos[joint_name][0]],
+                                 [local_pos[parent_joint][2], local_pos[joint_name][2]],
+                                 [local_pos[parent_joint][1], local_pos[joint_name][1]])
+        self.ax.set_title('frame: ' + str(frame))
+
+
+def frames_per_second(drawer_class, coordinate_data: CoordinateData):
+    fig = plt.figure(figsize=(5, 5))
+    ax = fig.add_subplot(111, projection='3d')
+    drawer = drawer_class(ax=ax, coordinate_data=coordinate_data)
+    drawer.draw_local_pos_at_initial_frame()
+    fig.canvas.draw()
+
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        drawer.draw_local_pos_at_specific_frame(frame=frame % coordinate_data.n_frames)
+    update_fps = N_FRAMES / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        drawer.draw_local_pos_at_specific_frame(frame=frame % coordinate_data.n_frames)
+        fig.canvas.draw()
+    draw_fps = N_FRAMES / (time.perf_counter() - start)
+    plt.close(fig)
+    return update_fps, draw_fps
+
+
+def main():
+    coordinate_data = LoadBvhUsecase().load(FILE_NAME).coordinate_data
+    for name, drawer_class in [("legacy (Line3D per bone)", LegacyCoordinateDataDrawer),
+                               ("Line3DCollection", CoordinateDataDrawer)]:
+        update_fps, draw_fps = frames_per_second(drawer_class, coordinate_data)
+        print(f"{name:<26} artist update: {update_fps:10.1f} fps  update + canvas draw: {draw_fps:8.1f} fps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""画面を使わない画像の書き出しのフレームレートのベンチマーク
+
+python -m benchmark.benchmark_export_motion
+
+フレームごとにキャンバス全体を描画してsavefigする方法と、背景を保存してanimatedなartistだけを描画する方法
+(ExportMotionUsecase, プロセス数ごと)を比較する。
+"""
+import os
+import tempfile
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from src.presenter.motion_figure import MotionFigure
+from src.usecase.export_motion_usecase import ExportMotionUsecase
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+N_FRAMES = 200
+
+
+def savefig_fps(motion_data, output_dir: str) -> float:
+    motion_figure = MotionFigure()
+    FigureCanvasAgg(motion_figure.figure)
+    motion_figure.set_data(motion_data)
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        motion_figure.draw_at_specific_frame(frame)
+        motion_figure.figure.savefig(os.path.join(output_dir, f"{frame}.png"), dpi=80)
+    return N_FRAMES / (time.perf_counter() - start)
+
+
+def main():
+    motion_data = LoadBvhUsecase().load(FILE_NAME)
+    with tempfile.TemporaryDirectory() as output_dir:
+        print(f"savefig (full redraw)  : {savefig_fps(motion_data, output_dir):8.1f} frames/s")
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            result = ExportMotionUsecase(workers=workers).export(motion_data, range(N_FRAMES), output_dir)
+            print(f"blit, {workers:2d} workers       : {result.render_fps:8.1f} frames/s "
+                  f"(including figure set-up)")
+
+
+if __name__ == "__main__":
+    main()
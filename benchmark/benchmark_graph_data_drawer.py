@@ -0,0 +1,62 @@
+"""グラフ描画 (既定の3つのグラフ) の1フレームあたりの再描画時間のベンチマーク (Aggバックエンド)
+
+python -m benchmark.benchmark_graph_data_drawer
+"""
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from src.model.skeleton_data import MultiPlotGraphData
+from src.presenter.graph_data_drawer import GraphDataDrawer, MultiPlotGraphDataDrawer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+N_FRAMES = 100
+
+
+def create_drawers(graph_data_list):
+    fig = plt.figure(figsize=(10, 5))
+    drawers = []
+    for i, (graph_data, position) in enumerate(zip(graph_data_list, [322, 324, 326])):
+        ax = fig.add_subplot(position)
+        if isinstance(graph_data, MultiPlotGraphData):
+            drawers.append(MultiPlotGraphDataDrawer(ax=ax, multi_graph_data=graph_data))
+        else:
+            drawers.append(GraphDataDrawer(ax=ax, graph_data=graph_data, line_color=["r", "g", "b"][i]))
+    for drawer in drawers:
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+    fig.canvas.draw()
+    return fig, drawers
+
+
+def main():
+    graph_data_list = LoadBvhUsecase().load(FILE_NAME).graph_data_list
+
+    # 従来: フレームごとにグラフをクリアして描画し直し、キャンバス全体を再描画する
+    fig, drawers = create_drawers(graph_data_list)
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        for drawer in drawers:
+            drawer.redraw_graph_data_at_specific_frame(frame=frame)
+        fig.canvas.draw()
+    before = (time.perf_counter() - start) / N_FRAMES
+    plt.close(fig)
+
+    # 現在: 静的な内容は保存した背景を復元し、カーソルだけを描画する
+    fig, drawers = create_drawers(graph_data_list)
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        for drawer in drawers:
+            drawer.draw_graph_data_at_specific_frame(frame=frame)
+    after = (time.perf_counter() - start) / N_FRAMES
+    plt.close(fig)
+
+    print(f"per-frame redraw of 3 graphs  before: {before * 1e3:8.2f} ms  after: {after * 1e3:8.2f} ms  "
+          f"speedup: {before / after:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""全関節の速度・加速度・躍度の計算のベンチマーク
+
+python -m benchmark.benchmark_kinematics
+
+従来のbody speedと同じpandasの計算 (rolling(center=True).mean() -> shift差分 -> bfill) を全関節に広げた場合と、
+kinematicsモジュールのNumPyの各フィルタを比較する。
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmark.synthetic_bvh import make_long_bvh, read_test_bvh
+from src.service.kinematics import calculate_kinematics
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+REPEAT = 100  # 369 * 100 フレーム
+N_RUNS = 3
+
+
+def pandas_kinematics(positions: np.ndarray, fps: int, window: int = 10):
+    n_frames = len(positions)
+    df_pos = pd.DataFrame(positions.reshape(n_frames, -1)).rolling(window=window, center=True).mean()
+    df_vel = (df_pos - df_pos.shift(1)) * fps
+    df_acc = (df_vel - df_vel.shift(1)) * fps
+    df_jerk = (df_acc - df_acc.shift(1)) * fps
+    return [df.bfill().to_numpy().reshape(positions.shape) for df in (df_vel, df_acc, df_jerk)]
+
+
+def best_time(function) -> float:
+    times = []
+    for _ in range(N_RUNS):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, "long.bvh")
+        with open(file_name, "w") as f:
+            f.write(make_long_bvh(read_test_bvh(), REPEAT))
+        coordinate_data = LoadBvhUsecase().load(file_name).coordinate_data
+    positions = coordinate_data.world_pos.astype(np.float64)
+    fps = coordinate_data.fps
+    print(f"{coordinate_data.n_frames} frames x {len(coordinate_data.joint_names)} joints")
+
+    pandas_time = best_time(lambda: pandas_kinematics(positions, fps))
+    print(f"pandas rolling + shift + bfill : {pandas_time * 1000:8.1f} ms")
+    for method in ("moving_average", "savgol", "lowpass"):
+        elapsed = best_time(lambda: calculate_kinematics(positions, fps, method=method))
+        print(f"numpy {method:24s} : {elapsed * 1000:8.1f} ms ({pandas_time / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""長いグラフデータの描画時間のベンチマーク (Aggバックエンド)
+
+python -m benchmark.benchmark_min_max_pyramid
+
+1時間・50fps (180000フレーム) のグラフ3つを、全ての点を描画する場合と、MinMaxPyramidで間引いて描画する場合とで、
+キャンバス全体の再描画(リサイズや視点の変更など背景を保存し直す場合)にかかる時間を比較する。
+"""
+import time
+
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from src.model.skeleton_data import GraphData
+from src.presenter.graph_data_drawer import GraphDataDrawer
+from src.service.min_max_pyramid import MinMaxPyramid
+
+N_FRAMES = 180000
+N_DRAWS = 10
+
+
+def create_graph_data_list():
+    rng = np.random.default_rng(0)
+    return [GraphData(data=np.cumsum(rng.normal(size=N_FRAMES)), display_name=f"graph {i}", graph_key=f"graph_{i}")
+            for i in range(3)]
+
+
+def draw_time(fig) -> float:
+    fig.canvas.draw()
+    start = time.perf_counter()
+    for _ in range(N_DRAWS):
+        fig.canvas.draw()
+    return (time.perf_counter() - start) / N_DRAWS
+
+
+def main():
+    graph_data_list = create_graph_data_list()
+
+    # 従来: 全ての点を描画する
+    fig = plt.figure(figsize=(10, 5))
+    for graph_data, position in zip(graph_data_list, [322, 324, 326]):
+        fig.add_subplot(position).plot(graph_data.data)
+    full = draw_time(fig)
+    plt.close(fig)
+
+    # 現在: 軸の幅に応じて間引く
+    fig = plt.figure(figsize=(10, 5))
+    start = time.perf_counter()
+    drawers = [GraphDataDrawer(ax=fig.add_subplot(position), graph_data=graph_data, blit=False)
+               for graph_data, position in zip(graph_data_list, [322, 324, 326])]
+    build = time.perf_counter() - start
+    for drawer in drawers:
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+    decimated = draw_time(fig)
+    n_points = sum(len(drawer.lines[0].get_xdata()) for drawer in drawers)
+    plt.close(fig)
+
+    pyramid = MinMaxPyramid(graph_data_list[0].data)
+    start = time.perf_counter()
+    for i in range(100):
+        pyramid.decimate(i * 1000, i * 1000 + 50000, max_points=800)
+    zoom = (time.perf_counter() - start) / 100
+
+    print(f"3 graphs x {N_FRAMES} frames, full canvas draw")
+    print(f"all points : {full * 1e3:8.2f} ms ({3 * N_FRAMES} points)")
+    print(f"decimated  : {decimated * 1e3:8.2f} ms ({n_points} points, {full / decimated:.1f}x)")
+    print(f"pyramid build (3 graphs): {build * 1e3:.2f} ms, re-decimation on zoom: {zoom * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
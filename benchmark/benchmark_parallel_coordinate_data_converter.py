@@ -0,0 +1,35 @@
+"""並列の順運動学 (CoordinateDataConverterのworkers) のベンチマーク
+
+python -m benchmark.benchmark_parallel_coordinate_data_converter [最大ワーカー数]
+"""
+import os
+import sys
+import time
+
+from benchmark.synthetic_bvh import read_test_bvh, make_long_bvh
+from src.interface.bvh_reader import BvhReader
+from src.service.coordinate_data_converter import CoordinateDataConverter
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    # 27関節 x 約11万フレーム (50fpsで約37分)
+    skeleton_data = BvhReader(data=make_long_bvh(read_test_bvh(), 300)).create_skeleton_data()
+    n_frames = len(skeleton_data.joints_rotations)
+    print(f"frames: {n_frames}  cpu count: {os.cpu_count()}")
+
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        converter = CoordinateDataConverter(workers=workers, chunk_size=4000)
+        start = time.perf_counter()
+        converter.convert_to_coordinate_data(skeleton_data=skeleton_data)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers: {workers:>3}  {elapsed:7.3f} s  {n_frames / elapsed:10.1f} frames/s  "
+              f"speedup: {baseline / elapsed:5.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
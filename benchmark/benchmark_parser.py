@@ -0,0 +1,56 @@
+"""BVHパーサーのベンチマーク
+
+python -m benchmark.benchmark_parser
+"""
+import re
+import time
+
+import numpy as np
+
+from benchmark.synthetic_bvh import read_test_bvh, make_long_bvh
+from src.interface.parser import Bvh
+
+
+def legacy_tokenize(data: str):
+    """旧実装 (1文字ずつ走査し、フレームを文字列のリストとして保持) の読み込み処理"""
+    first_round = []
+    accumulator = ''
+    for char in data:
+        if char not in ('\n', '\r'):
+            accumulator += char
+        elif accumulator:
+            first_round.append(re.split('\\s+', accumulator.strip()))
+            accumulator = ''
+    frames = []
+    frame_time_found = False
+    for item in first_round:
+        if frame_time_found:
+            frames.append(item)
+            continue
+        if item[0] == 'Frame' and item[1] == 'Time:':
+            frame_time_found = True
+    return np.array(frames).astype('float32')
+
+
+def measure(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    data = read_test_bvh()
+    for repeat in [1, 10, 50]:
+        text = data if repeat == 1 else make_long_bvh(data, repeat)
+        n_frames = Bvh(text).motion.shape[0]
+        legacy = measure(legacy_tokenize, text, repeat=1 if repeat > 1 else 3)
+        current = measure(Bvh, text)
+        print(f"frames: {n_frames:>6}  size: {len(text) / 1e6:7.2f} MB  "
+              f"legacy: {legacy:8.3f} s  current: {current:8.3f} s  speedup: {legacy / current:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
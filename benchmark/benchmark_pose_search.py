@@ -0,0 +1,87 @@
+"""類似ポーズの検索時間のベンチマーク
+
+python -m benchmark.benchmark_pose_search
+
+テストデータのテイクの姿勢にノイズを加えて10^5, 10^6フレームの索引を作成し、1回の検索(上位10件)の時間を、
+全次元の特徴ベクトルとの距離を総当たりで計算する場合と、PoseIndex (主成分空間でのブロックごとの総当たり) で比較する。
+"""
+import time
+
+import numpy as np
+
+from src.interface.bvh_reader import BvhReader
+from src.service.coordinate_data_converter import CoordinateDataConverter
+from src.service.pose_search import PoseIndex, PosePca, pose_features
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+N_FRAMES_LIST = [100000, 1000000]
+TAKE_SIZE = 10000  # 1テイクのフレーム数
+CHUNK_SIZE = 100000
+N_QUERIES = 20
+K = 10
+
+
+def synthetic_features(base: np.ndarray, n_frames: int, rng: np.random.Generator):
+    """baseの姿勢のどれかにノイズを加えた特徴ベクトルと、元にした姿勢のindex"""
+    base_ids = rng.integers(0, len(base), n_frames)
+    features = np.empty((n_frames, base.shape[1]), dtype=np.float32)
+    for start in range(0, n_frames, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n_frames)
+        features[start:stop] = base[base_ids[start:stop]]
+        features[start:stop] += rng.normal(scale=0.05, size=(stop - start, base.shape[1])).astype(np.float32)
+    return features, base_ids
+
+
+def brute_force_search(features: np.ndarray, query: np.ndarray) -> np.ndarray:
+    distances = np.empty(len(features), dtype=np.float32)
+    for start in range(0, len(features), CHUNK_SIZE):
+        differences = features[start:start + CHUNK_SIZE] - query
+        distances[start:start + CHUNK_SIZE] = np.einsum("nd,nd->n", differences, differences)
+    rows = np.argpartition(distances, K)[:K]
+    return rows[np.argsort(distances[rows])]
+
+
+def main():
+    skeleton_data = BvhReader(FILE_NAME).create_skeleton_data()
+    coordinate_data = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+    base = pose_features(coordinate_data.world_pos)
+    rng = np.random.default_rng(0)
+
+    for n_frames in N_FRAMES_LIST:
+        features, base_ids = synthetic_features(base, n_frames, rng)
+        query_rows = rng.integers(0, n_frames, N_QUERIES)
+
+        start_time = time.perf_counter()
+        pca = PosePca.fit(features)
+        embeddings = np.concatenate([pca.transform(features[start:start + CHUNK_SIZE])
+                                     for start in range(0, n_frames, CHUNK_SIZE)])
+        take_offsets = np.arange(0, n_frames + TAKE_SIZE, TAKE_SIZE).clip(max=n_frames)
+        index = PoseIndex(pca, embeddings, [f"take_{i}" for i in range(len(take_offsets) - 1)], take_offsets)
+        build = time.perf_counter() - start_time
+
+        # 精度は、結果のうち検索元と同じ姿勢を元にしたフレームの割合
+        times, precisions, brute_force_times, brute_force_precisions = [], [], [], []
+        for query_row in query_rows:
+            start_time = time.perf_counter()
+            matches = index.search(features[query_row], k=K)
+            times.append(time.perf_counter() - start_time)
+            rows = [index.take_range(match.take)[0] + match.frame for match in matches]
+            precisions.append(np.mean(base_ids[rows] == base_ids[query_row]))
+        for query_row in query_rows[:5]:
+            start_time = time.perf_counter()
+            rows = brute_force_search(features, features[query_row])
+            brute_force_times.append(time.perf_counter() - start_time)
+            brute_force_precisions.append(np.mean(base_ids[rows] == base_ids[query_row]))
+
+        indexed, brute_force = np.median(times), np.median(brute_force_times)
+        print(f"{n_frames} frames, {features.shape[1]} -> {pca.components.shape[1]} dims, top {K}")
+        print(f"brute force (all dims)   : {brute_force * 1e3:8.2f} ms, "
+              f"precision {np.mean(brute_force_precisions):.2f}")
+        print(f"PoseIndex.search         : {indexed * 1e3:8.2f} ms ({brute_force / indexed:.1f}x), "
+              f"p95 {np.percentile(times, 95) * 1e3:.2f} ms, precision {np.mean(precisions):.2f}")
+        print(f"index build              : {build:8.2f} s")
+        del features, embeddings, index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""フレーム範囲の統計量の計算時間のベンチマーク
+
+python -m benchmark.benchmark_range_statistics
+
+1時間・50fps (180000フレーム) のグラフデータ (4本の線) について、範囲ごとに配列を切り出して計算する場合と、
+RangeQueryIndexで求める場合の1回の範囲選択(ドラッグ中の1イベント)あたりの時間を比較する。
+"""
+import time
+
+import numpy as np
+
+from src.service.range_statistics import RangeQueryIndex
+
+N_FRAMES = 180000
+N_LINES = 4
+N_QUERIES = 200
+
+
+def slice_statistics(values: np.ndarray, start: int, stop: int):
+    segment = values[start:stop]
+    return (np.nanmean(segment), np.nanstd(segment), np.nanmin(segment), np.nanmax(segment),
+            start + np.nanargmin(segment), start + np.nanargmax(segment))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    lines = [np.cumsum(rng.normal(size=N_FRAMES)) for _ in range(N_LINES)]
+    ranges = [(i * 100, N_FRAMES - i * 100) for i in range(N_QUERIES)]  # 選択範囲をドラッグで狭めていく
+
+    start_time = time.perf_counter()
+    for start, stop in ranges:
+        for values in lines:
+            slice_statistics(values, start, stop)
+    sliced = (time.perf_counter() - start_time) / N_QUERIES
+
+    start_time = time.perf_counter()
+    indexes = [RangeQueryIndex(values) for values in lines]
+    build = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for start, stop in ranges:
+        for index in indexes:
+            index.query(start, stop)
+    indexed = (time.perf_counter() - start_time) / N_QUERIES
+
+    print(f"{N_LINES} lines x {N_FRAMES} frames, per range selection")
+    print(f"slice + nanmean/nanstd/nanargmin/nanargmax : {sliced * 1e3:8.3f} ms")
+    print(f"RangeQueryIndex                            : {indexed * 1e3:8.3f} ms ({sliced / indexed:.0f}x)")
+    print(f"index build (once per take)                : {build * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""CoordinateDataの読み込み時間のベンチマーク (従来のjson vs 列指向のバイナリ形式)
+
+python -m benchmark.benchmark_repository
+"""
+import os
+import tempfile
+import time
+
+from src.repository.columnar_store import bundle_size
+from src.repository.coordinate_data_repository import CoordinateDataRepository
+
+JSON_FILE_PATH = "test/data/MCPM_20230410_150228_coordinate.json"
+
+
+def measure(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dir_path = os.path.join(tmp_dir, "coordinate")
+        CoordinateDataRepository.convert_json(JSON_FILE_PATH, dir_path)
+
+        json_time = measure(lambda: CoordinateDataRepository.load_json(JSON_FILE_PATH))
+        mmap_time = measure(lambda: CoordinateDataRepository.load(dir_path))
+        # 1フレームだけ参照する場合 (ビューアで開いた直後の表示に相当)
+        mmap_frame_time = measure(lambda: CoordinateDataRepository.load(dir_path).local_pos[100].sum())
+        full_time = measure(lambda: CoordinateDataRepository.load(dir_path, mmap=False))
+
+        print(f"size   json: {os.path.getsize(JSON_FILE_PATH) / 1e6:7.3f} MB  "
+              f"binary: {bundle_size(dir_path) / 1e6:7.3f} MB")
+        print(f"json load:              {json_time * 1e3:9.3f} ms")
+        print(f"binary load (mmap):     {mmap_time * 1e3:9.3f} ms  ({json_time / mmap_time:7.1f}x)")
+        print(f"binary load + 1 frame:  {mmap_frame_time * 1e3:9.3f} ms  ({json_time / mmap_frame_time:7.1f}x)")
+        print(f"binary load (no mmap):  {full_time * 1e3:9.3f} ms  ({json_time / full_time:7.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
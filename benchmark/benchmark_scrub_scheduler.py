@@ -0,0 +1,116 @@
+"""長いテイクでスライダーを素早く動かした場合の、操作から描画完了までの遅延のベンチマーク (Aggバックエンド)
+
+スライダーのイベントを描画より速い間隔で発生させ、ScrubSchedulerでまとめた描画の遅延を計測する。
+全フレームを読み込んだ場合(load)と、表示中のフレーム付近だけを変換する遅延読み込み(load_lazy)の場合を比較する。
+
+python -m benchmark.benchmark_scrub_scheduler
+"""
+import os
+import tempfile
+import time
+from typing import Tuple
+
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from benchmark.synthetic_bvh import make_long_bvh, read_test_bvh
+from src.model.skeleton_data import MotionData
+from src.presenter.blit_manager import BlitManager
+from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.presenter.graph_data_drawer import GraphDataDrawer
+from src.presenter.scrub_scheduler import ScrubScheduler, ScrubStatistics
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+REPEAT = 50
+N_EVENTS = 2000
+EVENT_INTERVAL = 0.002  # マウスの移動イベントの間隔 [s]
+
+
+class EventLoop:
+    """Tkのafter_idle / afterを模したイベントループ"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after_idle(self, func):
+        return self.after(0, func)
+
+    def after(self, ms, func):
+        job = [time.perf_counter() + ms / 1000, func]
+        self.jobs.append(job)
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.remove(job)
+
+    def run_due_jobs(self):
+        now = time.perf_counter()
+        due = [job for job in self.jobs if job[0] <= now]
+        for job in due:
+            self.jobs.remove(job)
+            job[1]()
+
+
+def scrub(motion_data: MotionData) -> Tuple[ScrubStatistics, np.ndarray]:
+    """スライダーを端から端まで往復するように動かし、統計と描画ごとの遅延 [ms] を返す"""
+    coordinate_data = motion_data.coordinate_data
+    fig = plt.figure(figsize=(10, 5))
+    coordinate_drawer = CoordinateDataDrawer(ax=fig.add_subplot(121, projection='3d'),
+                                             coordinate_data=coordinate_data)
+    coordinate_drawer.draw_local_pos_at_initial_frame()
+    graph_drawer = GraphDataDrawer(ax=fig.add_subplot(122), graph_data=motion_data.graph_data_list[0],
+                                   blit=False)
+    graph_drawer.draw_graph_data_at_specific_frame(frame=0)
+    blit_manager = BlitManager(fig.canvas,
+                               animated_artists=coordinate_drawer.animated_artists + graph_drawer.animated_artists)
+    fig.canvas.draw()
+
+    def render(frame: int):
+        coordinate_drawer.draw_local_pos_at_specific_frame(frame=frame)
+        graph_drawer.draw_graph_data_at_specific_frame(frame=frame)
+        blit_manager.update()
+
+    event_loop = EventLoop()
+    scheduler = ScrubScheduler(widget=event_loop, render=render)
+    # 端から端まで往復するようにスライダーを動かす
+    frames = (np.abs(np.sin(np.linspace(0, 4 * np.pi, N_EVENTS))) * (coordinate_data.n_frames - 1)).astype(int)
+    latencies = []
+
+    def run_due_jobs():
+        renders = scheduler.statistics.renders
+        event_loop.run_due_jobs()
+        if scheduler.statistics.renders > renders:
+            latencies.append(scheduler.statistics.last_latency)
+
+    next_event_time = time.perf_counter()
+    for frame in frames:
+        while time.perf_counter() < next_event_time:
+            run_due_jobs()
+        scheduler.request(int(frame))
+        next_event_time += EVENT_INTERVAL
+    while event_loop.jobs:
+        run_due_jobs()
+    plt.close(fig)
+    return scheduler.statistics, np.array(latencies) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, "long.bvh")
+        with open(file_name, "w") as f:
+            f.write(make_long_bvh(read_test_bvh(), REPEAT))
+        for name, load in [("load", LoadBvhUsecase().load), ("load_lazy", LoadBvhUsecase.load_lazy)]:
+            motion_data = load(file_name)
+            statistics, latencies = scrub(motion_data)
+            print(f"{name:<10} frames: {motion_data.coordinate_data.n_frames}  events: {statistics.requests}  "
+                  f"renders: {statistics.renders}  dropped: {statistics.dropped}")
+            print(f"{'':<10} latency: median {np.median(latencies):.1f} ms  p95 {np.percentile(latencies, 95):.1f} ms"
+                  f"  max {statistics.max_latency * 1000:.1f} ms"
+                  f"  (clip frame time {1000 / motion_data.coordinate_data.fps:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""スティックピクチャ描画の1フレームあたりの時間のベンチマーク
+
+matplotlibの3Dの軸への描画(Aggでのblitまで)と、tk.Canvasへの描画(投影とcoords()による更新)を比較する。
+ディスプレイがない環境では、tk.Canvasへの描画は投影の時間だけを計測する。
+
+python -m benchmark.benchmark_tk_canvas_skeleton_drawer
+"""
+import time
+import tkinter as tk
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.presenter.blit_manager import BlitManager
+from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.presenter.orbit_camera import OrbitCamera
+from src.presenter.tk_canvas_skeleton_drawer import TkCanvasSkeletonDrawer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+N_FRAMES = 500
+CANVAS_SIZE = (500, 500)
+
+
+def matplotlib_fps(coordinate_data) -> float:
+    figure = Figure(figsize=(CANVAS_SIZE[0] / 100, CANVAS_SIZE[1] / 100))
+    FigureCanvasAgg(figure)
+    drawer = CoordinateDataDrawer(ax=figure.add_subplot(111, projection='3d'), coordinate_data=coordinate_data)
+    drawer.draw_local_pos_at_initial_frame()
+    blit_manager = BlitManager(figure.canvas, animated_artists=drawer.animated_artists)
+    figure.canvas.draw()
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        drawer.draw_local_pos_at_specific_frame(frame=frame % coordinate_data.n_frames)
+        blit_manager.update()
+    return N_FRAMES / (time.perf_counter() - start)
+
+
+def tk_canvas_fps(coordinate_data) -> float:
+    root = tk.Tk()
+    canvas = tk.Canvas(root, width=CANVAS_SIZE[0], height=CANVAS_SIZE[1])
+    canvas.pack()
+    root.update()
+    drawer = TkCanvasSkeletonDrawer(canvas=canvas, coordinate_data=coordinate_data)
+    drawer.draw_local_pos_at_initial_frame()
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        drawer.draw_local_pos_at_specific_frame(frame=frame % coordinate_data.n_frames)
+        root.update_idletasks()
+    fps = N_FRAMES / (time.perf_counter() - start)
+    root.destroy()
+    return fps
+
+
+def projection_fps(coordinate_data) -> float:
+    camera = OrbitCamera.fit(*coordinate_data.local_pos_lim())
+    start = time.perf_counter()
+    for frame in range(N_FRAMES):
+        camera.project(coordinate_data.local_pos[frame % coordinate_data.n_frames], *CANVAS_SIZE)
+    return N_FRAMES / (time.perf_counter() - start)
+
+
+def main():
+    coordinate_data = LoadBvhUsecase().load(FILE_NAME).coordinate_data
+    print(f"matplotlib 3D + blit   : {matplotlib_fps(coordinate_data):10.1f} fps")
+    try:
+        print(f"tk.Canvas coords()     : {tk_canvas_fps(coordinate_data):10.1f} fps")
+    except tk.TclError as e:
+        print(f"tk.Canvas coords()     : skipped ({e})")
+    print(f"projection only (NumPy): {projection_fps(coordinate_data):10.1f} fps")
+
+
+if __name__ == "__main__":
+    main()
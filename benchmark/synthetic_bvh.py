@@ -0,0 +1,61 @@
+"""ベンチマーク用の合成BVHデータを作成する"""
+import numpy as np
+
+TEST_BVH_FILE = "test/data/MCPM_20230410_150228.BVH"
+
+
+def read_test_bvh() -> str:
+    with open(TEST_BVH_FILE) as f:
+        return f.read()
+
+
+def make_long_bvh(data: str, repeat: int) -> str:
+    """MOTIONのフレーム行をrepeat回繰り返した長尺のBVHテキストを作成する"""
+    header, _, body = data.partition("MOTION")
+    lines = body.strip().splitlines()
+    frame_lines = lines[2:]
+    n_frames = len(frame_lines) * repeat
+    return (header + "MOTION\n"
+            + f"Frames: {n_frames}\n"
+            + lines[1] + "\n"
+            + ("\n".join(frame_lines) + "\n") * repeat)
+
+
+def make_synthetic_bvh(n_joints: int, n_frames: int, seed: int = 0) -> str:
+    """n_joints個の関節を持つ木構造のスケルトンとランダムな回転のモーションを持つBVHテキストを作成する"""
+    rng = np.random.default_rng(seed)
+    children = {i: [] for i in range(n_joints)}
+    for i in range(1, n_joints):
+        # 親はすでに作成された関節からランダムに選ぶ (1関節あたりの子は最大3つ)
+        candidates = [j for j in range(max(0, i - 8), i) if len(children[j]) < 3]
+        children[candidates[rng.integers(len(candidates))]].append(i)
+
+    lines = ["HIERARCHY"]
+
+    def write_joint(joint: int, depth: int):
+        indent = "  " * depth
+        keyword = "ROOT" if joint == 0 else "JOINT"
+        offset = " ".join(f"{x:.4f}" for x in rng.uniform(-10, 10, 3))
+        lines.append(f"{indent}{keyword} joint_{joint}")
+        lines.append(f"{indent}{{")
+        lines.append(f"{indent}  OFFSET {offset}")
+        lines.append(f"{indent}  CHANNELS 6 Xposition Yposition Zposition Zrotation Xrotation Yrotation")
+        for child in children[joint]:
+            write_joint(child, depth + 1)
+        if not children[joint]:
+            lines.append(f"{indent}  End Site")
+            lines.append(f"{indent}  {{")
+            lines.append(f"{indent}    OFFSET 0 1 0")
+            lines.append(f"{indent}  }}")
+        lines.append(f"{indent}}}")
+
+    write_joint(0, 0)
+    lines.append("MOTION")
+    lines.append(f"Frames: {n_frames}")
+    lines.append("Frame Time: 0.02")
+
+    motion = np.zeros((n_frames, n_joints, 6))
+    motion[:, :, 3:] = rng.uniform(-90, 90, (n_frames, n_joints, 3))
+    motion[:, 0, :3] = rng.uniform(-100, 100, (n_frames, 3))
+    body = "\n".join(" ".join(f"{x:.4f}" for x in frame) for frame in motion.reshape(n_frames, -1))
+    return "\n".join(lines) + "\n" + body + "\n"
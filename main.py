@@ -1,48 +1,115 @@
+import functools
 import os
 import threading
+import time
 import tkinter
 import tkinter as tk
-from tkinter import ttk, filedialog
-from typing import List
+from tkinter import ttk, filedialog, messagebox
 
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from src.interface.bvh_reader import BvhReader
-from src.model.skeleton_data import SkeletonData, CoordinateData, GraphData, MultiPlotGraphData
-from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
-from src.presenter.graph_data_drawer import GraphDataDrawer, MultiPlotGraphDataDrawer
+from src.model.skeleton_data import CoordinateData, MotionData
+from src.presenter.background_loader import BackgroundLoader
+from src.presenter.blit_manager import BlitManager
+from src.presenter.frame_range_selector import FrameRangeSelector
 from src.presenter.loading_dialog import LoadingDialog
-from src.service.calculate_graph_data import CalculateGraphData
-from src.service.coordinate_data_converter import CoordinateDataConverter
+from src.presenter.pose_search_dialog import PoseSearchDialog
+from src.presenter.motion_figure import MotionFigure
+from src.presenter.scrub_scheduler import ScrubScheduler
+from src.presenter.tk_canvas_skeleton_drawer import TkCanvasSkeletonDrawer
+from src.service.playback_clock import PlaybackClock
+from src.service.pose_search import PoseMatch
+from src.service.range_statistics import GraphDataStatistics
+from src.service.windowed_coordinate_data import WindowedCoordinateData
+from src.usecase.batch_convert_usecase import is_bvh_file
+from src.usecase.load_bvh_usecase import LoadBvhUsecase, LoadingCancelled, LoadingProgress
+from src.usecase.pose_search_usecase import PoseSearchUsecase
+from src.usecase.prefetch_bvh_usecase import PrefetchBvhUsecase
 
-graph_colors = ["r", "g", "b"]
+# このサイズを超えるファイルは全フレームを読み込まず、表示中のフレーム付近だけを読み込む
+LAZY_LOADING_FILE_SIZE = 256 * 1024 * 1024
+
+# 読み込んだファイルをプロセス内に保持する容量
+MEMORY_CACHE_SIZE = 1024 ** 3
+
+# Trueの場合はフレームごとに変化する内容だけを描画し直す(blit)。Falseの場合は毎回キャンバス全体を再描画する
+BLIT = True
+
+# スティックピクチャの描画方法。"matplotlib": 3Dの軸に描画する, "tk": tk.Canvasに描画する(軽量)
+SKELETON_RENDERER = "matplotlib"
+
+# 再生速度の選択肢
+PLAYBACK_SPEEDS = ["0.25", "0.5", "1", "2", "4"]
+
+# 再生状況の表示を更新する間隔 [s]
+PLAYBACK_STATUS_INTERVAL = 0.5
+
+# 類似ポーズの検索で表示する件数
+POSE_SEARCH_RESULTS = 10
+
+# 類似ポーズの検索ボタンの表示
+POSE_SEARCH_BUTTON_TEXT = "類似ポーズを検索"
+
+# 類似ポーズを検索するライブラリの索引 (python -m src.usecase.pose_search_usecase build で作成したディレクトリ)。
+# Noneの場合は表示中のファイルの中だけを検索する
+POSE_LIBRARY_INDEX_DIR = None
 
 
 class BvhMotionViewerApp:
 
     def __init__(self, master):
 
-        # initial_processで定義される変数
+        # show_motion_dataで定義される変数
         self.coordinate_drawer = None
-        self.coordinate_anim = None
-        self.graph_drawer_list = None
-        self.graph_ax_list = None
-        self.coordinate_ax = None
-        self.fig = None
-        self.graph_data_list = None
+        self.tk_skeleton_drawer = None
+        self.playback_clock = None
+        self.play_job = None
+        self.playback_status_time = 0.0
         self.coordinate_data = None
+        self.motion_data = None
+        self.previewing = False  # 読み込み中のファイルの変換済みのフレームを表示している
+        self.frame_before_preview = 0
+        self.loading_dialog = None
+        self.loading_file_name = None
+        self.graph_statistics = []
+        self.frame_range = None
+        self.pose_index = None
+        self.pose_index_source = None  # 索引を作成した(作成中の)位置情報
+        self.pose_index_loader = None
+        self.pose_search_dialog = None
+        self.pending_frame = None
 
         self.file_name: str = "data/MCPM_20230410_150228.BVH"
+        self.playback_speed: float = 1.0
+
+        # 変換結果をキャッシュするbvh読み込み処理。最近開いたファイルはメモリにも保持する
+        self.load_bvh_usecase: LoadBvhUsecase = LoadBvhUsecase.with_cache(memory_max_bytes=MEMORY_CACHE_SIZE)
+
+        # 開いたファイルの前後のファイルを先読みしておく
+        self.prefetcher: PrefetchBvhUsecase = PrefetchBvhUsecase(self.load_bvh_usecase,
+                                                                 max_file_size=LAZY_LOADING_FILE_SIZE)
+
+        # 類似ポーズの検索。ライブラリの索引は起動時にワーカースレッドで読み込む
+        self.pose_search_usecase: PoseSearchUsecase = PoseSearchUsecase()
+        self.pose_library = None
+        self.pose_library_status = "索引を読み込み中"  # ライブラリを検索できない理由
 
         self.master = master
+
+        # 読み込みはワーカースレッドで行い、画面を操作できるようにしておく
+        self.background_loader: BackgroundLoader = BackgroundLoader(widget=master, load=self._load)
+        self.pose_library_loader: BackgroundLoader = BackgroundLoader(widget=master, load=self._load_pose_library)
+        if POSE_LIBRARY_INDEX_DIR is not None:
+            self.pose_library_loader.start(POSE_LIBRARY_INDEX_DIR, on_progress=lambda progress: None,
+                                           on_done=self._on_pose_library_loaded,
+                                           on_error=self._on_pose_library_error)
+
+        # スライダー操作による描画は最新のフレームだけを画面の更新間隔ごとにまとめて行う
+        self.scrub_scheduler: ScrubScheduler = ScrubScheduler(widget=master, render=self._scrub_to)
+
         master.title("BVH Motion Viewer")
         master.geometry("1080x720")
 
-        # 初期化処理
-        self._initial_process(file_name=self.file_name)
-
         # operation frame
         self.operation_frame = tk.Frame(master=master)
         self.operation_frame.pack(side=tk.BOTTOM)
@@ -54,9 +121,9 @@ class BvhMotionViewerApp:
         # スライダーの初期化
         self.slider = ttk.Scale(self.operation_frame,
                                 from_=0,
-                                to=len(self.coordinate_data.local_pos_list) - 1,
+                                to=0,
                                 orient="horizontal",
-                                command=self.update_animation_and_graphs)
+                                command=self._on_slider_moved)
         self.slider.pack(side=tk.LEFT, padx=2, pady=5)
 
         # 再生ボタンの初期化
@@ -67,19 +134,61 @@ class BvhMotionViewerApp:
         self.stop_button = tk.Button(self.operation_frame, text="停止", command=self.stop)
         self.stop_button.pack(side=tk.LEFT, padx=2, pady=5)
 
+        # 再生速度の選択
+        self.speed_combobox = ttk.Combobox(self.operation_frame, values=PLAYBACK_SPEEDS, width=5, state="readonly")
+        self.speed_combobox.set("1")
+        self.speed_combobox.bind("<<ComboboxSelected>>", self._on_speed_selected)
+        self.speed_combobox.pack(side=tk.LEFT, padx=2, pady=5)
+
+        # ループ範囲の設定ボタンの初期化
+        self.loop_start_button = tk.Button(self.operation_frame, text="ループ開始", command=self._set_loop_start)
+        self.loop_start_button.pack(side=tk.LEFT, padx=2, pady=5)
+        self.loop_end_button = tk.Button(self.operation_frame, text="ループ終了", command=self._set_loop_end)
+        self.loop_end_button.pack(side=tk.LEFT, padx=2, pady=5)
+        self.loop_reset_button = tk.Button(self.operation_frame, text="ループ解除", command=self._reset_loop_range)
+        self.loop_reset_button.pack(side=tk.LEFT, padx=2, pady=5)
+        self.loop_selection_button = tk.Button(self.operation_frame, text="選択範囲をループ",
+                                               command=self._set_loop_to_selection)
+        self.loop_selection_button.pack(side=tk.LEFT, padx=2, pady=5)
+
+        # 表示中のフレームと似たポーズの検索ボタンの初期化
+        self.pose_search_button = tk.Button(self.operation_frame, text=POSE_SEARCH_BUTTON_TEXT,
+                                            command=self._search_similar_poses, state=tk.DISABLED)
+        self.pose_search_button.pack(side=tk.LEFT, padx=2, pady=5)
+
         # 更新ボタンの初期化
         self.reload_bvh_button = tk.Button(self.operation_frame, text="他のファイルを開く", command=self._read_other_file)
         self.reload_bvh_button.pack(side=tk.LEFT, padx=2, pady=5)
 
-        # グラフを描画するキャンバスの初期化
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
+        # 再生状況(目標と実際のfps、飛ばしたフレーム数、ループ範囲)の表示
+        self.playback_status_label = tk.Label(self.operation_frame, width=74, anchor="w")
+        self.playback_status_label.pack(side=tk.LEFT, padx=10, pady=5)
+
+        # グラフ上でドラッグして選択したフレーム範囲の統計量の表示
+        self.range_statistics_label = tk.Label(master=master, justify=tk.LEFT, anchor="w", font=("Courier", 10))
+        self.range_statistics_label.pack(side=tk.BOTTOM, fill=tk.X, padx=20)
+
+        # スティックピクチャをtk.Canvasに描画する場合は、matplotlibの図にはグラフだけを描画する
+        self.skeleton_canvas = None
+        if SKELETON_RENDERER == "tk":
+            self.skeleton_canvas = tk.Canvas(self.master, bg="white", highlightthickness=0)
+            self.skeleton_canvas.pack(side="left", fill="both", expand=True)
+
+        # 図とキャンバスは一度だけ作成し、ファイルを開き直した場合は描画内容だけを更新する
+        self.motion_figure: MotionFigure = MotionFigure(figsize=(10, 5) if self.skeleton_canvas is None else (5, 5),
+                                                        draw_skeleton=self.skeleton_canvas is None)
+        self.canvas = FigureCanvasTkAgg(self.motion_figure.figure, master=self.master)
+        self.blit_manager = BlitManager(self.canvas, enabled=BLIT)
+        self.frame_range_selector = FrameRangeSelector(self.canvas, on_change=self._on_frame_range_selected)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(side="left", fill="both", expand=True)
 
+        # 読み込みを開始し、位置情報の変換が一部終わった時点で描画する
+        self.loading_bvh(file_name=self.file_name)
+
     def _read_other_file(self):
         file_path = filedialog.askopenfilename()
-        file_ext = os.path.splitext(file_path)[-1]
-        if file_ext not in [".BVH", ".bvh"]:
+        if not is_bvh_file(file_path):
             tk.messagebox.showerror("エラー", "BVHファイルを選択してください")
             return
         if not os.path.exists(file_path):
@@ -89,134 +198,362 @@ class BvhMotionViewerApp:
         # 正常なファイルの場合は読み込み、描画する
         self.reload_bvh(file_name=file_path)
 
-    def _initial_process(self, file_name: str):
-        """tkinterの画面関連以外の初期化処理"""
-
-        # bvhファイルのローディング
-        self.coordinate_data: CoordinateData = self.loading_bvh(file_name=file_name)
-
-        # グラフデータの計算
-        self.graph_data_list: List[GraphData] = [
-            CalculateGraphData.calculate_head_y_position(coordinate_data=self.coordinate_data),
-            CalculateGraphData.calculate_knee_angles(coordinate_data=self.coordinate_data),
-            CalculateGraphData.calculate_body_speed(coordinate_data=self.coordinate_data)
-        ]
-
-        # グラフの初期化(外枠)
-        self.fig = plt.figure(figsize=(10, 5))
-        self.coordinate_ax = self.fig.add_subplot(121, projection='3d')
-        self.graph_ax_list = [self.fig.add_subplot(x) for x in [322, 324, 326]]
-
-        # アニメーションの初期化
-        self.coordinate_anim = None
-
-        # スティックピクチャ描画用クラス
-        self.coordinate_drawer: CoordinateDataDrawer = CoordinateDataDrawer(ax=self.coordinate_ax,
-                                                                            coordinate_data=self.coordinate_data)
-        # スティックピクチャ描画
-        self.coordinate_drawer.draw_local_pos_at_initial_frame()
-
-        # グラフ描画用クラス
-        self.graph_drawer_list = []
-        for i, graph_data in enumerate(self.graph_data_list):
-            if isinstance(graph_data, MultiPlotGraphData):
-                self.graph_drawer_list.append(MultiPlotGraphDataDrawer(ax=self.graph_ax_list[i],
-                                                                       multi_graph_data=graph_data))
-            elif isinstance(graph_data, GraphData):
-                self.graph_drawer_list.append(GraphDataDrawer(ax=self.graph_ax_list[i],
-                                                              graph_data=graph_data,
-                                                              line_color=graph_colors[i]))
-            else:
-                print(graph_data)
-                raise NotImplementedError(f"Unexpected instance type: {type(graph_data)}")
-
-        # グラフ描画
-        for drawer in self.graph_drawer_list:
-            drawer.draw_graph_data_at_specific_frame(frame=0)
-
-    def _clear_figure_canvas(self):
-        for item in self.canvas.get_tk_widget().find_all():
-            self.canvas.get_tk_widget().delete(item)
-        self.canvas.get_tk_widget().destroy()
-
     def reload_bvh(self, file_name: str = "data/MCPM_20230410_150425.BVH"):
         print(f"reload bvh start")
+        # 読み込み中のファイルがあれば中止する
+        self.loading_bvh(file_name=file_name)
+
+    def show_motion_data(self, motion_data: MotionData, file_name: str):
+        """読み込んだデータで描画し直す"""
 
         # ファイル名表示を更新
         self.file_name_label.config(text=f"{os.path.basename(file_name)}")
 
-        # 描画を一度すべてクリアする
-        self._clear_figure_canvas()
+        # 再生とスライダー操作による描画を止める
+        self.stop()
+        self.scrub_scheduler.cancel()
 
-        # 再度グラフデータの読み込みや描画処理
-        self._initial_process(file_name=file_name)
+        # 描画内容を更新し、キャンバス全体を描画し直す
+        self.previewing = False
+        self.motion_data = motion_data
+        self.coordinate_data: CoordinateData = motion_data.coordinate_data
+        self._draw_motion_data(motion_data)
 
-        # グラフを描画するキャンバスの初期化
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(side="left", fill="both", expand=True)
+        # 範囲の統計量の索引はグラフデータごとに一度だけ作成し、選択範囲を解除する
+        self.graph_statistics = [GraphDataStatistics(graph_data) for graph_data in motion_data.graph_data_list]
+        self.frame_range_selector.set_target(self.motion_figure.visible_graph_axes, self.coordinate_data.n_frames)
+        self.frame_range = None
+        self._update_range_statistics()
+
+        # 類似ポーズの検索の索引はワーカースレッドで作成し、作成が終わるまでは検索できないようにする
+        self._start_pose_indexing(motion_data.coordinate_data, file_name)
+
+        # アニメーションの初期化 (クリップのfpsに従って再生する)
+        self.playback_clock = PlaybackClock(fps=self.coordinate_data.fps,
+                                            n_frames=self.coordinate_data.n_frames,
+                                            speed=self.playback_speed)
 
         # スライダーのtoの値を更新
-        self.slider.config(to=len(self.coordinate_data.local_pos_list) - 1)
+        self.slider.config(to=self.coordinate_data.n_frames - 1)
+        self._update_playback_status()
+
+    def _draw_motion_data(self, motion_data: MotionData):
+        """図とスティックピクチャの描画内容をmotion_dataに更新し、キャンバス全体を描画し直す"""
+        self.motion_figure.set_data(motion_data)
+        if self.skeleton_canvas is None:
+            self.coordinate_drawer = self.motion_figure.coordinate_drawer
+        elif self.tk_skeleton_drawer is None:
+            self.tk_skeleton_drawer = TkCanvasSkeletonDrawer(canvas=self.skeleton_canvas,
+                                                             coordinate_data=motion_data.coordinate_data)
+            self.tk_skeleton_drawer.draw_local_pos_at_initial_frame()
+            self.coordinate_drawer = self.tk_skeleton_drawer
+        else:
+            self.tk_skeleton_drawer.set_data(motion_data.coordinate_data)
+        self.blit_manager.set_artists(self.motion_figure.animated_artists)
+        self.canvas.draw()
 
-    @staticmethod
-    def loading_bvh(file_name: str):
+    def _show_preview(self, coordinate_data: CoordinateData):
+        """読み込み中のファイルの変換済みのフレームのスティックピクチャだけを表示する
+
+        表示中のデータ (self.motion_data) やファイル名は変更しないので、読み込みを中止・失敗した場合は元の表示に戻せる。
+        プレビュー中は再生やスライダーの操作を受け付けない。
+        """
+        self.stop()
+        self.scrub_scheduler.cancel()
+        if not self.previewing and self.coordinate_drawer is not None:
+            self.frame_before_preview = self.coordinate_drawer.current_frame
+        self.previewing = True
+        self._draw_motion_data(MotionData(skeleton_data=None, coordinate_data=coordinate_data, graph_data_list=[]))
+
+    def _restore_motion_data(self):
+        """読み込みを中止・失敗した場合に、プレビューから読み込み前のデータの表示に戻す"""
+        if not self.previewing or self.motion_data is None:
+            return
+        self.show_motion_data(self.motion_data, file_name=self.file_name)
+        self._seek(self.frame_before_preview)
 
-        # ローディング中の表示
-        # dialog = LoadingDialog(self.master)
+    def loading_bvh(self, file_name: str, seek_frame: int = None):
+        """bvh形式のデータをワーカースレッドで読み込み、コーディネートデータ（位置情報）とグラフデータに変換する
 
-        # bvh形式のデータを読み込み、スケルトンデータに変換する
+        読み込み中は進捗をダイアログに表示し、位置情報の先頭のフレームが変換できた時点でそのフレームだけを描画する。
+        seek_frameを指定した場合は、読み込みが終わってからそのフレームを表示する。
+        """
         print(f"start loading BVH data")
         print(f"file path: {file_name}")
-        bvh_reader: BvhReader = BvhReader(file_name)
-        skeleton_data: SkeletonData = bvh_reader.create_skeleton_data()
-
-        # スケルトンデータをコーディネートデータ（位置情報）に変換する
-        coordinate_data_converter: CoordinateDataConverter = CoordinateDataConverter()
-        coordinate_data: CoordinateData \
-            = coordinate_data_converter.convert_to_coordinate_data(skeleton_data=skeleton_data)
-
-        # ローディング中の表示終了
-        # dialog.close()
+        if self.loading_dialog is not None:
+            self.loading_dialog.close()
+        # 先読みより開いたファイルの読み込みを優先する
+        self.prefetcher.cancel()
+        self.loading_file_name = file_name
+        self.pending_frame = seek_frame
+        self.loading_dialog = LoadingDialog(self.master, on_cancel=self._cancel_loading)
+        self.background_loader.start(file_name,
+                                     on_progress=self._on_loading_progress,
+                                     on_done=self._on_loading_done,
+                                     on_error=self._on_loading_error)
+
+    def _load(self, file_name: str, on_progress, cancel_event: threading.Event) -> MotionData:
+        """ワーカースレッドで実行する読み込み処理。同じ内容のファイルを以前に開いていればキャッシュから読み込む"""
+        if os.path.getsize(file_name) > LAZY_LOADING_FILE_SIZE:
+            return self.load_bvh_usecase.load_lazy(file_name=file_name, on_progress=on_progress,
+                                                   cancel_event=cancel_event)
+        return self.load_bvh_usecase.load(file_name=file_name, on_progress=on_progress, cancel_event=cancel_event)
+
+    def _cancel_loading(self):
+        self.background_loader.cancel()
+        self.loading_dialog = None
+        self.pending_frame = None
+        self._restore_motion_data()
+
+    def _on_loading_progress(self, progress: LoadingProgress):
+        if self.loading_dialog is not None:
+            self.loading_dialog.update_progress(progress)
+        if progress.preview is not None:
+            # 残りのフレームの変換中は、変換済みのフレームのスティックピクチャだけを表示する
+            self._show_preview(progress.preview)
+
+    def _on_loading_done(self, motion_data: MotionData):
+        if motion_data.coordinate_data.n_frames == 0:
+            # 再生できるフレームがないファイルは開かず、表示中のファイルのままにする
+            if isinstance(motion_data.coordinate_data, WindowedCoordinateData):
+                motion_data.coordinate_data.reader.close()
+            self._on_loading_error(ValueError(f"{os.path.basename(self.loading_file_name)} にフレームがありません"))
+            return
+        self._close_loading_dialog()
+        previous_coordinate_data = self.coordinate_data
+        self.show_motion_data(motion_data, file_name=self.loading_file_name)
+        self.file_name = self.loading_file_name
+        # 遅延読み込みしていた前のファイルは、新しいファイルに切り替えてから閉じる
+        if isinstance(previous_coordinate_data, WindowedCoordinateData) \
+                and previous_coordinate_data is not self.coordinate_data:
+            previous_coordinate_data.reader.close()
         print(f"finished to convert to coordinate data ")
-        return coordinate_data
+        print(f"cache statistics: {self.load_bvh_usecase.cache.statistics}")
+        print(f"memory cache statistics: {self.load_bvh_usecase.memory_cache.statistics}")
+        self.prefetcher.start(self.file_name)
+        # 他のファイルの検索結果を選んで開いた場合は、そのフレームを表示する
+        if self.pending_frame is not None:
+            self._seek(min(self.pending_frame, self.coordinate_data.n_frames - 1))
+            self.pending_frame = None
+
+    def _on_loading_error(self, error: Exception):
+        self._close_loading_dialog()
+        self._restore_motion_data()
+        self.pending_frame = None
+        messagebox.showerror("エラー", f"ファイルを読み込めませんでした。\n{error}")
+
+    def _close_loading_dialog(self):
+        if self.loading_dialog is not None:
+            self.loading_dialog.close()
+            self.loading_dialog = None
 
     def play(self):
-        frame_skips = 3
-        if self.coordinate_anim is None:
-            self.coordinate_anim = FuncAnimation(self.fig,
-                                                 self.update_animation_and_graphs,
-                                                 frames=range(self.coordinate_drawer.current_frame,
-                                                              len(self.coordinate_data.local_pos_list),
-                                                              frame_skips),
-                                                 interval=10,
-                                                 repeat=True)
-        else:
-            self.coordinate_anim.event_source.start()
-        self.canvas.draw_idle()
+        """現在のフレームから、経過時間に合わせてフレームを進める。描画が間に合わない場合はフレームを飛ばす"""
+        if self.play_job is not None or self.playback_clock is None or self.previewing:
+            return
+        self.playback_clock.start(frame=self.coordinate_drawer.current_frame, now=time.perf_counter())
+        self.play_job = self.master.after(0, self._play_next_frame)
 
     def stop(self):
-        if self.coordinate_anim is not None:
-            self.coordinate_anim.event_source.stop()
+        if self.play_job is not None:
+            self.master.after_cancel(self.play_job)
+            self.play_job = None
+        if self.playback_clock is not None:
+            self.playback_clock.stop()
+
+    def _play_next_frame(self):
+        now = time.perf_counter()
+        frame = self.playback_clock.tick(now)
+        if frame is not None:
+            self.update_animation_and_graphs(frame)
+            self.playback_clock.record_render(now, time.perf_counter())
+        if now - self.playback_status_time > PLAYBACK_STATUS_INTERVAL:
+            self.playback_status_time = now
+            self._update_playback_status()
+
+        # 次のフレームの時刻まで待つ
+        delay = self.playback_clock.delay_until_next_frame(time.perf_counter())
+        self.play_job = self.master.after(int(delay * 1000), self._play_next_frame)
+
+    def _on_slider_moved(self, value):
+        if self.coordinate_drawer is None or self.previewing:
+            return  # 読み込みが終わるまでは描画しない
+        self.scrub_scheduler.request(int(float(value)))
+
+    def _scrub_to(self, frame: int):
+        if self.playback_clock.is_playing:
+            self.playback_clock.seek(frame=frame, now=time.perf_counter())
+        self.update_animation_and_graphs(frame)
+        if not self.playback_clock.is_playing:
+            self._update_playback_status()
+
+    def _seek(self, frame: int):
+        """スライダーを動かしてframeを表示する"""
+        self.slider.set(frame)
+        self.scrub_scheduler.cancel()
+        self._scrub_to(frame)
+
+    def _on_speed_selected(self, event):
+        self.playback_speed = float(self.speed_combobox.get())
+        if self.playback_clock is not None:
+            self.playback_clock.set_speed(self.playback_speed, now=time.perf_counter())
+            self._update_playback_status()
+
+    def _set_loop_start(self):
+        """現在のフレームをループ範囲の先頭にする"""
+        if self.playback_clock is None or self.previewing:
+            return
+        start = self.coordinate_drawer.current_frame
+        stop = self.playback_clock.loop_range[1]
+        self._set_loop_range(start, stop if start < stop else None)
+
+    def _set_loop_end(self):
+        """現在のフレームをループ範囲の最後にする"""
+        if self.playback_clock is None or self.previewing:
+            return
+        stop = self.coordinate_drawer.current_frame + 1
+        start = self.playback_clock.loop_range[0]
+        self._set_loop_range(start if start < stop else 0, stop)
+
+    def _reset_loop_range(self):
+        if self.playback_clock is not None:
+            self._set_loop_range(0, None)
+
+    def _set_loop_range(self, start: int, stop: int = None):
+        self.playback_clock.set_loop_range(start, stop, now=time.perf_counter())
+        self._update_playback_status()
+
+    def _set_loop_to_selection(self):
+        """グラフ上で選択したフレーム範囲をループ範囲にする"""
+        if self.playback_clock is not None and self.frame_range is not None:
+            self._set_loop_range(*self.frame_range)
+
+    def _on_frame_range_selected(self, frame_range, finished: bool):
+        """ドラッグ中も選択範囲の表示と統計量を更新する (統計量は範囲の長さによらず一定時間で求まる)"""
+        self.frame_range = frame_range
+        self.motion_figure.set_selection(frame_range)
+        self.blit_manager.update()
+        self._update_range_statistics()
+
+    def _update_range_statistics(self):
+        if self.frame_range is None or not self.graph_statistics:
+            self.range_statistics_label.config(text="グラフ上をドラッグしてフレーム範囲を選択すると統計量を表示します")
+            return
+        start, stop = self.frame_range
+        lines = [f"frame {start}-{stop - 1} ({(stop - start) / self.coordinate_data.fps:.2f} s)"]
+        for graph_statistics in self.graph_statistics:
+            for legend, statistics in zip(graph_statistics.legends, graph_statistics.query(start, stop)):
+                name = graph_statistics.graph_data.display_name + (f" {legend}" if legend else "")
+                if statistics.count == 0:
+                    lines.append(f"{name}: no data")
+                    continue
+                lines.append(f"{name}: mean {statistics.mean:8.2f}  std {statistics.std:7.2f}"
+                             f"  min {statistics.min:8.2f} (frame {statistics.argmin})"
+                             f"  max {statistics.max:8.2f} (frame {statistics.argmax})")
+        self.range_statistics_label.config(text="\n".join(lines))
+
+    def _start_pose_indexing(self, coordinate_data: CoordinateData, file_name: str):
+        """coordinate_dataの類似ポーズの検索用の索引の作成をワーカースレッドで開始する (作成済み・作成中の場合は何もしない)"""
+        if coordinate_data is self.pose_index_source:
+            return
+        if self.pose_index_loader is not None:
+            self.pose_index_loader.cancel()
+        self.pose_index = None
+        self.pose_index_source = coordinate_data
+        self.pose_search_button.config(state=tk.DISABLED, text=f"{POSE_SEARCH_BUTTON_TEXT} (索引を作成中)")
+        self.pose_index_loader = BackgroundLoader(widget=self.master,
+                                                  load=functools.partial(self._index_poses, coordinate_data))
+        self.pose_index_loader.start(os.path.abspath(file_name),
+                                     on_progress=self._on_pose_indexing_progress,
+                                     on_done=self._on_pose_indexing_done,
+                                     on_error=self._on_pose_indexing_error)
+
+    def _index_poses(self, coordinate_data: CoordinateData, take_name: str, on_progress,
+                     cancel_event: threading.Event):
+        """ワーカースレッドで実行する索引の作成処理。遅延読み込みしたファイルは先頭から順に変換しながら作成する"""
+        def report(fraction: float):
+            if cancel_event.is_set():
+                raise LoadingCancelled("pose_index")
+            on_progress(fraction)
+
+        return self.pose_search_usecase.index_motion(coordinate_data, take_name, on_progress=report)
+
+    def _on_pose_indexing_progress(self, fraction: float):
+        self.pose_search_button.config(text=f"{POSE_SEARCH_BUTTON_TEXT} (索引を作成中 {fraction:.0%})")
+
+    def _on_pose_indexing_done(self, pose_index):
+        self.pose_index = pose_index
+        self.pose_search_button.config(state=tk.NORMAL, text=POSE_SEARCH_BUTTON_TEXT)
+
+    def _on_pose_indexing_error(self, error: Exception):
+        print(f"failed to index poses: {type(error).__name__}: {error}")
+        self.pose_search_button.config(text=f"{POSE_SEARCH_BUTTON_TEXT} (索引を作成できません)")
+
+    @staticmethod
+    def _load_pose_library(index_dir: str, on_progress, cancel_event: threading.Event):
+        """ワーカースレッドで実行するライブラリの索引の読み込み処理"""
+        return PoseSearchUsecase.load_library(index_dir)
+
+    def _on_pose_library_loaded(self, pose_library):
+        self.pose_library = pose_library
+        self.pose_library_status = None
+
+    def _on_pose_library_error(self, error: Exception):
+        print(f"failed to load pose library: {type(error).__name__}: {error}")
+        self.pose_library_status = "索引を読み込めません"
+
+    def _search_similar_poses(self):
+        """表示中のフレームと似たポーズを、表示中のファイルと(設定されていれば)ライブラリから検索して一覧表示する"""
+        if self.pose_index is None or self.loading_dialog is not None or self.previewing:
+            return  # 読み込みと索引の作成が終わるまでは検索しない
+        frame = self.coordinate_drawer.current_frame
+        take_name = os.path.abspath(self.file_name)
+        sections = [("このファイル", self.pose_search_usecase.search_frame(
+            self.pose_index, self.coordinate_data, frame, take_name=take_name, k=POSE_SEARCH_RESULTS))]
+        if POSE_LIBRARY_INDEX_DIR is not None:
+            if self.pose_library is None:
+                sections.append(("ライブラリ", self.pose_library_status))
+            elif not self.pose_library[0].accepts(self.coordinate_data):
+                sections.append(("ライブラリ", f"関節数が索引 ({self.pose_library[0].n_joints}) と異なるため検索できません"))
+            else:
+                library_usecase, library_index = self.pose_library
+                sections.append(("ライブラリ", library_usecase.search_frame(
+                    library_index, self.coordinate_data, frame, take_name=take_name, k=POSE_SEARCH_RESULTS)))
+
+        if self.pose_search_dialog is None or not self.pose_search_dialog.is_open:
+            self.pose_search_dialog = PoseSearchDialog(self.master, on_select=self._on_pose_match_selected)
+        self.pose_search_dialog.show(f"{os.path.basename(self.file_name)} のフレーム {frame} と似たポーズ", sections)
+
+    def _on_pose_match_selected(self, match: PoseMatch):
+        if match.take == os.path.abspath(self.file_name):
+            self._seek(match.frame)
+            return
+        # 他のファイルは読み込みが終わってからそのフレームを表示する
+        self.loading_bvh(file_name=match.take, seek_frame=match.frame)
+
+    def _update_playback_status(self):
+        statistics = self.playback_clock.statistics
+        start, stop = self.playback_clock.loop_range
+        self.playback_status_label.config(text=f"{statistics.achieved_fps:5.1f} / {statistics.target_fps:5.1f} fps"
+                                               f"  drop: {statistics.dropped_frames}"
+                                               f"  hold: {statistics.held_frames}"
+                                               f"  loop: {start}-{stop - 1}"
+                                               f"  scrub: {self.scrub_scheduler.statistics.last_latency * 1000:.1f} ms")
 
     def update_animation_and_graphs(self, frame):
         """frameに応じて再描画"""
         frame = int(float(frame))
 
-        # 現在のフレームを更新
-        self.coordinate_drawer.current_frame = frame
-
-        # スティックピクチャのアップデート
-        self.coordinate_drawer.draw_local_pos_at_specific_frame(frame=frame)
-
-        # グラフのアップデート
-        # 描画が重い場合は、下記をコメントアウトしてグラフのアップデートを制限することでやや軽くなる
-        for drawer in self.graph_drawer_list:
-            drawer.draw_graph_data_at_specific_frame(frame=frame)
+        # スティックピクチャとグラフのアップデート (グラフはフレーム位置の縦線だけを更新する)
+        self.motion_figure.draw_at_specific_frame(frame=frame)
+        if self.tk_skeleton_drawer is not None:
+            self.tk_skeleton_drawer.draw_local_pos_at_specific_frame(frame=frame)
 
-        self.canvas.draw_idle()
+        # 変化した内容だけを画面に反映する
+        self.blit_manager.update()
 
 
-root = tk.Tk()
-app = BvhMotionViewerApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = BvhMotionViewerApp(root)
+    root.mainloop()
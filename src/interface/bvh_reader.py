@@ -1,3 +1,5 @@
+from typing import Iterator
+
 import numpy as np
 
 from src.interface.parser import Bvh
@@ -6,9 +8,12 @@ from src.model.skeleton_data import SkeletonData
 
 class BvhReader:
 
-    def __init__(self, file_name: str):
-        with open(file_name) as f:
-            self.bvh_data: Bvh = Bvh(f.read())
+    def __init__(self, file_name: str = None, data: str = None):
+        """file_nameのファイル、またはBVH形式の文字列dataを読み込む"""
+        if data is None:
+            with open(file_name) as f:
+                data = f.read()
+        self.bvh_data: Bvh = Bvh(data)
 
     @staticmethod
     def _separate_angles(frames, joints, joints_saved_channels):
@@ -60,18 +65,34 @@ class BvhReader:
 
         pass
 
-    def create_skeleton_data(self) -> SkeletonData:
+    @property
+    def n_frames(self) -> int:
+        return len(self.bvh_data.motion)
+
+    def read_frames(self, start: int, stop: int) -> np.ndarray:
+        """[start, stop) のフレーム shape: (stop - start, nchannels)"""
+        return self.bvh_data.motion[max(0, start):stop]
+
+    def iter_skeleton_data(self, chunk_size: int) -> Iterator[SkeletonData]:
+        """先頭から順にchunk_sizeフレームずつのスケルトンデータを返す"""
+        for start in range(0, self.n_frames, chunk_size):
+            yield BvhReader.create_skeleton_data(self, frames=self.read_frames(start, start + chunk_size))
+
+    def create_skeleton_data(self, frames: np.ndarray = None) -> SkeletonData:
+        """frames (shape: (nframes, nchannels)) を指定しない場合は全フレームのスケルトンデータを作成する"""
         # get the names of the joints
         joints = self.bvh_data.get_joints_names()
 
-        # this contains all frames data.
-        frames = np.array(self.bvh_data.frames).astype('float32')
+        # this contains all frames data. shape: (nframes, nchannels), float32
+        if frames is None:
+            frames = self.bvh_data.motion
 
         # determine the structure of the skeleton and how the data was saved
         joints_offsets = {}
         joints_hierarchy = {}
         joints_saved_channels = {}
-        for joint in joints:
+        parent_indices = self.bvh_data.parent_indices
+        for joint_index, joint in enumerate(joints):
             # get offsets. This is the length of skeleton body parts
             joints_offsets[joint] = np.array(self.bvh_data.joint_offset(joint))
 
@@ -79,17 +100,13 @@ class BvhReader:
             # the order of rotation is important
             joints_saved_channels[joint] = self.bvh_data.joint_channels(joint)
 
-            # determine the hierarcy of each joint.
-            joint_hierarchy = []
-            parent_joint = joint
-            while True:
-                parent_name = self.bvh_data.joint_parent(parent_joint)
-                if parent_name is None: break
-
-                joint_hierarchy.append(parent_name.name)
-                parent_joint = parent_name.name
-
-            joints_hierarchy[joint] = joint_hierarchy
+            # determine the hierarcy of each joint. parents always precede their children.
+            parent_index = parent_indices[joint_index]
+            if parent_index == -1:
+                joints_hierarchy[joint] = []
+            else:
+                parent_name = joints[parent_index]
+                joints_hierarchy[joint] = [parent_name] + joints_hierarchy[parent_name]
 
         # seprate the rotation angles and the positions of joints
         joints_rotations, joints_saved_angles = self._separate_angles(frames, joints, joints_saved_channels)
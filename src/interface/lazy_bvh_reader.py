@@ -0,0 +1,142 @@
+import mmap
+import os
+import re
+
+import numpy as np
+
+from src.interface.bvh_reader import BvhReader
+from src.interface.parser import Bvh
+from src.model.skeleton_data import SkeletonData
+
+_FRAME_TIME_PATTERN = re.compile(rb'^[ \t]*Frame Time:[^\n]*\n?', re.MULTILINE)
+_HEADER_BLOCK_SIZE = 64 * 1024
+_SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+_WHITESPACE = b' \t\r\n'
+
+
+class LazyBvhReader(BvhReader):
+    """HIERARCHYだけを解析し、MOTIONのフレームは必要な範囲だけmmap経由で読み込む
+
+    MOTIONの各フレーム行の先頭のバイト位置をインデックスとして保持する (1フレームあたり8バイト)。
+    インデックスはpersist_index=Trueの場合、ファイルの横 (<file_name>.frame_index.npz) に保存し、
+    次回はファイルのサイズと更新時刻が同じであれば再利用する。
+    """
+
+    def __init__(self, file_name: str, persist_index: bool = True):
+        self.file_name: str = file_name
+        self._file = open(file_name, mode="rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空のファイルはmmapできない
+            self._file.close()
+            raise ValueError(f"{file_name} is empty")
+
+        self._motion_start: int = self._find_motion_start()
+        self.bvh_data: Bvh = Bvh(self._mmap[:self._motion_start].decode("utf-8"), header_only=True)
+        self.nchannels: int = self.bvh_data.motion.shape[1]
+        self.frame_starts, self._motion_end = self._load_or_build_index(persist_index)
+        declared_frames = self.bvh_data.declared_nframes
+        if declared_frames is not None and declared_frames != self.n_frames:
+            self.close()
+            raise ValueError(f"{file_name} has {self.n_frames} frame lines but the header declares {declared_frames}")
+
+    def _find_motion_start(self) -> int:
+        """'Frame Time:' 行の次のバイト位置"""
+        end = 0
+        while True:
+            end = min(end + _HEADER_BLOCK_SIZE, len(self._mmap))
+            found = _FRAME_TIME_PATTERN.search(self._mmap, 0, end)
+            # 行の途中で切れていないことを確認する
+            if found is not None and (found.group().endswith(b"\n") or end == len(self._mmap)):
+                return found.end()
+            if end == len(self._mmap):
+                raise ValueError(f"{self.file_name} has no MOTION section")
+
+    @property
+    def index_file_name(self) -> str:
+        return f"{self.file_name}.frame_index.npz"
+
+    def _load_or_build_index(self, persist_index: bool):
+        stat = os.stat(self.file_name)
+        if persist_index and os.path.exists(self.index_file_name):
+            try:
+                with np.load(self.index_file_name) as index:
+                    if int(index["size"]) == stat.st_size and int(index["mtime_ns"]) == stat.st_mtime_ns \
+                            and int(index["motion_start"]) == self._motion_start:
+                        return index["frame_starts"], int(index["motion_end"])
+            except (OSError, ValueError, KeyError):
+                pass
+
+        frame_starts, motion_end = self._build_index()
+        if persist_index:
+            try:
+                with open(self.index_file_name, mode="wb") as f:
+                    np.savez(f, frame_starts=frame_starts, motion_end=motion_end, motion_start=self._motion_start,
+                             size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            except OSError:
+                # 書き込めない場所にあるファイルでも読み込みはできるようにする
+                pass
+        return frame_starts, motion_end
+
+    def _build_index(self):
+        """MOTIONの各フレーム行の先頭のバイト位置を、ファイル全体を読み込まずにブロックごとに走査して求める"""
+        line_starts = [np.array([self._motion_start], dtype=np.int64)]
+        for block_start in range(self._motion_start, len(self._mmap), _SCAN_BLOCK_SIZE):
+            block = np.frombuffer(self._mmap, dtype=np.uint8, offset=block_start,
+                                  count=min(_SCAN_BLOCK_SIZE, len(self._mmap) - block_start))
+            line_starts.append(np.flatnonzero(block == ord("\n")).astype(np.int64) + block_start + 1)
+            del block
+            self._release(block_start, block_start + _SCAN_BLOCK_SIZE)
+        line_starts = np.concatenate(line_starts)
+        line_ends = np.append(line_starts[1:], len(self._mmap))
+
+        # 空行 (改行・空白のみの行) を除く。長い行は数値を含むので、短い行だけ中身を確認する
+        is_frame = line_ends - line_starts > 4
+        for i in np.flatnonzero(~is_frame):
+            is_frame[i] = bool(self._mmap[line_starts[i]:line_ends[i]].strip(_WHITESPACE))
+        frame_starts = line_starts[is_frame]
+        motion_end = int(line_ends[is_frame][-1]) if len(frame_starts) else self._motion_start
+        return frame_starts, motion_end
+
+    def _release(self, start: int, end: int):
+        """読み込み済みの範囲のページを常駐させないようにする (対応しているOSのみ)"""
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        start = int(start) - int(start) % mmap.PAGESIZE
+        end = min(int(end), len(self._mmap))
+        if start < end:
+            self._mmap.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.frame_starts)
+
+    def read_frames(self, start: int, stop: int) -> np.ndarray:
+        """[start, stop) のフレームを読み込む shape: (stop - start, nchannels), float32"""
+        start = max(0, start)
+        stop = min(self.n_frames, stop)
+        if start >= stop:
+            return np.empty((0, self.nchannels), dtype=np.float32)
+        end = self.frame_starts[stop] if stop < self.n_frames else self._motion_end
+        text = self._mmap[self.frame_starts[start]:end].decode("ascii")
+        self._release(self.frame_starts[start], end)
+        frames = Bvh._parse_motion(text, self.nchannels)
+        if len(frames) != stop - start:
+            raise ValueError(f"frames {start}-{stop} of {self.file_name} are malformed")
+        return frames
+
+    def create_skeleton_data(self, start: int = 0, stop: int = None) -> SkeletonData:
+        """[start, stop) のフレームのスケルトンデータを作成する"""
+        stop = self.n_frames if stop is None else stop
+        return super().create_skeleton_data(frames=self.read_frames(start, stop))
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,4 +1,10 @@
 import re
+import warnings
+
+import numpy as np
+
+_MOTION_PATTERN = re.compile(r'^[ \t]*MOTION[ \t]*\r?$', re.MULTILINE)
+_FRAME_TIME_PATTERN = re.compile(r'^[ \t]*Frame Time:.*$\n?', re.MULTILINE)
 
 
 class BvhNode:
@@ -43,27 +49,32 @@ class BvhNode:
 
 class Bvh:
 
-    def __init__(self, data):
+    def __init__(self, data, header_only=False):
+        """header_only: data is only the HIERARCHY and MOTION header; the motion array is left empty."""
         self.data = data
+        self.header_only = header_only
         self.root = BvhNode()
-        self.frames = []
+        self.motion = np.empty((0, 0), dtype=np.float32)
+        self.parent_indices = np.empty(0, dtype=np.int64)  # index of the parent joint, -1 for the root
+        self.channel_starts = np.empty(0, dtype=np.int64)  # first motion column of each joint
+        self._joints = []
+        self._joint_indices = {}
+        self._joint_offsets = []
+        self._joint_channels = []
+        self._channel_columns = []
         self.tokenize()
 
     def tokenize(self):
-        first_round = []
-        accumulator = ''
-        for char in self.data:
-            if char not in ('\n', '\r'):
-                accumulator += char
-            elif accumulator:
-                    first_round.append(re.split('\\s+', accumulator.strip()))
-                    accumulator = ''
+        """Split HIERARCHY from MOTION once, build the node tree from the header lines
+        and parse the numeric block in bulk into a (nframes, nchannels) float32 array.
+        """
+        header, body = self._split_sections(self.data)
+
         node_stack = [self.root]
-        frame_time_found = False
         node = None
-        for item in first_round:
-            if frame_time_found:
-                self.frames.append(item)
+        for line in header.splitlines():
+            item = line.split()
+            if not item:
                 continue
             key = item[0]
             if key == '{':
@@ -73,8 +84,90 @@ class Bvh:
             else:
                 node = BvhNode(item)
                 node_stack[-1].add_child(node)
-            if item[0] == 'Frame' and item[1] == 'Time:':
-                frame_time_found = True
+
+        nchannels = self._build_joint_tables()
+        if self.header_only:
+            self.motion = np.empty((0, nchannels), dtype=np.float32)
+        else:
+            self.motion = self._parse_motion(body, nchannels, self.declared_nframes)
+
+    @property
+    def declared_nframes(self):
+        """The number of frames given by the 'Frames:' line, or None if the header does not have one."""
+        try:
+            return self.nframes
+        except (LookupError, IndexError, ValueError):
+            return None
+
+    def _build_joint_tables(self):
+        """Build the lookup tables used by the joint accessors once, and return the number of channels."""
+        joints = []
+
+        def iterate_joints(joint):
+            joints.append(joint)
+            for child in joint.filter('JOINT'):
+                iterate_joints(child)
+        roots = list(self.root.filter('ROOT'))
+        if roots:
+            iterate_joints(roots[0])
+
+        node_indices = {id(joint): index for index, joint in enumerate(joints)}
+        parent_indices = []
+        channel_starts = []
+        nchannels = 0
+        for index, joint in enumerate(joints):
+            self._joint_indices.setdefault(joint.name, index)
+            parent_indices.append(node_indices.get(id(joint.parent), -1))
+            channel_starts.append(nchannels)
+
+            offset = joint['OFFSET']
+            self._joint_offsets.append((float(offset[0]), float(offset[1]), float(offset[2])))
+            channels = joint['CHANNELS'][1:]
+            self._joint_channels.append(channels)
+            # the first occurrence wins, as with list.index
+            self._channel_columns.append({channel: i for i, channel in reversed(list(enumerate(channels)))})
+            nchannels += len(channels)
+
+        self._joints = joints
+        self.parent_indices = np.array(parent_indices, dtype=np.int64)
+        self.channel_starts = np.array(channel_starts, dtype=np.int64)
+        return nchannels
+
+    @staticmethod
+    def _split_sections(data):
+        """Return (header, body) where header ends with the 'Frame Time:' line."""
+        motion = _MOTION_PATTERN.search(data)
+        if motion is None:
+            return data, ''
+        frame_time = _FRAME_TIME_PATTERN.search(data, motion.end())
+        if frame_time is None:
+            return data, ''
+        return data[:frame_time.end()], data[frame_time.end():]
+
+    @staticmethod
+    def _parse_motion(body, nchannels, nframes=None):
+        """Parse the motion block. If nframes is given, the block must have exactly nframes * nchannels values."""
+        if nchannels == 0 or not body.strip():
+            values = np.empty(0, dtype=np.float32)
+        else:
+            with warnings.catch_warnings():
+                # a malformed value stops the parse early, which is detected by the size checks below
+                warnings.simplefilter('ignore', DeprecationWarning)
+                values = np.fromstring(body, dtype=np.float32, sep=' ')
+        if nchannels == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        if values.size % nchannels != 0:
+            raise ValueError('motion data does not match the number of channels ({} values for {} channels)'
+                             .format(values.size, nchannels))
+        if nframes is not None and values.size != nframes * nchannels:
+            raise ValueError('motion data does not match the number of frames ({} values for {} frames '
+                             'of {} channels)'.format(values.size, nframes, nchannels))
+        return values.reshape(-1, nchannels)
+
+    @property
+    def frames(self):
+        """Compatibility view of the motion data: one row of channel values per frame."""
+        return self.motion
 
     def search(self, *items):
         found_nodes = []
@@ -94,113 +187,80 @@ class Bvh:
         return found_nodes
 
     def get_joints(self):
-        joints = []
-
-        def iterate_joints(joint):
-            joints.append(joint)
-            for child in joint.filter('JOINT'):
-                iterate_joints(child)
-        iterate_joints(next(self.root.filter('ROOT')))
-        return joints
+        return list(self._joints)
 
     def get_joints_names(self):
-        joints = []
-
-        def iterate_joints(joint):
-            joints.append(joint.value[1])
-            for child in joint.filter('JOINT'):
-                iterate_joints(child)
-        iterate_joints(next(self.root.filter('ROOT')))
-        return joints
+        return [joint.name for joint in self._joints]
 
     def joint_direct_children(self, name):
         joint = self.get_joint(name)
         return [child for child in joint.filter('JOINT')]
 
     def get_joint_index(self, name):
-        return self.get_joints().index(self.get_joint(name))
+        try:
+            return self._joint_indices[name]
+        except KeyError:
+            raise LookupError('joint not found')
 
     def get_joint(self, name):
-        found = self.search('ROOT', name)
-        if not found:
-            found = self.search('JOINT', name)
-        if found:
-            return found[0]
-        raise LookupError('joint not found')
+        return self._joints[self.get_joint_index(name)]
 
     def joint_offset(self, name):
-        joint = self.get_joint(name)
-        offset = joint['OFFSET']
-        return (float(offset[0]), float(offset[1]), float(offset[2]))
+        return self._joint_offsets[self.get_joint_index(name)]
 
     def joint_channels(self, name):
-        joint = self.get_joint(name)
-        return joint['CHANNELS'][1:]
+        return list(self._joint_channels[self.get_joint_index(name)])
 
     def get_joint_channels_index(self, joint_name):
-        index = 0
-        for joint in self.get_joints():
-            if joint.value[1] == joint_name:
-                return index
-            index += int(joint['CHANNELS'][0])
-        raise LookupError('joint not found')
+        return int(self.channel_starts[self.get_joint_index(joint_name)])
 
     def get_joint_channel_index(self, joint, channel):
-        channels = self.joint_channels(joint)
-        if channel in channels:
-            channel_index = channels.index(channel)
-        else:
-            channel_index = -1
-        return channel_index
+        return self._channel_columns[self.get_joint_index(joint)].get(channel, -1)
 
     def frame_joint_channel(self, frame_index, joint, channel, value=None):
         joint_index = self.get_joint_channels_index(joint)
         channel_index = self.get_joint_channel_index(joint, channel)
         if channel_index == -1 and value is not None:
             return value
-        return float(self.frames[frame_index][joint_index + channel_index])
+        return float(self.motion[frame_index, joint_index + channel_index])
 
     def frame_joint_channels(self, frame_index, joint, channels, value=None):
-        values = []
         joint_index = self.get_joint_channels_index(joint)
+        values = []
         for channel in channels:
             channel_index = self.get_joint_channel_index(joint, channel)
             if channel_index == -1 and value is not None:
                 values.append(value)
             else:
-                values.append(
-                    float(
-                        self.frames[frame_index][joint_index + channel_index]
-                    )
-                )
+                values.append(float(self.motion[frame_index, joint_index + channel_index]))
         return values
 
     def frames_joint_channels(self, joint, channels, value=None):
-        all_frames = []
+        """Return the given channels of a joint for all frames as a (nframes, len(channels)) array.
+
+        A view of the motion data is returned when the channels are stored in adjacent columns.
+        """
         joint_index = self.get_joint_channels_index(joint)
-        for frame in self.frames:
-            values = []
-            for channel in channels:
-                channel_index = self.get_joint_channel_index(joint, channel)
-                if channel_index == -1 and value is not None:
-                    values.append(value)
-                else:
-                    values.append(
-                        float(frame[joint_index + channel_index]))
-            all_frames.append(values)
-        return all_frames
+        channel_indices = np.array([self.get_joint_channel_index(joint, channel) for channel in channels],
+                                   dtype=np.int64)
+        missing = channel_indices == -1
+        columns = joint_index + channel_indices
+        if value is not None and missing.any():
+            values = self.motion[:, np.where(missing, 0, columns)]
+            values[:, missing] = value
+            return values
+        if len(columns) and np.all(np.diff(columns) == 1):
+            return self.motion[:, columns[0]:columns[-1] + 1]
+        return self.motion[:, columns]
 
     def joint_parent(self, name):
-        joint = self.get_joint(name)
-        if joint.parent == self.root:
+        parent_index = self.joint_parent_index(name)
+        if parent_index == -1:
             return None
-        return joint.parent
+        return self._joints[parent_index]
 
     def joint_parent_index(self, name):
-        joint = self.get_joint(name)
-        if joint.parent == self.root:
-            return -1
-        return self.get_joints().index(joint.parent)
+        return int(self.parent_indices[self.get_joint_index(name)])
 
     @property
     def nframes(self):
@@ -1,5 +1,7 @@
 import dataclasses
-from typing import List, Dict
+import json
+from collections.abc import Mapping, Sequence
+from typing import List, Dict, Iterator, Optional
 
 from dataclasses_json import dataclass_json
 import numpy as np
@@ -20,16 +22,122 @@ class SkeletonData:
     fps: int
 
 
-@dataclass_json
-@dataclasses.dataclass
+class JointPositionsView(Mapping):
+    """1フレーム分の関節位置を関節名で参照する読み取り専用のビュー"""
+    __slots__ = ("_positions", "_joint_index")
+
+    def __init__(self, positions: np.ndarray, joint_index: Dict[str, int]):
+        self._positions = positions  # shape: (J, 3)
+        self._joint_index = joint_index
+
+    def __getitem__(self, joint_name: str) -> np.ndarray:
+        return self._positions[self._joint_index[joint_name]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._joint_index)
+
+    def __len__(self) -> int:
+        return len(self._joint_index)
+
+
+class FramePositionsView(Sequence):
+    """(F, J, 3)の位置配列を、従来のフレームごとの辞書のリストとして参照する読み取り専用のビュー"""
+    __slots__ = ("_positions", "_joint_index")
+
+    def __init__(self, positions: np.ndarray, joint_index: Dict[str, int]):
+        self._positions = positions  # shape: (F, J, 3)
+        self._joint_index = joint_index
+
+    def __getitem__(self, frame):
+        if isinstance(frame, slice):
+            return FramePositionsView(self._positions[frame], self._joint_index)
+        return JointPositionsView(self._positions[frame], self._joint_index)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+@dataclasses.dataclass(eq=False)
 class CoordinateData:
-    """SkeletonDataを座標系の位置情報に変換したもの"""
-    world_pos_list: List[Dict[str, np.array]]  # 絶対座標系での位置情報  0=x, 1=z, 2=y
-    local_pos_list: List[Dict[str, np.array]]  # ローカル座標系での位置情報
+    """SkeletonDataを座標系の位置情報に変換したもの
+
+    位置情報は (フレーム数, 関節数, 3) の連続したfloat32配列として保持する。
+    関節の並びはjoint_namesの順で、joint_indexで関節名から参照できる。
+    """
+    __slots__ = ("world_pos", "local_pos", "joints_hierarchy", "joint_names", "fps", "joint_index", "parent_indices")
+    world_pos: np.ndarray  # 絶対座標系での位置情報 shape: (F, J, 3)  0=x, 1=z, 2=y
+    local_pos: np.ndarray  # ローカル座標系での位置情報 shape: (F, J, 3)
     joints_hierarchy: Dict[str, List[str]]  # the hierarchy of each joint
     joint_names: List[str]  # the names of the joints
     fps: int
 
+    def __post_init__(self):
+        self.world_pos = np.ascontiguousarray(self.world_pos, dtype=np.float32)
+        self.local_pos = np.ascontiguousarray(self.local_pos, dtype=np.float32)
+        self.joint_index: Dict[str, int] = {name: i for i, name in enumerate(self.joint_names)}
+        # 親関節のindex。親がない関節は-1
+        self.parent_indices: np.ndarray = np.array(
+            [self.joint_index[self.joints_hierarchy[name][0]] if self.joints_hierarchy[name] else -1
+             for name in self.joint_names], dtype=np.int64)
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.local_pos)
+
+    def local_pos_lim(self):
+        """ローカル座標系での位置の最小値・最大値 (軸の表示域の計算用)。フレームがない場合は-1〜1"""
+        if self.n_frames == 0:
+            return np.full(3, -1.0, dtype=np.float32), np.full(3, 1.0, dtype=np.float32)
+        return np.amin(self.local_pos, axis=(0, 1)), np.amax(self.local_pos, axis=(0, 1))
+
+    @property
+    def world_pos_list(self) -> FramePositionsView:
+        """絶対座標系での位置情報 (フレームごとの関節名->位置の読み取り専用ビュー)"""
+        return FramePositionsView(_read_only(self.world_pos), self.joint_index)
+
+    @property
+    def local_pos_list(self) -> FramePositionsView:
+        """ローカル座標系での位置情報 (フレームごとの関節名->位置の読み取り専用ビュー)"""
+        return FramePositionsView(_read_only(self.local_pos), self.joint_index)
+
+    @classmethod
+    def from_pos_list(cls, world_pos_list: List[Dict[str, np.array]], local_pos_list: List[Dict[str, np.array]],
+                      joints_hierarchy: Dict[str, List[str]], joint_names: List[str], fps: int) -> "CoordinateData":
+        """フレームごとの辞書のリストから作成する"""
+        world_pos = np.array([[pos[name] for name in joint_names] for pos in world_pos_list], dtype=np.float32)
+        local_pos = np.array([[pos[name] for name in joint_names] for pos in local_pos_list], dtype=np.float32)
+        return cls(world_pos=world_pos.reshape(-1, len(joint_names), 3),
+                   local_pos=local_pos.reshape(-1, len(joint_names), 3),
+                   joints_hierarchy=joints_hierarchy,
+                   joint_names=joint_names,
+                   fps=fps)
+
+    def to_json(self, **kwargs) -> str:
+        """従来のフレームごとの辞書のリスト形式のjsonに変換する"""
+        return json.dumps({
+            "world_pos_list": [dict(zip(self.joint_names, pos.tolist())) for pos in self.world_pos],
+            "local_pos_list": [dict(zip(self.joint_names, pos.tolist())) for pos in self.local_pos],
+            "joints_hierarchy": self.joints_hierarchy,
+            "joint_names": self.joint_names,
+            "fps": self.fps,
+        }, **kwargs)
+
+    @classmethod
+    def from_json(cls, s: str) -> "CoordinateData":
+        """to_jsonの出力から作成する"""
+        data = json.loads(s)
+        return cls.from_pos_list(world_pos_list=data["world_pos_list"],
+                                 local_pos_list=data["local_pos_list"],
+                                 joints_hierarchy=data["joints_hierarchy"],
+                                 joint_names=data["joint_names"],
+                                 fps=data["fps"])
+
 
 @dataclasses.dataclass
 class GraphData:
@@ -46,3 +154,15 @@ class MultiPlotGraphData(GraphData):
     display_name: str
     graph_key: str
     legends: List[str]
+
+
+@dataclasses.dataclass
+class MotionData:
+    """1つのbvhファイルを読み込み、変換した結果一式
+
+    巨大なファイルを遅延読み込みした場合、skeleton_dataはNone、
+    coordinate_dataは必要なフレームだけを変換するWindowedCoordinateDataとなる。
+    """
+    skeleton_data: Optional[SkeletonData]
+    coordinate_data: CoordinateData
+    graph_data_list: List[GraphData]
@@ -0,0 +1,85 @@
+import queue
+import threading
+from typing import Callable, Optional
+
+from src.model.skeleton_data import MotionData
+from src.usecase.load_bvh_usecase import LoadingCancelled, LoadingProgress
+
+# ワーカースレッドからの通知を確認する間隔 [ms]
+POLL_INTERVAL = 50
+
+
+class BackgroundLoader:
+    """bvhファイルの読み込みをワーカースレッドで行い、進捗と結果をTkのスレッドに通知する
+
+    ワーカースレッドはqueue.Queueに (読み込みの番号, 種類, 内容) を入れ、Tkのスレッドはafterで定期的に取り出してコールバックを呼ぶ。
+    新しい読み込みを開始すると実行中の読み込みは中止し、以降の通知は捨てる。
+    キャッシュなどを同時に操作しないよう、ワーカースレッドは前の読み込みが中止されるのを待ってから読み込みを始める。
+    """
+
+    def __init__(self, widget, load: Callable[..., MotionData], poll_interval: int = POLL_INTERVAL):
+        """loadは load(file_name, on_progress=..., cancel_event=...) の形で呼び出す"""
+        self.widget = widget
+        self.load = load
+        self.poll_interval: int = poll_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._load_id: int = 0
+        self._cancel_event: Optional[threading.Event] = None
+        self._poll_job = None
+        self._on_progress: Optional[Callable[[LoadingProgress], None]] = None
+        self._on_done: Optional[Callable[[MotionData], None]] = None
+        self._on_error: Optional[Callable[[Exception], None]] = None
+
+    @property
+    def is_loading(self) -> bool:
+        return self._cancel_event is not None
+
+    def start(self, file_name: str, on_progress: Callable[[LoadingProgress], None],
+              on_done: Callable[[MotionData], None], on_error: Callable[[Exception], None]):
+        """file_nameの読み込みを開始する。コールバックはTkのスレッドで呼ばれる"""
+        self.cancel()
+        self._load_id += 1
+        self._cancel_event = threading.Event()
+        self._on_progress, self._on_done, self._on_error = on_progress, on_done, on_error
+        worker = threading.Thread(target=self._run, args=(self._load_id, file_name, self._cancel_event),
+                                  name=f"bvh-loader-{self._load_id}", daemon=True)
+        worker.start()
+        if self._poll_job is None:
+            self._poll_job = self.widget.after(self.poll_interval, self._poll)
+
+    def cancel(self):
+        """実行中の読み込みを中止する"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def _run(self, load_id: int, file_name: str, cancel_event: threading.Event):
+        with self._lock:
+            try:
+                motion_data = self.load(file_name,
+                                        on_progress=lambda progress: self._queue.put((load_id, "progress", progress)),
+                                        cancel_event=cancel_event)
+            except LoadingCancelled:
+                return
+            except Exception as e:
+                self._queue.put((load_id, "error", e))
+                return
+            self._queue.put((load_id, "done", motion_data))
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                load_id, kind, content = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if load_id != self._load_id or self._cancel_event is None:
+                continue  # 中止した読み込みの通知
+            if kind == "progress":
+                self._on_progress(content)
+            else:
+                self._cancel_event = None
+                (self._on_done if kind == "done" else self._on_error)(content)
+        if self.is_loading or not self._queue.empty():
+            self._poll_job = self.widget.after(self.poll_interval, self._poll)
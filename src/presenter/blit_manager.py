@@ -0,0 +1,78 @@
+from typing import List
+
+from matplotlib.artist import Artist
+
+
+class BlitManager:
+    """キャンバス全体のblitによる描画の管理
+
+    フレームごとに変化するartist(animated)以外の静的な内容をキャンバス全体の背景として保存しておき、
+    更新時は背景を復元してanimatedなartistだけを描画する。
+    キャンバス全体の再描画(3Dの視点変更やズームなど)のたびに背景を保存し直し、リサイズ時は背景を破棄する。
+    enabled=Falseの場合は、更新のたびにキャンバス全体を再描画する(従来の描画)。
+    """
+
+    def __init__(self, canvas, animated_artists: List[Artist] = (), enabled: bool = True):
+        self.canvas = canvas
+        self.enabled: bool = enabled
+        self.background = None
+        self._artists: List[Artist] = []
+        for artist in animated_artists:
+            self.add_artist(artist)
+        self._callback_ids = [self.canvas.mpl_connect("draw_event", self._on_draw),
+                              self.canvas.mpl_connect("resize_event", self._on_resize)]
+
+    def add_artist(self, artist: Artist):
+        """フレームごとに更新するartistを追加"""
+        if artist.figure is not self.canvas.figure:
+            raise ValueError("artist must belong to the figure of the canvas")
+        artist.set_animated(self.enabled)
+        self._artists.append(artist)
+
+    def set_artists(self, animated_artists: List[Artist]):
+        """フレームごとに更新するartistを入れ替える。背景は次のキャンバス全体の再描画で保存し直す"""
+        for artist in self._artists:
+            if artist not in animated_artists:
+                artist.set_animated(False)
+        self._artists = []
+        for artist in animated_artists:
+            self.add_artist(artist)
+        self.background = None
+
+    def disconnect(self):
+        """キャンバスのイベントとの接続を解除"""
+        for callback_id in self._callback_ids:
+            self.canvas.mpl_disconnect(callback_id)
+        self._callback_ids = []
+
+    def _on_draw(self, event):
+        """キャンバス全体の再描画のたびに背景を保存し直し、animatedなartistを描き足す"""
+        if not self.enabled or event is not None and event.canvas is not self.canvas:
+            return
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_animated()
+
+    def _on_resize(self, event):
+        """リサイズ後の背景は保存し直すまで使わない"""
+        self.background = None
+
+    def _draw_animated(self):
+        figure = self.canvas.figure
+        for artist in self._artists:
+            if hasattr(artist, "do_3d_projection"):
+                # 3Dのartistは描画前に現在の視点で投影し直す
+                artist.do_3d_projection()
+            figure.draw_artist(artist)
+
+    def update(self):
+        """animatedなartistの変更を画面に反映する"""
+        if not self.enabled:
+            self.canvas.draw_idle()
+            return
+        if self.background is None:
+            # 背景の保存はdraw_eventで行われる
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
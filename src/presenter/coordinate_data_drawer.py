@@ -1,38 +1,71 @@
-from typing import Dict, List
-
 import numpy as np
-from matplotlib import pyplot as plt
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
 from src.model.skeleton_data import CoordinateData
 
+# 位置情報の (x, z, y) を描画の (x, y, z) に並べ替える
+PLOT_AXES = [0, 2, 1]
+
+
+def calc_bone_indices(coordinate_data: CoordinateData) -> np.ndarray:
+    """描画する骨の (親関節のindex, 子関節のindex) shape: (B, 2)"""
+    bone_indices = []
+    for joint_index in range(1, len(coordinate_data.joint_names)):  # skip root joint
+        parent_index = coordinate_data.parent_indices[joint_index]
+        if coordinate_data.joint_names[parent_index] == "root": continue  # skip connect to root
+        bone_indices.append((parent_index, joint_index))
+    return np.array(bone_indices, dtype=np.int64).reshape(-1, 2)
+
 
 class CoordinateDataDrawer:
+    """スティックピクチャーの描画
+
+    骨(親関節と子関節の組)のindexをテイクごとに一度だけ求めておき、
+    全ての骨を1つのLine3DCollectionとして、フレームごとに線分の配列をまとめて更新する。
+    """
 
     def __init__(self, ax, coordinate_data: CoordinateData):
         self.is_playing: bool = True
         self.ax = ax
         self.current_frame: int = 0
-        self.coordinate_data: CoordinateData = coordinate_data
-        self.local_pos_min, self.local_pos_max = self._calc_lim(pos_list=self.coordinate_data.local_pos_list)
-        self.lines_dict: dict = {}
+        self.coordinate_data: CoordinateData = None
+        self.local_pos_min, self.local_pos_max = None, None
+        self.bone_indices: np.ndarray = None
+        self.bone_collection: Line3DCollection = None
+        self.frame_text = None
+        self._set_coordinate_data(coordinate_data)
 
-    @staticmethod
-    def _calc_lim(pos_list: List[Dict[str, np.array]]):
-        """軸の表示域の計算
-        """
-        local_pos_min_list = []
-        local_pos_max_list = []
-        for local_pos in pos_list:
-            local_pos_min_list.append(np.amin([x for x in local_pos.values()], axis=0))
-            local_pos_max_list.append(np.amax([x for x in local_pos.values()], axis=0))
-        pos_max = np.amax(local_pos_max_list, axis=0)
-        pos_min = np.amin(local_pos_min_list, axis=0)
-        return pos_min, pos_max
+    def _set_coordinate_data(self, coordinate_data: CoordinateData):
+        self.coordinate_data = coordinate_data
+        self.local_pos_min, self.local_pos_max = coordinate_data.local_pos_lim()
+        self.bone_indices = calc_bone_indices(coordinate_data)
+
+    def set_data(self, coordinate_data: CoordinateData):
+        """描画する位置情報を変更する。描画済みの場合は線分と表示範囲だけを更新し、0フレーム目を表示する"""
+        self._set_coordinate_data(coordinate_data)
+        if self.bone_collection is None:
+            return
+        self._set_lim()
+        self.draw_local_pos_at_specific_frame(frame=0)
+
+    def calc_segments(self, frame: int) -> np.ndarray:
+        """フレームの骨の線分 shape: (B, 2, 3)。フレームがない場合は線分なし"""
+        if self.coordinate_data.n_frames == 0:
+            return np.empty((0, 2, 3))
+        local_pos: np.ndarray = self.coordinate_data.local_pos[frame]
+        return local_pos[self.bone_indices][:, :, PLOT_AXES]
 
     def clear(self):
         """描画のクリア
         """
         self.ax.cla()
+        self.bone_collection = None
+        self.frame_text = None
+
+    @property
+    def animated_artists(self) -> list:
+        """フレームごとに更新するartist"""
+        return [self.bone_collection, self.frame_text]
 
     def draw_local_pos_at_initial_frame(self):
         """初回 0フレーム時のスティックピクチャーを描画
@@ -40,38 +73,25 @@ class CoordinateDataDrawer:
         frame = 0
         self.current_frame = frame
 
-        local_pos: Dict[np.array] = self.coordinate_data.local_pos_list[frame]
-        for joint_name in self.coordinate_data.joint_names:
-            if joint_name == self.coordinate_data.joint_names[0]: continue  # skip root joint
-            parent_joint = self.coordinate_data.joints_hierarchy[joint_name][0]
-            if parent_joint == "root": continue  # skip connect to root
-            lines = self.ax.plot(xs=[local_pos[parent_joint][0], local_pos[joint_name][0]],
-                                 zs=[local_pos[parent_joint][1], local_pos[joint_name][1]],
-                                 ys=[local_pos[parent_joint][2], local_pos[joint_name][2]], c='red', lw=2.5)
-            self.lines_dict[joint_name] = lines
-
-        self.ax.set_title('frame: ' + str(frame))
-        self.ax.set_xlim(self.local_pos_min[0], self.local_pos_max[0])
-        self.ax.set_ylim(self.local_pos_min[2], self.local_pos_max[2])
-        self.ax.set_zlim(self.local_pos_min[1], self.local_pos_max[1])
+        self.bone_collection = Line3DCollection(self.calc_segments(frame), colors='red', linewidths=2.5)
+        self.ax.add_collection(self.bone_collection)
+
+        self._set_lim()
         self.ax.set_xlabel("x")
         self.ax.set_ylabel("y")
         self.ax.set_zlabel("z")
-        self.ax.set_title('frame: ' + str(0))
+        # フレーム番号は軸のタイトルではなく、更新対象のテキストとして表示する
+        self.frame_text = self.ax.text2D(0.5, 1.0, 'frame: ' + str(frame), transform=self.ax.transAxes,
+                                         ha='center', va='bottom')
+
+    def _set_lim(self):
+        self.ax.set_xlim(self.local_pos_min[0], self.local_pos_max[0])
+        self.ax.set_ylim(self.local_pos_min[2], self.local_pos_max[2])
+        self.ax.set_zlim(self.local_pos_min[1], self.local_pos_max[1])
 
     def draw_local_pos_at_specific_frame(self, frame: int):
         """特定のフレーム時のスティックピクチャーを描画
         """
         self.current_frame = frame
-        local_pos: Dict[np.array] = self.coordinate_data.local_pos_list[frame]
-        for joint_name in self.coordinate_data.joint_names:
-            if joint_name == self.coordinate_data.joint_names[0]: continue  # skip root joint
-            parent_joint = self.coordinate_data.joints_hierarchy[joint_name][0]
-            if parent_joint == "root": continue  # skip connect to root
-
-            lines = self.lines_dict[joint_name]
-            lines[0].set_data_3d([local_pos[parent_joint][0], local_pos[joint_name][0]],
-                                 [local_pos[parent_joint][2], local_pos[joint_name][2]],
-                                 [local_pos[parent_joint][1], local_pos[joint_name][1]])
-
-        self.ax.set_title('frame: ' + str(frame))
+        self.bone_collection.set_segments(self.calc_segments(frame))
+        self.frame_text.set_text('frame: ' + str(frame))
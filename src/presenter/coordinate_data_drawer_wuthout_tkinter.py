@@ -1,97 +1,57 @@
-from typing import Dict, List
-
 import numpy as np
 from matplotlib import pyplot as plt
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
 from src.model.skeleton_data import CoordinateData
+from src.presenter.coordinate_data_drawer import PLOT_AXES, calc_bone_indices
 
 
 class CoordinateDataDrawer:
+    """tkinterを使わずにpyplotのウィンドウでスティックピクチャーを時系列順に描画する
+
+    骨の線は1つのLine3DCollectionとして一度だけ作成し、フレームごとに線分だけを更新する。
+    画面のない環境で書き出す場合はsrc.usecase.export_motion_usecaseを使う。
+    """
 
     def __init__(self):
         pass
 
     @staticmethod
-    def _calc_lim(pos_list: List[Dict[str, np.array]]):
+    def _calc_lim(positions: np.ndarray):
         """軸の表示域の計算
+
+        positions: shape (F, J, 3) の位置配列
         """
-        local_pos_min_list = []
-        local_pos_max_list = []
-        for local_pos in pos_list:
-            local_pos_min_list.append(np.amin([x for x in local_pos.values()], axis=0))
-            local_pos_max_list.append(np.amax([x for x in local_pos.values()], axis=0))
-        pos_max = np.amax(local_pos_max_list, axis=0)
-        pos_min = np.amin(local_pos_min_list, axis=0)
+        pos_max = np.amax(positions, axis=(0, 1))
+        pos_min = np.amin(positions, axis=(0, 1))
         return pos_min, pos_max
 
-    def draw_local_pos(self, coordinate_data: CoordinateData, frame_skips: int = 5):
-        """時系列順にスティックピクチャーを描画していく"""
-
+    def _draw_pos(self, coordinate_data: CoordinateData, positions: np.ndarray, color: str, frame_skips: int):
         fig = plt.figure()
         ax = fig.add_subplot(111, projection='3d')
 
         # 軸の表示域の計算
-        local_pos_min, local_pos_max = self._calc_lim(pos_list=coordinate_data.local_pos_list)
-
-        for i in range(0, len(coordinate_data.local_pos_list), frame_skips):
-
-            local_pos: Dict[np.array] = coordinate_data.local_pos_list[i]
-            for joint_name in coordinate_data.joint_names:
-                if joint_name == coordinate_data.joint_names[0]: continue  # skip root joint
-                parent_joint = coordinate_data.joints_hierarchy[joint_name][0]
-                if parent_joint == "root": continue  # skip connect to root
-
-                plt.plot(xs=[local_pos[parent_joint][0], local_pos[joint_name][0]],
-                         zs=[local_pos[parent_joint][1], local_pos[joint_name][1]],
-                         ys=[local_pos[parent_joint][2], local_pos[joint_name][2]], c='red', lw=2.5)
-
-            # plot origin
-            # plt.scatter(xs=[0, 0], zs=[0, 0], ys=[0, 0], c='green', lw=5)
-            # ax.set_axis_off()
-            ax.set_xlim(local_pos_min[0], local_pos_max[0])
-            ax.set_ylim(local_pos_min[2], local_pos_max[2])
-            ax.set_zlim(local_pos_min[1], local_pos_max[1])
-            plt.title('frame: ' + str(i))
-            plt.xlabel("x")
-            plt.ylabel("y")
-            # plt.zlabel("z")
+        pos_min, pos_max = self._calc_lim(positions=positions)
+        ax.set_xlim(pos_min[0], pos_max[0])
+        ax.set_ylim(pos_min[2], pos_max[2])
+        ax.set_zlim(pos_min[1], pos_max[1])
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+
+        bone_indices = calc_bone_indices(coordinate_data)
+        bone_collection = Line3DCollection(positions[0][bone_indices][:, :, PLOT_AXES], colors=color, linewidths=2.5)
+        ax.add_collection(bone_collection)
+
+        for i in range(0, coordinate_data.n_frames, frame_skips):
+            if not plt.fignum_exists(fig.number):
+                break  # ウィンドウが閉じられた
+            bone_collection.set_segments(positions[i][bone_indices][:, :, PLOT_AXES])
+            ax.set_title('frame: ' + str(i))
             plt.pause(0.001)
-            ax.cla()
 
-        pass
+    def draw_local_pos(self, coordinate_data: CoordinateData, frame_skips: int = 5):
+        """時系列順にスティックピクチャーを描画していく"""
+        self._draw_pos(coordinate_data, coordinate_data.local_pos, color='red', frame_skips=frame_skips)
 
     def draw_world_pos(self, coordinate_data: CoordinateData, frame_skips: int = 5):
-
-        fig = plt.figure()
-        ax = fig.add_subplot(111, projection='3d')
-
-        # 軸の表示域の計算
-        world_pos_min, world_pos_max = self._calc_lim(pos_list=coordinate_data.world_pos_list)
-
-        for i in range(0, len(coordinate_data.world_pos_list), frame_skips):
-
-            world_pos: Dict[np.array] = coordinate_data.world_pos_list[i]
-            for joint_name in coordinate_data.joint_names:
-                if joint_name == coordinate_data.joint_names[0]: continue  # skip root joint
-                parent_joint = coordinate_data.joints_hierarchy[joint_name][0]
-                if parent_joint == "root": continue  # skip connect to root
-
-                plt.plot(xs=[world_pos[parent_joint][0], world_pos[joint_name][0]],
-                         zs=[world_pos[parent_joint][1], world_pos[joint_name][1]],
-                         ys=[world_pos[parent_joint][2], world_pos[joint_name][2]], c='blue', lw=2.5)
-
-            # plot origin
-            # plt.scatter(xs=[0, 0], zs=[0, 0], ys=[0, 0], c='green', lw=5)
-
-            # ax.set_axis_off()
-            ax.set_xlim(world_pos_min[0], world_pos_max[0])
-            ax.set_ylim(world_pos_min[2], world_pos_max[2])
-            ax.set_zlim(world_pos_min[1], world_pos_max[1])
-            plt.title('frame: ' + str(i))
-            plt.xlabel("x")
-            plt.ylabel("y")
-            # plt.zlabel("z")
-            plt.pause(0.001)
-            ax.cla()
-
-        pass
+        self._draw_pos(coordinate_data, coordinate_data.world_pos, color='blue', frame_skips=frame_skips)
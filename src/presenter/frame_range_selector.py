@@ -0,0 +1,74 @@
+from typing import Callable, List, Optional, Tuple
+
+FrameRange = Tuple[int, int]
+
+
+class FrameRangeSelector:
+    """グラフ上のドラッグによるフレーム範囲の選択
+
+    グラフの軸の上で左ボタンを押してからドラッグしている間、ドラッグのたびにon_change(範囲, False)で
+    選択中のフレーム範囲 [start, stop) を通知し、ボタンを離した時にon_change(範囲, True)で確定した範囲を通知する。
+    ドラッグせずにクリックした場合は選択を解除する (範囲としてNoneを通知する)。
+    """
+
+    def __init__(self, canvas, on_change: Callable[[Optional[FrameRange], bool], None]):
+        self.canvas = canvas
+        self.on_change = on_change
+        self.axes_list: List = []
+        self.n_frames: int = 0
+        self.frame_range: Optional[FrameRange] = None
+        self._press_ax = None
+        self._press_frame: int = 0
+        self._moved: bool = False
+        self._callback_ids = [self.canvas.mpl_connect("button_press_event", self._on_press),
+                              self.canvas.mpl_connect("motion_notify_event", self._on_motion),
+                              self.canvas.mpl_connect("button_release_event", self._on_release)]
+
+    def set_target(self, axes_list: List, n_frames: int):
+        """選択を受け付けるグラフの軸とフレーム数を設定し、選択を解除する"""
+        self.axes_list = list(axes_list)
+        self.n_frames = n_frames
+        self.frame_range = None
+        self._press_ax = None
+
+    def disconnect(self):
+        """キャンバスのイベントとの接続を解除"""
+        for callback_id in self._callback_ids:
+            self.canvas.mpl_disconnect(callback_id)
+        self._callback_ids = []
+
+    def _frame_at(self, ax, event) -> int:
+        """押した軸のデータ座標でのフレーム。軸の外に出ても押した軸を基準にする"""
+        x, _ = ax.transData.inverted().transform((event.x, event.y))
+        return min(max(int(round(x)), 0), max(self.n_frames - 1, 0))
+
+    def _range_to(self, frame: int) -> FrameRange:
+        return min(self._press_frame, frame), max(self._press_frame, frame) + 1
+
+    def _on_press(self, event):
+        if event.button != 1 or event.inaxes not in self.axes_list or self.n_frames == 0:
+            return
+        self._press_ax = event.inaxes
+        self._press_frame = self._frame_at(event.inaxes, event)
+        self._moved = False
+
+    def _on_motion(self, event):
+        if self._press_ax is None:
+            return
+        frame_range = self._range_to(self._frame_at(self._press_ax, event))
+        if not self._moved and frame_range[1] - frame_range[0] == 1:
+            return  # まだドラッグしていない
+        self._moved = True
+        if frame_range != self.frame_range:
+            self.frame_range = frame_range
+            self.on_change(frame_range, False)
+
+    def _on_release(self, event):
+        if self._press_ax is None:
+            return
+        if self._moved:
+            self.frame_range = self._range_to(self._frame_at(self._press_ax, event))
+        else:
+            self.frame_range = None
+        self._press_ax = None
+        self.on_change(self.frame_range, True)
@@ -1,68 +1,229 @@
-from typing import Dict, List
+from typing import List
 
 import numpy as np
-from matplotlib import pyplot as plt
-import matplotlib
-from src.model.skeleton_data import CoordinateData, GraphData, MultiPlotGraphData
+from matplotlib.patches import Rectangle
+
+from src.model.skeleton_data import GraphData, MultiPlotGraphData
+from src.service.min_max_pyramid import MinMaxPyramid
+
+# グラフの線の1ピクセルあたりの点の数 (区間ごとの最小値と最大値)
+POINTS_PER_PIXEL = 2
+
+
+def _y_lim(series: list) -> tuple:
+    """線ごとのデータの (最小値, 最大値)。nanは無視し、値がない場合は (0, 1) とする"""
+    values = np.concatenate([np.ravel(np.asarray(line_data, dtype=np.float64)) for line_data in series])
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return 0.0, 1.0
+    return values.min(), values.max()
 
 
 class GraphDataDrawer:
+    """グラフデータの描画
+
+    グラフの線などの静的な内容は初回だけ描画し、以降はフレーム位置を示す縦線(カーソル)だけを更新する。
+    カーソルはanimatedとし、キャンバス全体の再描画時に背景(カーソル以外)を保存しておき、
+    フレームの更新時は背景を復元してカーソルだけを描画する(blit)。
+    blit=Falseの場合はカーソルの更新だけを行い、画面への反映は呼び出し側(BlitManagerなど)に任せる。
+    長いデータは線ごとのMinMaxPyramidで表示範囲に応じた点の数(おおよそ軸の幅のピクセル数 x POINTS_PER_PIXEL)に間引いて描画し、
+    表示範囲を変更(ズーム)した場合はその範囲に応じた細かさで間引き直す。ピークの値と位置は間引いても変わらない。
+    """
 
-    def __init__(self, ax, graph_data: GraphData, line_color: str = "r"):
+    def __init__(self, ax, graph_data: GraphData, line_color: str = "r", blit: bool = True):
         self.is_playing: bool = True
         self.ax = ax
         self.current_frame: int = 0
         self.graph_data: GraphData = graph_data
         self.line_color: str = line_color
+        self.blit: bool = blit
         self.v_lines = None
+        self.selection_span: Rectangle = None
+        self.lines = []
+        self.background = None
+        self.pyramids: List[MinMaxPyramid] = []
         self.y_min: int
         self.y_max: int
         self._set_y_lim(graph_data)
+        self._build_pyramids(graph_data)
+        self._draw_event_id = self.ax.figure.canvas.mpl_connect("draw_event", self._on_draw)
 
     def _set_y_lim(self, graph_data: GraphData):
-        self.y_min = min(graph_data.data)
-        self.y_max = max(graph_data.data)
+        self.y_min, self.y_max = _y_lim([graph_data.data])
+
+    def _build_pyramids(self, graph_data: GraphData):
+        self.pyramids = [MinMaxPyramid(line_data) for line_data in self._series(graph_data)]
+
+    @property
+    def n_frames(self) -> int:
+        return max([len(pyramid) for pyramid in self.pyramids], default=0)
+
+    def max_points(self) -> int:
+        """1本の線あたりの描画する点の数の目安"""
+        return max(int(self.ax.bbox.width), 1) * POINTS_PER_PIXEL
+
+    def decimated_series(self, start: int = 0, stop: int = None) -> list:
+        """[start, stop)のフレームを間引いた、線ごとの (フレーム, 値)"""
+        stop = self.n_frames if stop is None else stop
+        max_points = self.max_points()
+        return [pyramid.decimate(start, stop, max_points) for pyramid in self.pyramids]
+
+    def _visible_range(self):
+        """表示範囲のフレーム [start, stop)"""
+        x_min, x_max = sorted(self.ax.get_xlim())
+        return int(np.floor(x_min)), int(np.ceil(x_max)) + 1
+
+    def _on_xlim_changed(self, ax):
+        """表示範囲の変更(ズームなど)に合わせて間引き直す"""
+        for line, (frames, values) in zip(self.lines, self.decimated_series(*self._visible_range())):
+            line.set_data(frames, values)
+
+    def _autoscale(self):
+        """間引いた線ではなく全フレームの範囲で表示範囲を決める。y方向は間引いてもピークが残るので線から求まる"""
+        self.ax.relim()
+        if self.n_frames:
+            self.ax.update_datalim([(0, self.y_min), (self.n_frames - 1, self.y_max)])
+        self.ax.autoscale_view()
+
+    def _on_draw(self, event):
+        """キャンバス全体の再描画(リサイズ時など)のたびに背景を保存し直し、カーソルを描き足す"""
+        if not self.blit or self.v_lines is None or event.canvas is not self.ax.figure.canvas:
+            return
+        self.background = event.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.animated_artists:
+            self.ax.draw_artist(artist)
+
+    def disconnect(self):
+        """キャンバスのイベントとの接続を解除"""
+        self.ax.figure.canvas.mpl_disconnect(self._draw_event_id)
 
     def clear(self):
         """描画のクリア
         """
         self.ax.cla()
+        self.v_lines = None
+        self.selection_span = None
+        self.lines = []
+        self.background = None
 
-    def draw_graph_data_at_specific_frame(self, frame: int):
-        """特定のフレーム時のグラフデータを描画
+    def _series(self, graph_data: GraphData) -> list:
+        """描画する線ごとのデータ"""
+        return [graph_data.data]
+
+    def set_data(self, graph_data: GraphData):
+        """描画するグラフデータを変更する。線の数が同じ場合は線やカーソルを作り直さずにデータと表示範囲だけを更新する"""
+        self.graph_data = graph_data
+        self._set_y_lim(graph_data)
+        self._build_pyramids(graph_data)
+        if self.v_lines is None:
+            return
+        if len(self.pyramids) != len(self.lines):
+            self.redraw_graph_data_at_specific_frame(0)
+            return
+        self.current_frame = 0
+        self.ax.set_title(graph_data.display_name)
+        for line, (frames, values) in zip(self.lines, self.decimated_series()):
+            line.set_data(frames, values)
+        # 表示範囲の変更時に表示範囲に合わせて間引き直される
+        self._autoscale()
+        self.v_lines.set_segments([np.array([[0, self.y_min], [0, self.y_max]])])
+        self.set_selection(None)
+
+    def _draw_static(self):
+        """グラフの線などの、フレームによらない内容を描画"""
+        self.ax.set_title(self.graph_data.display_name)
+        self.ax.xaxis.set_visible(False)
+        (frames, values), = self.decimated_series()
+        self.lines = self.ax.plot(frames, values, self.line_color)
+
+    def _draw_cursor(self, frame: int):
+        self.v_lines = self.ax.vlines(frame, ymin=self.y_min, ymax=self.y_max, colors="k", animated=self.blit)
+
+    def _draw_selection(self):
+        """選択したフレーム範囲を示す帯 (縦方向は軸の全体)。選択するまでは表示しない"""
+        self.selection_span = Rectangle((0, 0), 0, 1, transform=self.ax.get_xaxis_transform(), facecolor="y",
+                                        alpha=0.3, animated=self.blit, visible=False)
+        self.ax.add_artist(self.selection_span)
+
+    def set_selection(self, frame_range):
+        """選択したフレーム範囲 (start, stop) を表示する。Noneの場合は表示しない。画面への反映は呼び出し側で行う"""
+        if self.selection_span is None:
+            return
+        if frame_range is None:
+            self.selection_span.set_visible(False)
+            return
+        start, stop = frame_range
+        # フレームstop - 1の縦線までを含むように、前後に半フレーム広げる
+        self.selection_span.set_x(start - 0.5)
+        self.selection_span.set_width(stop - start)
+        self.selection_span.set_visible(True)
+
+    @property
+    def animated_artists(self) -> list:
+        """フレームごとに更新するartist"""
+        return [self.selection_span, self.v_lines]
+
+    def redraw_graph_data_at_specific_frame(self, frame: int):
+        """グラフ全体をクリアして描画し直す (データを変更した場合など)
         """
         self.current_frame = frame
         self.clear()
-        self.ax.set_title(self.graph_data.display_name)
-        self.ax.xaxis.set_visible(False)
-        self.ax.plot(self.graph_data.data, self.line_color)
-        self.v_lines = self.ax.vlines(frame, ymin=self.y_min, ymax=self.y_max, colors="k")
+        self._draw_static()
+        self._autoscale()
+        # 軸をクリアするとコールバックも解除されるので、描画し直すたびに接続する
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        self._draw_cursor(frame)
+        self._draw_selection()
+
+    def draw_graph_data_at_specific_frame(self, frame: int):
+        """特定のフレーム時のグラフデータを描画。静的な内容の描画は初回だけ行う
+        """
+        if self.v_lines is None:
+            self.redraw_graph_data_at_specific_frame(frame)
+        else:
+            self.update_graph_data_at_specific_frame(frame)
 
     def update_graph_data_at_specific_frame(self, frame: int):
-        """特定のフレーム時のグラフデータを描画
+        """フレーム位置の縦線だけを更新する
         """
         self.current_frame = frame
         self.v_lines.set_segments([np.array([[frame, self.y_min], [frame, self.y_max]])])
+        if self.blit and self.background is not None:
+            canvas = self.ax.figure.canvas
+            canvas.restore_region(self.background)
+            self._draw_animated()
+            canvas.blit(self.ax.bbox)
+        return [self.v_lines]
 
 
 class MultiPlotGraphDataDrawer(GraphDataDrawer):
-    def __init__(self, ax, multi_graph_data: MultiPlotGraphData):
-        super().__init__(ax, multi_graph_data)
-        self.graph_data: MultiPlotGraphData = multi_graph_data
+    def __init__(self, ax, multi_graph_data: MultiPlotGraphData, blit: bool = True):
         self.line_colors: List[str] = ["m", "c"]
+        super().__init__(ax, multi_graph_data, blit=blit)
+        self.graph_data: MultiPlotGraphData = multi_graph_data
 
     def _set_y_lim(self, graph_data: MultiPlotGraphData):
-        self.y_min = min([min(graph_data.data[0]), min(graph_data.data[1])])
-        self.y_max = max([max(graph_data.data[0]), max(graph_data.data[1])])
+        self.y_min, self.y_max = _y_lim(graph_data.data)
 
-    def draw_graph_data_at_specific_frame(self, frame: int):
-        """特定のフレーム時のグラフデータを描画
-        """
-        self.current_frame = frame
-        self.clear()
+    def _draw_static(self):
+        """グラフの線などの、フレームによらない内容を描画"""
         self.ax.set_title(self.graph_data.display_name)
         self.ax.xaxis.set_visible(False)
-        for i, line_data in enumerate(self.graph_data.data):
-            self.ax.plot(line_data, self.line_colors[i], label=self.graph_data.legends[i])
-        self.v_lines = self.ax.vlines(frame, ymin=self.y_min, ymax=self.y_max, colors="k")
+        for i, (frames, values) in enumerate(self.decimated_series()):
+            # 線の数が色の数より多い場合は色を繰り返す
+            self.lines.extend(self.ax.plot(frames, values, self.line_colors[i % len(self.line_colors)],
+                                           label=self.graph_data.legends[i]))
         self.ax.legend()
+
+    def _series(self, graph_data: MultiPlotGraphData) -> list:
+        return list(graph_data.data)
+
+    def set_data(self, graph_data: MultiPlotGraphData):
+        super().set_data(graph_data)
+        if self.v_lines is not None:
+            for line, legend in zip(self.lines, graph_data.legends):
+                line.set_label(legend)
+            self.ax.legend()
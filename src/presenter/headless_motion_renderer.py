@@ -0,0 +1,42 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+from src.model.skeleton_data import MotionData
+from src.presenter.blit_manager import BlitManager
+from src.presenter.motion_figure import MotionFigure
+
+# PNGの圧縮レベル。書き出しの速度を優先して低くする (0〜9)
+PNG_COMPRESS_LEVEL = 1
+
+
+class HeadlessMotionRenderer:
+    """画面を使わず(Aggバックエンド)にビューアと同じ図を画像として描画する
+
+    図とキャンバスは一度だけ作成し、静的な内容(軸・グラフの線など)を背景として保存しておく。
+    フレームごとに背景を復元してanimatedなartistだけを描画するので、フレームごとにキャンバス全体を描画し直さない。
+    """
+
+    def __init__(self, motion_data: MotionData, figsize=(10, 5), dpi: float = 80, draw_graphs: bool = True):
+        self.motion_figure: MotionFigure = MotionFigure(figsize=figsize, draw_graphs=draw_graphs, dpi=dpi)
+        self.canvas: FigureCanvasAgg = FigureCanvasAgg(self.motion_figure.figure)
+        self.motion_figure.set_data(motion_data)
+        self.blit_manager: BlitManager = BlitManager(self.canvas, animated_artists=self.motion_figure.animated_artists)
+        self.canvas.draw()
+
+    @property
+    def n_frames(self) -> int:
+        return self.motion_figure.coordinate_drawer.coordinate_data.n_frames
+
+    def render(self, frame: int) -> np.ndarray:
+        """frameの図を描画する shape: (H, W, 4) RGBA。返り値はキャンバスのバッファなので次の描画で上書きされる"""
+        self.motion_figure.draw_at_specific_frame(frame=frame)
+        self.blit_manager.update()
+        return np.asarray(self.canvas.buffer_rgba())
+
+    def render_image(self, frame: int) -> Image.Image:
+        """frameの図をRGBの画像として描画する"""
+        return Image.fromarray(self.render(frame)[:, :, :3])
+
+    def save_png(self, frame: int, file_name: str):
+        self.render_image(frame).save(file_name, compress_level=PNG_COMPRESS_LEVEL)
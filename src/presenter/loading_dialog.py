@@ -1,26 +1,55 @@
-import time
 import tkinter as tk
-from tkinter import ttk, simpledialog
+from tkinter import ttk
+from typing import Callable
+
+from src.usecase.load_bvh_usecase import LoadingProgress
+
+# 読み込みの段階の表示名
+STAGE_LABELS = {
+    "cache": "キャッシュを確認中",
+    "parse": "ファイルを読み込み中",
+    "skeleton": "スケルトンデータを作成中",
+    "positions": "位置情報を計算中",
+    "graph": "グラフデータを計算中",
+    "save": "キャッシュに保存中",
+}
 
 
 class LoadingDialog:
-    def __init__(self, parent):
+    """読み込みの進捗を段階ごとに表示するダイアログ
+
+    読み込み中もビューアを操作できる(別のファイルを開くなど)よう、モーダルにはしない。
+    """
+
+    def __init__(self, parent, on_cancel: Callable[[], None] = None):
+        self.on_cancel = on_cancel
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Loading...")
-        self.dialog.geometry("300x80")
+        self.dialog.geometry("300x110")
         self.dialog.resizable(False, False)
-        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
 
         self.label = tk.Label(self.dialog, text="Please wait while loading...")
         self.label.pack(pady=5)
 
-        self.progressbar = ttk.Progressbar(self.dialog, orient="horizontal", mode="indeterminate")
+        self.progressbar = ttk.Progressbar(self.dialog, orient="horizontal", mode="determinate", maximum=100,
+                                           length=260)
         self.progressbar.pack(pady=5)
-        self.progressbar.start(10)
+
+        self.cancel_button = tk.Button(self.dialog, text="キャンセル", command=self.cancel)
+        self.cancel_button.pack(pady=5)
 
         self.dialog.transient(parent)
-        self.dialog.grab_set()
+
+    def update_progress(self, progress: LoadingProgress):
+        stage_label = STAGE_LABELS.get(progress.stage, progress.stage)
+        self.label.config(text=f"{stage_label} ({progress.fraction:.0%})")
+        self.progressbar["value"] = progress.overall * 100
+
+    def cancel(self):
+        if self.on_cancel is not None:
+            self.on_cancel()
+        self.close()
 
     def close(self):
-        self.dialog.grab_release()
         self.dialog.destroy()
@@ -0,0 +1,139 @@
+from typing import List, Optional
+
+from matplotlib.figure import Figure
+
+from src.model.skeleton_data import GraphData, MotionData, MultiPlotGraphData
+from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.presenter.graph_data_drawer import GraphDataDrawer, MultiPlotGraphDataDrawer
+
+graph_colors = ["r", "g", "b"]
+
+# グラフの軸の数。グラフがこれより多い場合は軸を増やして縦に並べる
+N_GRAPH_AXES = 3
+
+
+class MotionFigure:
+    """スティックピクチャとグラフ (3つ以上) を並べた図
+
+    図・軸・描画用クラスは一度だけ作成し、ファイルを開き直した場合はset_dataで描画内容だけを更新する。
+    pyplotを使わずにFigureを作成するので、pyplotの管理する図は増えない。
+    draw_skeleton=Falseの場合はグラフだけを描画する(スティックピクチャを別の描画方法で描画する場合)。
+    draw_graphs=Falseの場合はスティックピクチャだけを図全体に描画する。
+    """
+
+    def __init__(self, figsize=(10, 5), draw_skeleton: bool = True, draw_graphs: bool = True, dpi: float = None):
+        if not draw_skeleton and not draw_graphs:
+            raise ValueError("either draw_skeleton or draw_graphs must be True")
+        self.figure: Figure = Figure(figsize=figsize, dpi=dpi)
+        self.draw_skeleton: bool = draw_skeleton
+        self.draw_graphs: bool = draw_graphs
+        if not draw_graphs:
+            self.coordinate_ax = self.figure.add_subplot(111, projection='3d')
+        elif draw_skeleton:
+            self.coordinate_ax = self.figure.add_subplot(121, projection='3d')
+        else:
+            self.coordinate_ax = None
+        self.graph_ax_list = []
+        self.coordinate_drawer: Optional[CoordinateDataDrawer] = None
+        self._graph_drawers: List[Optional[GraphDataDrawer]] = []
+        self.graph_drawer_list: List[GraphDataDrawer] = []
+        if draw_graphs:
+            self._layout_graph_axes(N_GRAPH_AXES)
+
+    @property
+    def animated_artists(self) -> list:
+        """フレームごとに更新するartist"""
+        animated_artists = []
+        if self.coordinate_drawer is not None:
+            animated_artists.extend(self.coordinate_drawer.animated_artists)
+        for drawer in self.graph_drawer_list:
+            animated_artists.extend(drawer.animated_artists)
+        return animated_artists
+
+    def set_data(self, motion_data: MotionData):
+        """描画するデータを変更し、0フレーム目を描画する"""
+
+        # スティックピクチャ
+        if not self.draw_skeleton:
+            pass
+        elif self.coordinate_drawer is None:
+            self.coordinate_drawer = CoordinateDataDrawer(ax=self.coordinate_ax,
+                                                          coordinate_data=motion_data.coordinate_data)
+            self.coordinate_drawer.draw_local_pos_at_initial_frame()
+        else:
+            self.coordinate_drawer.set_data(motion_data.coordinate_data)
+
+        # グラフ。データのないグラフの軸は表示しない
+        self.graph_drawer_list = []
+        if self.draw_graphs:
+            self._layout_graph_axes(len(motion_data.graph_data_list))
+        for i, ax in enumerate(self.graph_ax_list):
+            graph_data = motion_data.graph_data_list[i] if i < len(motion_data.graph_data_list) else None
+            ax.set_visible(graph_data is not None)
+            if graph_data is None:
+                continue
+            drawer = self._graph_drawers[i]
+            if drawer is None or type(drawer) is not self._graph_drawer_class(graph_data):
+                if drawer is not None:
+                    drawer.disconnect()
+                    drawer.clear()
+                drawer = self._create_graph_drawer(i, graph_data)
+                self._graph_drawers[i] = drawer
+            else:
+                drawer.set_data(graph_data)
+            drawer.draw_graph_data_at_specific_frame(frame=0)
+            self.graph_drawer_list.append(drawer)
+
+    def _layout_graph_axes(self, n_graphs: int):
+        """グラフの軸をn_graphs個 (N_GRAPH_AXES個以上) にして、スティックピクチャの右側 (または図全体) に縦に並べる
+
+        軸の数が変わらない場合は何もしない。
+        """
+        n_axes = max(n_graphs, N_GRAPH_AXES)
+        if n_axes == len(self.graph_ax_list):
+            return
+        for drawer in self._graph_drawers[n_axes:]:
+            if drawer is not None:
+                drawer.disconnect()
+        for ax in self.graph_ax_list[n_axes:]:
+            ax.remove()
+        del self.graph_ax_list[n_axes:], self._graph_drawers[n_axes:]
+        grid = self.figure.add_gridspec(n_axes, 2 if self.draw_skeleton else 1)
+        for i in range(n_axes):
+            if i < len(self.graph_ax_list):
+                self.graph_ax_list[i].set_subplotspec(grid[i, -1])
+            else:
+                self.graph_ax_list.append(self.figure.add_subplot(grid[i, -1]))
+                self._graph_drawers.append(None)
+
+    @staticmethod
+    def _graph_drawer_class(graph_data: GraphData) -> type:
+        if isinstance(graph_data, MultiPlotGraphData):
+            return MultiPlotGraphDataDrawer
+        elif isinstance(graph_data, GraphData):
+            return GraphDataDrawer
+        raise NotImplementedError(f"Unexpected instance type: {type(graph_data)}")
+
+    def _create_graph_drawer(self, i: int, graph_data: GraphData) -> GraphDataDrawer:
+        # フレームごとの描画はBlitManagerでまとめて行うので、描画用クラスではblitしない
+        if self._graph_drawer_class(graph_data) is MultiPlotGraphDataDrawer:
+            return MultiPlotGraphDataDrawer(ax=self.graph_ax_list[i], multi_graph_data=graph_data, blit=False)
+        return GraphDataDrawer(ax=self.graph_ax_list[i], graph_data=graph_data, line_color=graph_colors[i % len(graph_colors)],
+                               blit=False)
+
+    def set_selection(self, frame_range):
+        """グラフに選択したフレーム範囲 (start, stop) を表示する。Noneの場合は表示しない。画面への反映は呼び出し側で行う"""
+        for drawer in self.graph_drawer_list:
+            drawer.set_selection(frame_range)
+
+    @property
+    def visible_graph_axes(self) -> list:
+        """データを表示しているグラフの軸"""
+        return [drawer.ax for drawer in self.graph_drawer_list]
+
+    def draw_at_specific_frame(self, frame: int):
+        """frameのスティックピクチャとグラフのカーソルを更新する。画面への反映は呼び出し側で行う"""
+        if self.coordinate_drawer is not None:
+            self.coordinate_drawer.draw_local_pos_at_specific_frame(frame=frame)
+        for drawer in self.graph_drawer_list:
+            drawer.draw_graph_data_at_specific_frame(frame=frame)
@@ -0,0 +1,62 @@
+import numpy as np
+
+MIN_ELEVATION = -89.0
+MAX_ELEVATION = 89.0
+MIN_ZOOM = 0.1
+MAX_ZOOM = 20.0
+
+
+class OrbitCamera:
+    """注視点の周りを回転するカメラ(平行投影)
+
+    位置情報の座標系はyが上方向。方位角(azimuth)はy軸周り、仰角(elevation)は水平からの角度 [deg]。
+    3次元の点から画面の座標への変換を (2, 4) の行列1つで表し、全関節を1回の行列積で投影する。
+    """
+
+    def __init__(self, center: np.ndarray, radius: float, azimuth: float = -60.0, elevation: float = 20.0,
+                 zoom: float = 1.0):
+        self.center: np.ndarray = np.asarray(center, dtype=np.float64)
+        self.radius: float = float(radius) if radius > 0 else 1.0  # 画面に収める範囲の半径
+        self.azimuth: float = azimuth
+        self.elevation: float = elevation
+        self.zoom: float = zoom
+
+    @classmethod
+    def fit(cls, pos_min: np.ndarray, pos_max: np.ndarray, **kwargs) -> "OrbitCamera":
+        """位置の最小値・最大値の範囲全体が画面に収まるカメラ"""
+        pos_min, pos_max = np.asarray(pos_min, dtype=np.float64), np.asarray(pos_max, dtype=np.float64)
+        return cls(center=(pos_min + pos_max) / 2, radius=np.linalg.norm(pos_max - pos_min) / 2, **kwargs)
+
+    def orbit(self, d_azimuth: float, d_elevation: float):
+        self.azimuth = (self.azimuth + d_azimuth) % 360
+        self.elevation = min(max(self.elevation + d_elevation, MIN_ELEVATION), MAX_ELEVATION)
+
+    def zoom_by(self, factor: float):
+        self.zoom = min(max(self.zoom * factor, MIN_ZOOM), MAX_ZOOM)
+
+    def rotation(self) -> np.ndarray:
+        """ワールド座標からカメラ座標(x: 右, y: 上, z: 手前)への回転 shape: (3, 3)"""
+        azimuth, elevation = np.radians(self.azimuth), np.radians(self.elevation)
+        cos_a, sin_a = np.cos(azimuth), np.sin(azimuth)
+        cos_e, sin_e = np.cos(elevation), np.sin(elevation)
+        yaw = np.array([[cos_a, 0, -sin_a],
+                        [0, 1, 0],
+                        [sin_a, 0, cos_a]])
+        pitch = np.array([[1, 0, 0],
+                          [0, cos_e, -sin_e],
+                          [0, sin_e, cos_e]])
+        return pitch @ yaw
+
+    def matrix(self, width: int, height: int) -> np.ndarray:
+        """同次座標 (x, y, z, 1) から画面の座標 (右向きx, 下向きy) への変換 shape: (2, 4)"""
+        scale = self.zoom * min(width, height) / (2 * self.radius)
+        rotation = self.rotation()[:2]
+        # 画面のy軸は下向きなので上下を反転する
+        screen = np.array([[scale, 0], [0, -scale]]) @ rotation
+        offset = np.array([width / 2, height / 2]) - screen @ self.center
+        return np.hstack([screen, offset[:, None]])
+
+    def project(self, points: np.ndarray, width: int, height: int) -> np.ndarray:
+        """点 shape: (N, 3) を画面の座標 shape: (N, 2) に投影する"""
+        matrix = self.matrix(width, height)
+        return points @ matrix[:, :3].T + matrix[:, 3]
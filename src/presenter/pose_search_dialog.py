@@ -0,0 +1,68 @@
+import os
+import tkinter as tk
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from src.service.pose_search import PoseMatch
+
+
+class PoseSearchDialog:
+    """類似ポーズの検索結果を一覧表示するダイアログ
+
+    結果を選択するとon_selectを呼び出す。検索し直した場合は同じダイアログの内容を置き換える。
+    """
+
+    def __init__(self, parent, on_select: Callable[[PoseMatch], None]):
+        self.on_select = on_select
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("類似ポーズの検索結果")
+        self.dialog.geometry("420x320")
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.label = tk.Label(self.dialog, anchor="w")
+        self.label.pack(fill=tk.X, padx=5, pady=5)
+
+        self.listbox = tk.Listbox(self.dialog, font=("Courier", 10), activestyle="none")
+        self.listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_selected)
+
+        # 一覧の行ごとの検索結果。見出しの行はNone
+        self.rows: List[Optional[PoseMatch]] = []
+        self.dialog.transient(parent)
+
+    @property
+    def is_open(self) -> bool:
+        return self.dialog is not None
+
+    def show(self, title: str, sections: Sequence[Tuple[str, Union[List[PoseMatch], str]]]):
+        """sections: (見出し, 検索結果) のリスト。距離は見出しごとの主成分空間での距離なので、見出しをまたいで比べられない
+
+        検索結果の代わりに文字列を指定した場合は、検索できなかった理由としてそのまま表示する。
+        """
+        self.label.config(text=title)
+        self.listbox.delete(0, tk.END)
+        self.rows = []
+        for heading, matches in sections:
+            self.listbox.insert(tk.END, f"[{heading}]")
+            self.rows.append(None)
+            if isinstance(matches, str):
+                self.listbox.insert(tk.END, f"  ({matches})")
+                self.rows.append(None)
+                continue
+            if not matches:
+                self.listbox.insert(tk.END, "  (なし)")
+                self.rows.append(None)
+            for match in matches:
+                self.listbox.insert(tk.END, f"  {match.distance:7.3f}  {match.frame:7d}  {os.path.basename(match.take)}")
+                self.rows.append(match)
+        self.dialog.lift()
+
+    def _on_listbox_selected(self, event):
+        selection = self.listbox.curselection()
+        if not selection or self.rows[selection[0]] is None:
+            return
+        self.on_select(self.rows[selection[0]])
+
+    def close(self):
+        if self.dialog is not None:
+            self.dialog.destroy()
+            self.dialog = None
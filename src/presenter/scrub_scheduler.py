@@ -0,0 +1,85 @@
+import collections
+import dataclasses
+import time
+from typing import Callable, Optional
+
+# 画面の更新間隔 [s]。この間隔より短い間隔では描画しない
+DISPLAY_REFRESH_INTERVAL = 1 / 60
+
+
+@dataclasses.dataclass
+class ScrubStatistics:
+    """スライダー操作の統計"""
+    requests: int = 0  # 要求されたフレーム数
+    renders: int = 0  # 実際に描画したフレーム数
+    last_latency: float = 0.0  # 直近の操作から描画完了までの時間 [s]
+    max_latency: float = 0.0
+    mean_latency: float = 0.0  # 直近LATENCY_WINDOW回の平均
+
+    @property
+    def dropped(self) -> int:
+        """描画する前に新しいフレームが要求され、描画しなかったフレーム数"""
+        return self.requests - self.renders
+
+
+class ScrubScheduler:
+    """スライダーなどで要求されたフレームの描画をまとめる
+
+    要求されたフレームは最新のものだけを保持し、描画は画面の更新間隔(描画の開始時刻の間隔)ごとに高々1回、
+    Tkのイベント処理の合間(after_idle / after)に行う。描画前に新しいフレームが要求された場合、古いフレームは描画しない。
+    まだ描画していない最初の要求から描画完了までの時間を遅延(latency)として記録する。
+    """
+
+    LATENCY_WINDOW = 30
+
+    def __init__(self, widget, render: Callable[[int], None], min_interval: float = DISPLAY_REFRESH_INTERVAL,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.widget = widget
+        self.render = render
+        self.min_interval: float = min_interval
+        self.clock = clock
+        self.statistics: ScrubStatistics = ScrubStatistics()
+        self.pending_frame: Optional[int] = None
+        self._first_request_time: float = 0.0
+        self._last_render_time: Optional[float] = None
+        self._job = None
+        self._latencies = collections.deque(maxlen=self.LATENCY_WINDOW)
+
+    def request(self, frame: int):
+        """frameの描画を要求する"""
+        now = self.clock()
+        if self.pending_frame is None:
+            self._first_request_time = now
+        self.pending_frame = frame
+        self.statistics.requests += 1
+        if self._job is not None:
+            return
+        if self._last_render_time is None or now - self._last_render_time >= self.min_interval:
+            self._job = self.widget.after_idle(self._render_pending)
+        else:
+            delay = self.min_interval - (now - self._last_render_time)
+            self._job = self.widget.after(max(1, int(delay * 1000)), self._render_pending)
+
+    def cancel(self):
+        """描画していない要求を破棄する"""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self.pending_frame = None
+
+    def _render_pending(self):
+        self._job = None
+        if self.pending_frame is None:
+            return
+        frame = self.pending_frame
+        self.pending_frame = None
+        self._last_render_time = self.clock()
+        self.render(frame)
+
+        now = self.clock()
+        latency = now - self._first_request_time
+        self._latencies.append(latency)
+        self.statistics.renders += 1
+        self.statistics.last_latency = latency
+        self.statistics.max_latency = max(self.statistics.max_latency, latency)
+        self.statistics.mean_latency = sum(self._latencies) / len(self._latencies)
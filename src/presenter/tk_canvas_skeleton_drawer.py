@@ -0,0 +1,119 @@
+import tkinter as tk
+from typing import List
+
+import numpy as np
+
+from src.model.skeleton_data import CoordinateData
+from src.presenter.coordinate_data_drawer import calc_bone_indices
+from src.presenter.orbit_camera import OrbitCamera
+
+# マウスの移動量 [px] あたりの回転角 [deg]
+ORBIT_DEGREES_PER_PIXEL = 0.5
+
+# マウスホイール1段あたりの拡大率
+ZOOM_STEP = 1.1
+
+
+class TkCanvasSkeletonDrawer:
+    """tk.Canvasによるスティックピクチャの描画
+
+    matplotlibの3D描画(投影・奥行きの並べ替え・Aggでの描画・Tkへの転送)を使わず、
+    フレームごとに全関節をOrbitCameraで1回の行列積で投影し、骨ごとの線のアイテムの座標をcoords()で更新する。
+    左ドラッグで視点の回転、マウスホイールで拡大・縮小する。
+    CoordinateDataDrawerと同じメソッドでフレームを描画できる。
+    """
+
+    def __init__(self, canvas: tk.Canvas, coordinate_data: CoordinateData, line_color: str = "red",
+                 line_width: int = 3):
+        self.canvas: tk.Canvas = canvas
+        self.line_color: str = line_color
+        self.line_width: int = line_width
+        self.current_frame: int = 0
+        self.coordinate_data: CoordinateData = None
+        self.bone_indices: np.ndarray = None
+        self.camera: OrbitCamera = None
+        self.bone_items: List[int] = []
+        self.frame_text = None
+        self._drag_position = None
+        self._set_coordinate_data(coordinate_data)
+
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self._zoom(ZOOM_STEP))
+        self.canvas.bind("<Button-5>", lambda event: self._zoom(1 / ZOOM_STEP))
+        self.canvas.bind("<Configure>", lambda event: self._redraw())
+
+    def _set_coordinate_data(self, coordinate_data: CoordinateData):
+        self.coordinate_data = coordinate_data
+        self.bone_indices = calc_bone_indices(coordinate_data)
+        local_pos_min, local_pos_max = coordinate_data.local_pos_lim()
+        if self.camera is None:
+            self.camera = OrbitCamera.fit(local_pos_min, local_pos_max)
+        else:
+            # 視点の向きと拡大率はファイルを開き直しても変えない
+            self.camera = OrbitCamera.fit(local_pos_min, local_pos_max, azimuth=self.camera.azimuth,
+                                          elevation=self.camera.elevation, zoom=self.camera.zoom)
+
+    def set_data(self, coordinate_data: CoordinateData):
+        """描画する位置情報を変更する。描画済みの場合は0フレーム目を表示する"""
+        self._set_coordinate_data(coordinate_data)
+        if self.frame_text is None:
+            return
+        if len(self.bone_items) != len(self.bone_indices):
+            self.clear()
+            self.draw_local_pos_at_initial_frame()
+        else:
+            self.draw_local_pos_at_specific_frame(frame=0)
+
+    def clear(self):
+        """描画のクリア
+        """
+        self.canvas.delete("skeleton")
+        self.bone_items = []
+        self.frame_text = None
+
+    def draw_local_pos_at_initial_frame(self):
+        """初回 0フレーム時のスティックピクチャを描画
+        """
+        self.bone_items = [self.canvas.create_line(0, 0, 0, 0, fill=self.line_color, width=self.line_width,
+                                                   capstyle=tk.ROUND, tags="skeleton")
+                           for _ in range(len(self.bone_indices))]
+        self.frame_text = self.canvas.create_text(10, 10, anchor=tk.NW, text="", tags="skeleton")
+        self.draw_local_pos_at_specific_frame(frame=0)
+
+    def draw_local_pos_at_specific_frame(self, frame: int):
+        """特定のフレーム時のスティックピクチャを描画
+        """
+        self.current_frame = frame
+        if self.coordinate_data.n_frames == 0:
+            return  # フレームがない場合は描画しない
+        width, height = max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+        screen = self.camera.project(self.coordinate_data.local_pos[frame], width, height)
+        # 骨ごとの (親のx, 親のy, 子のx, 子のy)
+        bone_coords = screen[self.bone_indices].reshape(-1, 4).tolist()
+        for item, coords in zip(self.bone_items, bone_coords):
+            self.canvas.coords(item, *coords)
+        self.canvas.itemconfigure(self.frame_text, text='frame: ' + str(frame))
+
+    def _redraw(self):
+        if self.frame_text is not None:
+            self.draw_local_pos_at_specific_frame(self.current_frame)
+
+    def _on_press(self, event):
+        self._drag_position = (event.x, event.y)
+
+    def _on_drag(self, event):
+        if self._drag_position is None:
+            return
+        dx, dy = event.x - self._drag_position[0], event.y - self._drag_position[1]
+        self._drag_position = (event.x, event.y)
+        self.camera.orbit(d_azimuth=-dx * ORBIT_DEGREES_PER_PIXEL, d_elevation=dy * ORBIT_DEGREES_PER_PIXEL)
+        self._redraw()
+
+    def _on_wheel(self, event):
+        self._zoom(ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP)
+
+    def _zoom(self, factor: float):
+        self.camera.zoom_by(factor)
+        self._redraw()
@@ -0,0 +1,66 @@
+"""ヘッダ(json)と配列(.npy)をディレクトリにまとめて保存する列指向のバイナリ形式
+
+<dir_path>/
+    header.json   # 形式・バージョン・配列の一覧と、関節名や階層などのメタデータ
+    <name>.npy    # 配列ごとのファイル。np.load(mmap_mode='r')で開ける
+"""
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Tuple
+
+import numpy as np
+
+FORMAT_NAME = "bvh_viewer_columnar"
+FORMAT_VERSION = 1
+HEADER_FILE_NAME = "header.json"
+
+
+def write_bundle(dir_path: str, kind: str, metadata: dict, arrays: Dict[str, np.ndarray]):
+    """配列とメタデータを保存する。一時ディレクトリに書き込んでから置き換えるので、途中で失敗しても壊れない"""
+    dir_path = os.path.abspath(dir_path)
+    parent_dir = os.path.dirname(dir_path)
+    os.makedirs(parent_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=parent_dir)
+    try:
+        array_headers = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array, allow_pickle=False)
+            array_headers[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        header = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "kind": kind,
+                  "arrays": array_headers, "metadata": metadata}
+        with open(os.path.join(tmp_dir, HEADER_FILE_NAME), mode="wt", encoding="utf-8") as f:
+            json.dump(header, f, ensure_ascii=False)
+        if os.path.isdir(dir_path):
+            shutil.rmtree(dir_path)
+        os.replace(tmp_dir, dir_path)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def read_header(dir_path: str, kind: str) -> dict:
+    with open(os.path.join(dir_path, HEADER_FILE_NAME), encoding="utf-8") as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_NAME or header.get("kind") != kind:
+        raise ValueError(f"{dir_path} is not a {kind} bundle")
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported {FORMAT_NAME} version: {header.get('version')}")
+    return header
+
+
+def read_bundle(dir_path: str, kind: str, mmap: bool = True) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """メタデータと配列を読み込む。mmap=Trueの場合、配列は読み取り専用のメモリマップとして開く"""
+    header = read_header(dir_path, kind)
+    arrays = {}
+    for name in header["arrays"]:
+        arrays[name] = np.load(os.path.join(dir_path, f"{name}.npy"),
+                               mmap_mode="r" if mmap else None, allow_pickle=False)
+    return header["metadata"], arrays
+
+
+def bundle_size(dir_path: str) -> int:
+    """保存されたファイルの合計バイト数"""
+    return sum(entry.stat().st_size for entry in os.scandir(dir_path) if entry.is_file())
@@ -0,0 +1,205 @@
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Optional, List
+
+from src.model.skeleton_data import MotionData
+from src.repository.columnar_store import FORMAT_VERSION, bundle_size
+from src.repository.coordinate_data_repository import CoordinateDataRepository
+from src.repository.graph_data_repository import GraphDataRepository
+from src.repository.skeleton_data_repository import SkeletonDataRepository
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "bvh_viewer_tkinter")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+INDEX_FILE_NAME = "index.json"
+
+
+@dataclasses.dataclass
+class CacheStatistics:
+    """キャッシュのヒット・ミスなどの統計"""
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0  # ファイルの変更や変換処理のバージョン変更で破棄したエントリ数
+    evictions: int = 0  # 容量超過で破棄したエントリ数
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ConversionCache:
+    """bvhファイルの変換結果 (SkeletonData, CoordinateData, GraphData) をディスクにキャッシュする
+
+    エントリはファイル内容のハッシュと変換処理のバージョンをキーとする。
+    ファイルパスごとにサイズ・更新時刻とハッシュを記録し、サイズ・更新時刻が変わらない限りハッシュを再計算しない。
+    同じ内容の複数のファイルは1つのエントリを共有し、ファイルが変更されても他のパスが参照しているエントリは残す。
+    合計サイズがmax_bytesを超えた場合は、最後に参照された時刻が古いエントリから削除する。
+    複数のスレッドから使える。ロックするのは索引の更新とindex.jsonの書き込みだけで、
+    ハッシュの計算とエントリの読み書きは並行して行う (エントリは一時ディレクトリに書き込んでから名前を変更する)。
+    """
+
+    def __init__(self, version: str, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.version: str = f"{version};format={FORMAT_VERSION}"
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+        self.statistics: CacheStatistics = CacheStatistics()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index: dict = self._read_index()
+        self._lock = threading.Lock()
+
+    def _read_index(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE_NAME), encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("files", {})
+        index.setdefault("entries", {})
+        return index
+
+    def _write_index(self):
+        index_path = os.path.join(self.cache_dir, INDEX_FILE_NAME)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, mode="wt", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def _hash_file(file_name: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_name, mode="rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _file_digest(self, file_name: str) -> str:
+        """ファイル内容のハッシュ。サイズ・更新時刻が前回と同じ場合は記録済みの値を使う"""
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        with self._lock:
+            record = self._index["files"].get(path)
+            if record and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+                return record["digest"]
+
+        digest = self._hash_file(path)
+        with self._lock:
+            record = self._index["files"].get(path)
+            self._index["files"][path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+            if record and record["digest"] != digest \
+                    and not any(other["digest"] == record["digest"] for other in self._index["files"].values()):
+                # ファイルが変更され、古い内容を参照するパスがなくなったのでエントリは不要
+                self._remove_entries([key for key, entry in self._index["entries"].items()
+                                      if entry["digest"] == record["digest"]], invalidation=True)
+        return digest
+
+    def _access_time(self) -> float:
+        """参照時刻。時計の分解能が粗くても参照順が保たれるように、記録済みの時刻より必ず後にする"""
+        latest = max([entry["last_access"] for entry in self._index["entries"].values()], default=0.0)
+        return max(time.time(), latest + 1e-6)
+
+    def _entry_key(self, digest: str) -> str:
+        return hashlib.sha256(f"{digest};{self.version}".encode("utf-8")).hexdigest()[:40]
+
+    def _remove_entries(self, keys: List[str], invalidation: bool, keep_path: str = None):
+        """エントリを削除し、削除したエントリだけを参照していたファイルパスの記録も削除する (keep_pathは残す)
+
+        ロックを取得してから呼び出す。
+        """
+        removed_digests = set()
+        for key in keys:
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            removed_digests.add(self._index["entries"].pop(key)["digest"])
+            if invalidation:
+                self.statistics.invalidations += 1
+            else:
+                self.statistics.evictions += 1
+        removed_digests -= {entry["digest"] for entry in self._index["entries"].values()}
+        if removed_digests:
+            self._index["files"] = {path: record for path, record in self._index["files"].items()
+                                    if path == keep_path or record["digest"] not in removed_digests}
+
+    def load(self, file_name: str) -> Optional[MotionData]:
+        """キャッシュされた変換結果。キャッシュがない場合はNone"""
+        path = os.path.abspath(file_name)
+        digest = self._file_digest(path)
+        key = self._entry_key(digest)
+        with self._lock:
+            # 変換処理のバージョンが変わったエントリは使えないので削除する
+            self._remove_entries([key for key, entry in self._index["entries"].items()
+                                  if entry["digest"] == digest and entry["version"] != self.version],
+                                 invalidation=True, keep_path=path)
+            entry = self._index["entries"].get(key)
+
+        motion_data = None
+        if entry is not None:
+            entry_dir = os.path.join(self.cache_dir, key)
+            try:
+                motion_data = MotionData(
+                    skeleton_data=SkeletonDataRepository.load(os.path.join(entry_dir, "skeleton"), mmap=False),
+                    coordinate_data=CoordinateDataRepository.load(os.path.join(entry_dir, "coordinate"),
+                                                                  mmap=False),
+                    graph_data_list=GraphDataRepository.load(os.path.join(entry_dir, "graph"), mmap=False))
+            except (OSError, ValueError, KeyError):
+                pass
+
+        with self._lock:
+            if motion_data is not None:
+                entry["last_access"] = self._access_time()
+            elif entry is not None and self._index["entries"].get(key) is entry:
+                # 壊れたエントリは削除して変換し直す (読み込み中に他のスレッドが削除した場合は何もしない)
+                self._remove_entries([key], invalidation=True, keep_path=path)
+            if motion_data is None:
+                self.statistics.misses += 1
+            else:
+                self.statistics.hits += 1
+            self._write_index()
+        return motion_data
+
+    def save(self, file_name: str, motion_data: MotionData):
+        path = os.path.abspath(file_name)
+        digest = self._file_digest(path)
+        key = self._entry_key(digest)
+        # 読み込み中のエントリを壊さないよう、一時ディレクトリに書き込んでから名前を変更する
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=self.cache_dir)
+        try:
+            SkeletonDataRepository.save(motion_data.skeleton_data, os.path.join(tmp_dir, "skeleton"))
+            CoordinateDataRepository.save(motion_data.coordinate_data, os.path.join(tmp_dir, "coordinate"))
+            GraphDataRepository.save(motion_data.graph_data_list, os.path.join(tmp_dir, "graph"))
+            size = sum(bundle_size(os.path.join(tmp_dir, name)) for name in ["skeleton", "coordinate", "graph"])
+            with self._lock:
+                last_access = self._access_time()
+                if key in self._index["entries"]:
+                    # 他のスレッドが同じ内容を保存済みなので、書き込んだものは捨てる
+                    self._index["entries"][key]["last_access"] = last_access
+                else:
+                    entry_dir = os.path.join(self.cache_dir, key)
+                    shutil.rmtree(entry_dir, ignore_errors=True)  # 索引に記録されていない書き込み途中の残り
+                    os.replace(tmp_dir, entry_dir)
+                    self._index["entries"][key] = {"digest": digest, "version": self.version, "bytes": size,
+                                                   "last_access": last_access}
+                self._evict(keep_path=path)
+                self._write_index()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _evict(self, keep_path: str = None):
+        entries = sorted(self._index["entries"].items(), key=lambda item: item[1]["last_access"])
+        total = sum(entry["bytes"] for _, entry in entries)
+        evicted = []
+        for key, entry in entries[:-1]:  # 最新のエントリは残す
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= entry["bytes"]
+        self._remove_entries(evicted, invalidation=False, keep_path=keep_path)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry["bytes"] for entry in self._index["entries"].values())
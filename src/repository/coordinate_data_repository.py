@@ -0,0 +1,60 @@
+import argparse
+import json
+
+from src.model.skeleton_data import CoordinateData
+from src.repository.columnar_store import write_bundle, read_bundle
+
+KIND = "coordinate_data"
+
+
+class CoordinateDataRepository:
+    """CoordinateDataを列指向のバイナリ形式 (columnar_store) で保存・読み込みする"""
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def save(coordinate_data: CoordinateData, dir_path: str):
+        metadata = {
+            "joint_names": coordinate_data.joint_names,
+            "joints_hierarchy": coordinate_data.joints_hierarchy,
+            "fps": coordinate_data.fps,
+        }
+        write_bundle(dir_path, KIND, metadata, {
+            "world_pos": coordinate_data.world_pos,
+            "local_pos": coordinate_data.local_pos,
+        })
+
+    @staticmethod
+    def load(dir_path: str, mmap: bool = True) -> CoordinateData:
+        """mmap=Trueの場合、位置情報は読み取り専用のメモリマップとなり、参照したページだけが読み込まれる"""
+        metadata, arrays = read_bundle(dir_path, KIND, mmap=mmap)
+        return CoordinateData(world_pos=arrays["world_pos"],
+                              local_pos=arrays["local_pos"],
+                              joints_hierarchy=metadata["joints_hierarchy"],
+                              joint_names=metadata["joint_names"],
+                              fps=metadata["fps"])
+
+    @staticmethod
+    def load_json(json_file_path: str) -> CoordinateData:
+        """従来のjson (CoordinateData.to_json()の出力、またはそれをjson文字列として保存したもの) を読み込む"""
+        with open(json_file_path, encoding="utf-8") as f:
+            json_data = json.load(f)
+        if not isinstance(json_data, str):
+            json_data = json.dumps(json_data)
+        return CoordinateData.from_json(json_data)
+
+    @classmethod
+    def convert_json(cls, json_file_path: str, dir_path: str) -> CoordinateData:
+        """従来のjsonをバイナリ形式に変換する"""
+        coordinate_data = cls.load_json(json_file_path)
+        cls.save(coordinate_data, dir_path)
+        return coordinate_data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CoordinateDataのjsonを列指向のバイナリ形式に変換する")
+    parser.add_argument("json_file_path")
+    parser.add_argument("dir_path")
+    args = parser.parse_args()
+    CoordinateDataRepository.convert_json(args.json_file_path, args.dir_path)
@@ -0,0 +1,48 @@
+from typing import List
+
+import numpy as np
+
+from src.model.skeleton_data import GraphData, MultiPlotGraphData
+from src.repository.columnar_store import write_bundle, read_bundle
+
+KIND = "graph_data"
+
+
+class GraphDataRepository:
+    """GraphDataのリストを列指向のバイナリ形式 (columnar_store) で保存・読み込みする"""
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def save(graph_data_list: List[GraphData], dir_path: str):
+        graphs = []
+        arrays = {}
+        for i, graph_data in enumerate(graph_data_list):
+            graph = {"display_name": graph_data.display_name, "graph_key": graph_data.graph_key}
+            if isinstance(graph_data, MultiPlotGraphData):
+                graph["legends"] = graph_data.legends
+                graph["n_lines"] = len(graph_data.data)
+                for j, line_data in enumerate(graph_data.data):
+                    arrays[f"graph_{i}_{j}"] = np.asarray(line_data)
+            else:
+                arrays[f"graph_{i}"] = np.asarray(graph_data.data)
+            graphs.append(graph)
+        write_bundle(dir_path, KIND, {"graphs": graphs}, arrays)
+
+    @staticmethod
+    def load(dir_path: str, mmap: bool = True) -> List[GraphData]:
+        metadata, arrays = read_bundle(dir_path, KIND, mmap=mmap)
+        graph_data_list = []
+        for i, graph in enumerate(metadata["graphs"]):
+            if "legends" in graph:
+                graph_data_list.append(MultiPlotGraphData(
+                    data=[arrays[f"graph_{i}_{j}"] for j in range(graph["n_lines"])],
+                    display_name=graph["display_name"],
+                    graph_key=graph["graph_key"],
+                    legends=graph["legends"]))
+            else:
+                graph_data_list.append(GraphData(data=arrays[f"graph_{i}"],
+                                                 display_name=graph["display_name"],
+                                                 graph_key=graph["graph_key"]))
+        return graph_data_list
@@ -0,0 +1,135 @@
+import collections
+import dataclasses
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+from src.model.skeleton_data import CoordinateData, MotionData
+from src.repository.conversion_cache import CacheStatistics
+
+DEFAULT_MEMORY_MAX_BYTES = 1024 ** 3
+
+
+def _is_file_mapped(array: np.ndarray) -> bool:
+    """ディスク上のファイルのメモリマップ(の一部)か
+
+    参照したページはOSのページキャッシュに載るだけなので、プロセスのメモリとしては数えない。
+    名前を削除した一時ファイルのメモリマップ (CoordinateDataConverterの出力) はプロセスのメモリとして数える。
+    """
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap) and array.filename is not None and os.path.exists(array.filename):
+            return True
+        array = array.base
+    return False
+
+
+def _nbytes(value) -> int:
+    """numpyの配列(とそのリスト・辞書)が使用しているメモリの大きさ。ファイルのメモリマップは数えない"""
+    if isinstance(value, np.ndarray):
+        return 0 if _is_file_mapped(value) else value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+
+def motion_data_nbytes(motion_data: MotionData) -> int:
+    """MotionDataの配列が使用しているメモリの大きさ"""
+    size = 0
+    if motion_data.skeleton_data is not None:
+        size += _nbytes([getattr(motion_data.skeleton_data, field.name)
+                         for field in dataclasses.fields(motion_data.skeleton_data)])
+    size += _nbytes([motion_data.coordinate_data.local_pos, motion_data.coordinate_data.world_pos])
+    size += _nbytes([graph_data.data for graph_data in motion_data.graph_data_list])
+    return size
+
+
+@dataclasses.dataclass
+class _Entry:
+    size: int
+    mtime_ns: int
+    motion_data: MotionData
+    nbytes: int
+
+
+class MotionDataMemoryCache:
+    """読み込んだMotionDataをファイルパスごとにプロセス内に保持するLRUキャッシュ
+
+    ファイルのサイズ・更新時刻が変わったエントリは使わない。
+    配列の合計サイズがmax_bytesを超えた場合は、最後に参照された時刻が古いエントリから破棄する。
+    遅延読み込みした位置情報(WindowedCoordinateData)はファイルを開いたままにするので保持しない。
+    読み込み用のスレッドと先読み用のスレッドから使えるよう、操作はロックで排他する。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_MAX_BYTES):
+        self.max_bytes: int = max_bytes
+        self.statistics: CacheStatistics = CacheStatistics()
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, file_name: str) -> bool:
+        with self._lock:
+            return self._find(file_name) is not None
+
+    def _find(self, file_name: str) -> Optional[_Entry]:
+        path = os.path.abspath(file_name)
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        if stat is None or stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns:
+            # ファイルが変更された
+            del self._entries[path]
+            self.statistics.invalidations += 1
+            return None
+        return entry
+
+    def get(self, file_name: str) -> Optional[MotionData]:
+        """保持しているMotionData。ない場合はNone"""
+        with self._lock:
+            entry = self._find(file_name)
+            if entry is None:
+                self.statistics.misses += 1
+                return None
+            self._entries.move_to_end(os.path.abspath(file_name))
+            self.statistics.hits += 1
+            return entry.motion_data
+
+    def put(self, file_name: str, motion_data: MotionData):
+        if not isinstance(motion_data.coordinate_data, CoordinateData):
+            return
+        nbytes = motion_data_nbytes(motion_data)
+        if nbytes > self.max_bytes:
+            return
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        with self._lock:
+            self._entries[path] = _Entry(size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                                         motion_data=motion_data, nbytes=nbytes)
+            self._entries.move_to_end(path)
+            self._evict()
+
+    def _evict(self):
+        total = sum(entry.nbytes for entry in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.nbytes
+            self.statistics.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
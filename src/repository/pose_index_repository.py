@@ -0,0 +1,34 @@
+from src.repository.columnar_store import write_bundle, read_bundle
+from src.service.pose_search import PoseIndex, PosePca
+
+KIND = "pose_index"
+
+
+class PoseIndexRepository:
+    """PoseIndexを列指向のバイナリ形式 (columnar_store) で保存・読み込みする"""
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def save(pose_index: PoseIndex, dir_path: str, metadata: dict = None):
+        """metadataには索引の作成条件 (特徴ベクトルの正規化の有無など) を記録する"""
+        write_bundle(dir_path, KIND, {"take_names": pose_index.take_names, **(metadata or {})},
+                     {"mean": pose_index.pca.mean,
+                      "components": pose_index.pca.components,
+                      "embeddings": pose_index.embeddings,
+                      "take_offsets": pose_index.take_offsets})
+
+    @staticmethod
+    def load(dir_path: str, mmap: bool = True) -> PoseIndex:
+        """mmap=Trueの場合、主成分空間の位置はメモリマップのまま検索する"""
+        metadata, arrays = read_bundle(dir_path, KIND, mmap=mmap)
+        return PoseIndex(pca=PosePca(mean=arrays["mean"], components=arrays["components"]),
+                         embeddings=arrays["embeddings"],
+                         take_names=metadata["take_names"],
+                         take_offsets=arrays["take_offsets"])
+
+    @staticmethod
+    def load_metadata(dir_path: str) -> dict:
+        metadata, _ = read_bundle(dir_path, KIND, mmap=True)
+        return metadata
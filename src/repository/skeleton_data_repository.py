@@ -0,0 +1,45 @@
+import numpy as np
+
+from src.model.skeleton_data import SkeletonData
+from src.repository.columnar_store import write_bundle, read_bundle
+
+KIND = "skeleton_data"
+
+
+class SkeletonDataRepository:
+    """SkeletonDataを列指向のバイナリ形式 (columnar_store) で保存・読み込みする"""
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def save(skeleton_data: SkeletonData, dir_path: str):
+        metadata = {
+            "joints_names": skeleton_data.joints_names,
+            "joints_hierarchy": skeleton_data.joints_hierarchy,
+            "joints_saved_angles": skeleton_data.joints_saved_angles,
+            "joints_saved_positions": skeleton_data.joints_saved_positions,
+            "fps": skeleton_data.fps,
+        }
+        joints_offsets = np.array([skeleton_data.joints_offsets[joint] for joint in skeleton_data.joints_names],
+                                  dtype=np.float64).reshape(-1, 3)
+        write_bundle(dir_path, KIND, metadata, {
+            "joints_offsets": joints_offsets,
+            "root_positions": np.asarray(skeleton_data.root_positions),
+            "joints_rotations": np.asarray(skeleton_data.joints_rotations),
+            "joints_positions": np.asarray(skeleton_data.joints_positions),
+        })
+
+    @staticmethod
+    def load(dir_path: str, mmap: bool = True) -> SkeletonData:
+        metadata, arrays = read_bundle(dir_path, KIND, mmap=mmap)
+        joints_offsets = np.array(arrays["joints_offsets"])
+        return SkeletonData(joints_names=metadata["joints_names"],
+                            joints_offsets=dict(zip(metadata["joints_names"], joints_offsets)),
+                            joints_hierarchy=metadata["joints_hierarchy"],
+                            root_positions=arrays["root_positions"],
+                            joints_rotations=arrays["joints_rotations"],
+                            joints_saved_angles=metadata["joints_saved_angles"],
+                            joints_positions=arrays["joints_positions"],
+                            joints_saved_positions=metadata["joints_saved_positions"],
+                            fps=metadata["fps"])
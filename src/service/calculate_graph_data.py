@@ -1,102 +1,109 @@
 from typing import Dict, List
 
 import numpy as np
-import pandas as pd
 
 from src.model.skeleton_data import CoordinateData, GraphData, MultiPlotGraphData
+from src.service.graph_metrics import GraphMetric, GraphMetricRegistry, MetricContext, batch_joint_angles
+from src.service.kinematics import smoothed_velocity
 
 
-def angle_between_vectors(pos_list: List[Dict[str, np.array]],
+def angle_between_vectors(positions: np.ndarray,
+                          joint_index: Dict[str, int],
                           origin_joint_name: str,
                           a_joint_name: str,
                           b_joint_name: str):
     """２つのベクトルのなす角度 (3次元)
+
+    positions: shape (F, J, 3) の位置配列。joint_indexで関節名から関節の位置を参照する
+    複数の関節の組をまとめて計算する場合はbatch_joint_anglesを使う。
     """
-    # arccosを利用しているので180度を越える場合に利用不可能
-    origin_pos = np.array([x[origin_joint_name] for x in pos_list])
-    a_pos = np.array([x[a_joint_name] for x in pos_list])
-    b_pos = np.array([x[b_joint_name] for x in pos_list])
+    triplet = [[joint_index[origin_joint_name], joint_index[a_joint_name], joint_index[b_joint_name]]]
+    return batch_joint_angles(positions, np.array(triplet, dtype=np.int64))[:, 0]
 
-    vec_from_a_to_origin = a_pos - origin_pos
-    vec_from_b_to_origin = b_pos - origin_pos
 
-    # ベクトルa,bの内積を計算
-    inner = np.array([np.dot(vec_a_i, vec_b_i) for vec_a_i, vec_b_i in zip(vec_from_a_to_origin, vec_from_b_to_origin)])
+def angle_between_vectors_2d(positions: np.ndarray,
+                             joint_index: Dict[str, int],
+                             origin_joint_name: str,
+                             a_joint_name: str,
+                             b_joint_name: str,
+                             ax=None):
+    """２つのベクトルをax(既定: 0番目と最後の軸)の平面に射影したなす角度"""
+    triplet = [[joint_index[origin_joint_name], joint_index[a_joint_name], joint_index[b_joint_name]]]
+    ax = [0, -1] if not ax else ax
+    return batch_joint_angles(positions, np.array(triplet, dtype=np.int64), axes=ax)[:, 0]
 
-    # ベクトルa,bの大きさを計算
-    norm_from_a_to_origin = np.linalg.norm(vec_from_a_to_origin, axis=1)
-    norm_from_b_to_origin = np.linalg.norm(vec_from_b_to_origin, axis=1)
 
-    norm_dot = norm_from_a_to_origin * norm_from_b_to_origin
-    norm_dot = [data if data != 0 else 1 for data in norm_dot]
+# 身体のスピードの移動平均のフレーム数
+BODY_SPEED_WINDOW = 10
 
-    # ベクトルa,bのなす角度を計算
-    return np.rad2deg(np.arccos(inner / norm_dot))
 
+def _head_y_position(context: MetricContext) -> np.ndarray:
+    return context.joint("head", space="local")[:, 1]
 
-def angle_between_vectors_2d(pos_list: List[Dict[str, np.array]],
-                             origin_joint_name: str,
-                             a_joint_name: str,
-                             b_joint_name: str,
-                             ax=None):
-    # arccosを利用しているので180度を越える場合に利用不可能
 
-    origin_pos = np.array([x[origin_joint_name] for x in pos_list])
-    a_pos = np.array([x[a_joint_name] for x in pos_list])
-    b_pos = np.array([x[b_joint_name] for x in pos_list])
+def _knee_angles(context: MetricContext) -> List[np.ndarray]:
+    return [context.angle("l_low_leg", "l_foot", "l_up_leg"),
+            context.angle("r_low_leg", "r_foot", "r_up_leg")]
 
-    ax = [0, -1] if not ax else ax
-    vec_from_a_to_origin = a_pos[:, ax] - origin_pos[:, ax]
-    vec_from_b_to_origin = b_pos[:, ax] - origin_pos[:, ax]
-    inner = np.array([np.dot(vec_a_i, vec_b_i) for vec_a_i, vec_b_i in zip(vec_from_a_to_origin, vec_from_b_to_origin)])
-    norm_from_a_to_origin = np.linalg.norm(vec_from_a_to_origin, axis=1)
-    norm_from_b_to_origin = np.linalg.norm(vec_from_b_to_origin, axis=1)
-    norm_dot = norm_from_a_to_origin * norm_from_b_to_origin
-    norm_dot = [data if data != 0 else 1 for data in norm_dot]
-    return np.rad2deg(np.arccos(inner / norm_dot))
+
+def _body_speed(context: MetricContext) -> np.ndarray:
+    velocity = context.velocity("torso_1", space="world", window=BODY_SPEED_WINDOW) * 0.01  # cm to meter
+    return np.sqrt(np.einsum("fk,fk->f", velocity, velocity))
+
+
+# ビューアに表示するグラフデータの定義。graph_keyを指定してGraphMetricを登録すればグラフを追加できる
+GRAPH_METRICS = GraphMetricRegistry([
+    GraphMetric(graph_key="head_pos_z", display_name="Head position (z-axis) [cm]", calculate=_head_y_position,
+                joints=("head",)),
+    GraphMetric(graph_key="knee_angle", display_name="Knee angle [degree]", calculate=_knee_angles,
+                angles=(("l_low_leg", "l_foot", "l_up_leg"), ("r_low_leg", "r_foot", "r_up_leg")),
+                legends=["left", "right"]),
+    # 先頭の計算できないフレームはBODY_SPEED_WINDOWフレーム先までの位置で決まる値で埋める
+    GraphMetric(graph_key="body_speed", display_name="Body speed [m/s]", calculate=_body_speed,
+                joints=("torso_1",), context_frames=BODY_SPEED_WINDOW),
+])
+
+# ビューアに表示するグラフデータ (表示順)
+DEFAULT_GRAPH_KEYS = ["head_pos_z", "knee_angle", "body_speed"]
 
 
 class CalculateGraphData:
 
+    # 計算結果が変わる変更をした場合は上げる (変換結果のキャッシュの無効化に使う)
+    VERSION = 2
+
     def __init__(self):
         pass
 
+    @classmethod
+    def calculate_default_graph_data(cls, coordinate_data: CoordinateData,
+                                     graph_keys: List[str] = None) -> List[GraphData]:
+        """ビューアに表示するグラフデータ一式。関節の位置の取り出しや角度の計算は全てのグラフでまとめて一度だけ行う"""
+        return GRAPH_METRICS.evaluate(coordinate_data, DEFAULT_GRAPH_KEYS if graph_keys is None else graph_keys)
+
     @staticmethod
     def calculate_head_y_position(coordinate_data: CoordinateData) -> GraphData:
         """頭の位置"""
-        head_z = [x["head"][1] for x in coordinate_data.local_pos_list]
-        return GraphData(data=head_z, display_name="Head position (z-axis) [cm]", graph_key="head_pos_z")
+        return GRAPH_METRICS.evaluate(coordinate_data, ["head_pos_z"])[0]
 
     @staticmethod
     def calculate_body_speed(coordinate_data: CoordinateData) -> GraphData:
         """身体(torso_1)のスピード"""
-        torso_1_pos = np.array([x["torso_1"] for x in coordinate_data.world_pos_list])
-        torso_1_pos_m = torso_1_pos * 0.01  # cm to meter
-        df_pos = pd.DataFrame(torso_1_pos_m, columns=["x", 'y', "z"])
-        window = 10
-        df_pos = df_pos.rolling(window=window, center=True).mean()
-        df_vel = (df_pos - df_pos.shift(1)) * coordinate_data.fps
-        df_vel.fillna(method='bfill', inplace=True)
-        speed = (df_vel['x'] ** 2 + df_vel["y"] ** 2 + df_vel["z"] ** 2) ** 0.5
+        return GRAPH_METRICS.evaluate(coordinate_data, ["body_speed"])[0]
+
+    @staticmethod
+    def calculate_body_speed_from_positions(torso_1_pos: np.ndarray, fps: int) -> GraphData:
+        """身体(torso_1)のスピード
 
-        return GraphData(data=speed, display_name="Body speed [m/s]", graph_key="body_speed")
+        torso_1_pos: shape (F, 3) の絶対座標系での位置 [cm]
+        """
+        velocity = smoothed_velocity(np.asarray(torso_1_pos, dtype=np.float64) * 0.01, fps=fps,
+                                     window=BODY_SPEED_WINDOW)  # cm to meter
+        speed = np.sqrt(np.einsum("fk,fk->f", velocity, velocity))
+        metric = GRAPH_METRICS.get("body_speed")
+        return GraphData(data=speed, display_name=metric.display_name, graph_key=metric.graph_key)
 
     @staticmethod
     def calculate_knee_angles(coordinate_data: CoordinateData) -> MultiPlotGraphData:
         """膝関節角度"""
-        l_knee_angle = angle_between_vectors(pos_list=coordinate_data.local_pos_list,
-                                             origin_joint_name="l_low_leg",
-                                             a_joint_name="l_foot",
-                                             b_joint_name="l_up_leg")
-
-        r_knee_angle = angle_between_vectors(pos_list=coordinate_data.local_pos_list,
-                                             origin_joint_name="r_low_leg",
-                                             a_joint_name="r_foot",
-                                             b_joint_name="r_up_leg")
-
-        return MultiPlotGraphData(
-            data=[l_knee_angle, r_knee_angle],
-            display_name="Knee angle [degree]",
-            graph_key="knee_angle",
-            legends=["left", "right"]
-        )
+        return GRAPH_METRICS.evaluate(coordinate_data, ["knee_angle"])[0]
@@ -1,13 +1,47 @@
+import dataclasses
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+from typing import Iterable, Iterator
+
 import numpy as np
 
 from src.model.skeleton_data import SkeletonData, CoordinateData
 
+_AXES = 'xyz'
+
+# 並列計算のワーカープロセスごとの状態 (_initialize_workerで設定する)
+_worker_state: dict = {}
+
+# 並列計算の出力を置くディレクトリ。Linuxではメモリ上のファイルシステムを使う
+_SHARED_OUTPUT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
 
 class CoordinateDataConverter:
-    """skeleton_dataをcoordinate_dataに変換する"""
+    """skeleton_dataをcoordinate_dataに変換する
+
+    engine="vectorized" は全フレーム・全関節の回転行列を一括で計算する(既定)。
+    engine="loop" はフレームごと・関節ごとに計算する従来の実装。
 
-    def __init__(self):
-        pass
+    workersが2以上の場合、engine="vectorized"ではフレームをchunk_sizeフレームずつに分けてプロセスプールで並列に計算する。
+    入力と出力は共有メモリに置くので、ワーカーとの間で位置情報をpickleでやり取りしない。
+    出力はファイルを割り当てた共有メモリ (np.memmap) に書き込み、返り値はコピーせずにそのまま参照する。
+    """
+
+    ENGINES = ("vectorized", "loop")
+
+    # 計算結果が変わる変更をした場合は上げる (変換結果のキャッシュの無効化に使う)
+    VERSION = 1
+
+    def __init__(self, engine: str = "vectorized", workers: int = 1, chunk_size: int = 2000):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if workers < 1 or chunk_size < 1:
+            raise ValueError("workers and chunk_size must be positive")
+        self.engine: str = engine
+        self.workers: int = workers
+        self.chunk_size: int = chunk_size
 
     @staticmethod
     def Rx(ang, in_radians=False):
@@ -118,8 +152,173 @@ class CoordinateDataConverter:
 
         return world_pos
 
+    @staticmethod
+    def _calculate_joint_rotations(skeleton_data: SkeletonData) -> np.ndarray:
+        """全フレーム・全関節の回転行列 shape: (F, J, 3, 3)
+
+        各関節の回転はjoints_saved_anglesのチャンネル順に R_1 @ R_2 @ R_3 と連結する。
+        """
+        joints = skeleton_data.joints_names
+        joints_rotations = skeleton_data.joints_rotations
+        n_frames = len(joints_rotations)
+        rotations = np.broadcast_to(np.eye(3), (n_frames, len(joints), 3, 3)).copy()
+
+        # joints_rotationsは関節順に各関節の回転チャンネルを並べたもの
+        joint_columns = []
+        column = 0
+        for joint in joints:
+            joint_columns.append(column)
+            column += len(skeleton_data.joints_saved_angles[joint])
+
+        n_slots = max([len(skeleton_data.joints_saved_angles[joint]) for joint in joints], default=0)
+        for slot in range(n_slots):
+            joint_ids, columns, axes = [], [], []
+            for joint_index, joint in enumerate(joints):
+                saved_angles = skeleton_data.joints_saved_angles[joint]
+                if slot >= len(saved_angles) or saved_angles[slot][0].lower() not in _AXES:
+                    continue
+                joint_ids.append(joint_index)
+                columns.append(joint_columns[joint_index] + slot)
+                axes.append(_AXES.index(saved_angles[slot][0].lower()))
+            if not joint_ids:
+                continue
+
+            angles = np.radians(joints_rotations[:, columns].astype(np.float64))
+            cos, sin = np.cos(angles), np.sin(angles)
+            axis_rotations = np.zeros((n_frames, len(joint_ids), 3, 3))
+            axes = np.array(axes)
+            for axis, (i, j) in enumerate([(1, 2), (2, 0), (0, 1)]):
+                mask = axes == axis
+                axis_rotations[:, mask, axis, axis] = 1
+                axis_rotations[:, mask, i, i] = cos[:, mask]
+                axis_rotations[:, mask, j, j] = cos[:, mask]
+                axis_rotations[:, mask, i, j] = -sin[:, mask]
+                axis_rotations[:, mask, j, i] = sin[:, mask]
+            rotations[:, joint_ids] = rotations[:, joint_ids] @ axis_rotations
+
+        return rotations
+
+    def calculate_positions(self, skeleton_data: SkeletonData):
+        """全フレーム・全関節の位置を計算する
+
+        Returns: (local_positions, world_positions) shape: (F, J, 3), float32
+        """
+        if self.workers > 1 and len(skeleton_data.joints_rotations) > self.chunk_size:
+            return self._calculate_positions_in_parallel(skeleton_data)
+        local_positions, world_positions = self._calculate_positions(skeleton_data)
+        return local_positions.astype(np.float32), world_positions.astype(np.float32)
+
+    def _calculate_positions_in_parallel(self, skeleton_data: SkeletonData):
+        """フレームをchunk_sizeフレームずつに分け、プロセスプールで計算して共有メモリの出力に直接書き込む
+
+        SharedMemoryは配列が参照している間は閉じられないので、出力は名前を削除したファイルのnp.memmapとして返す。
+        メモリは返した配列が解放されたときに解放される。
+        """
+        joints_rotations = np.asarray(skeleton_data.joints_rotations, dtype=np.float32)
+        root_positions = np.asarray(skeleton_data.root_positions, dtype=np.float32)
+        n_frames, n_joints = len(joints_rotations), len(skeleton_data.joints_names)
+        input_shape = (n_frames, joints_rotations.shape[1] + 3)
+        output_shape = (2, n_frames, n_joints, 3)  # 0: local, 1: world
+
+        input_memory = shared_memory.SharedMemory(create=True, size=max(1, 4 * int(np.prod(input_shape))))
+        output_fd, output_path = tempfile.mkstemp(prefix="bvh_viewer_positions_", suffix=".f32",
+                                                  dir=_SHARED_OUTPUT_DIR)
+        os.close(output_fd)
+        try:
+            outputs = np.memmap(output_path, dtype=np.float32, mode="w+", shape=output_shape)
+            inputs = np.ndarray(input_shape, dtype=np.float32, buffer=input_memory.buf)
+            inputs[:, :-3] = joints_rotations
+            inputs[:, -3:] = root_positions
+            del inputs
+
+            # フレームに依存しない骨格の情報はワーカーの起動時に一度だけ渡す
+            skeleton = dataclasses.replace(skeleton_data, root_positions=np.empty((0, 3), dtype=np.float32),
+                                           joints_rotations=np.empty((0, input_shape[1] - 3), dtype=np.float32),
+                                           joints_positions=np.array([]))
+            chunks = [(start, min(start + self.chunk_size, n_frames))
+                      for start in range(0, n_frames, self.chunk_size)]
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)),
+                                     initializer=_initialize_worker,
+                                     initargs=(skeleton, input_memory.name, input_shape,
+                                               output_path, output_shape)) as executor:
+                for _ in executor.map(_convert_chunk, chunks):
+                    pass
+
+            try:
+                # 名前を削除しても、配列が参照している間はメモリは解放されない
+                os.remove(output_path)
+            except PermissionError:
+                # 開いているファイルを削除できないOS (Windows) ではコピーしてから削除する
+                outputs = np.array(outputs)
+            outputs = np.asarray(outputs)
+            return outputs[0], outputs[1]
+        finally:
+            input_memory.close()
+            input_memory.unlink()
+            if os.path.exists(output_path):
+                try:
+                    os.remove(output_path)
+                except PermissionError:
+                    pass
+
+    def _calculate_positions(self, skeleton_data: SkeletonData):
+        """全フレーム・全関節の位置を一括で計算する
+
+        親から子へ階層の深さごとに大域的な回転を伝播させる。
+        Returns: (local_positions, world_positions) shape: (F, J, 3), float64
+        """
+        joints = skeleton_data.joints_names
+        joint_indices = {joint: i for i, joint in enumerate(joints)}
+        n_frames = len(skeleton_data.joints_rotations)
+
+        rotations = self._calculate_joint_rotations(skeleton_data)
+        offsets = np.array([skeleton_data.joints_offsets[joint] for joint in joints], dtype=np.float64)
+        depths = np.array([len(skeleton_data.joints_hierarchy[joint]) for joint in joints])
+        parents = np.array([joint_indices[skeleton_data.joints_hierarchy[joint][0]] if depths[i] else -1
+                            for i, joint in enumerate(joints)])
+
+        global_rotations = np.empty_like(rotations)
+        positions = np.empty((n_frames, len(joints), 3))
+        for depth in range(depths.max() + 1 if len(joints) else 0):
+            ids = np.flatnonzero(depths == depth)
+            if depth == 0:
+                global_rotations[:, ids] = rotations[:, ids]
+                positions[:, ids] = offsets[ids]
+                continue
+            parent_ids = parents[ids]
+            positions[:, ids] = positions[:, parent_ids] \
+                + np.einsum('fjab,jb->fja', global_rotations[:, parent_ids], offsets[ids])
+            global_rotations[:, ids] = global_rotations[:, parent_ids] @ rotations[:, ids]
+
+        # root jointのローカル座標は(0,0,0)とする
+        local_positions = positions
+        local_positions[:, 0] = 0
+
+        root_positions = np.asarray(skeleton_data.root_positions, dtype=np.float64)
+        world_positions = root_positions[:, None, :] \
+            + np.einsum('fab,fjb->fja', rotations[:, 0], local_positions)
+        return local_positions, world_positions
+
     def convert_to_coordinate_data(self, skeleton_data: SkeletonData) -> CoordinateData:
         """skeleton_dataをcoordinate_dataに変換する"""
+        if self.engine == "loop":
+            return self._convert_to_coordinate_data_by_loop(skeleton_data=skeleton_data)
+
+        local_positions, world_positions = self.calculate_positions(skeleton_data)
+
+        return CoordinateData(world_pos=world_positions,
+                              local_pos=local_positions,
+                              joint_names=skeleton_data.joints_names,
+                              joints_hierarchy=skeleton_data.joints_hierarchy,
+                              fps=skeleton_data.fps)
+
+    def iter_convert(self, skeleton_data_chunks: Iterable[SkeletonData]) -> Iterator[CoordinateData]:
+        """チャンクごとのスケルトンデータを順に変換する。各フレームは独立に計算されるので、結果は一括で変換した場合と同じ"""
+        for skeleton_data in skeleton_data_chunks:
+            yield self.convert_to_coordinate_data(skeleton_data=skeleton_data)
+
+    def _convert_to_coordinate_data_by_loop(self, skeleton_data: SkeletonData) -> CoordinateData:
+        """フレームごと・関節ごとに計算する従来の実装"""
         frame_joints_rotations = {en: [] for en in skeleton_data.joints_names}
 
         local_pos_list = []
@@ -149,8 +348,42 @@ class CoordinateDataConverter:
                                                                         skeleton_data.joints_saved_angles[skeleton_data.joints_names[0]])
             world_pos_list.append(world_pos)
 
-        return CoordinateData(world_pos_list=world_pos_list,
+        return CoordinateData.from_pos_list(world_pos_list=world_pos_list,
                               local_pos_list=local_pos_list,
                               joint_names=skeleton_data.joints_names,
                               joints_hierarchy=skeleton_data.joints_hierarchy,
                               fps=skeleton_data.fps)
+
+
+def _initialize_worker(skeleton: SkeletonData, input_name: str, input_shape, output_path: str, output_shape):
+    input_memory = shared_memory.SharedMemory(name=input_name)
+    _worker_state.update(
+        skeleton=skeleton,
+        converter=CoordinateDataConverter(),
+        input_memory=input_memory,
+        inputs=np.ndarray(input_shape, dtype=np.float32, buffer=input_memory.buf),
+        outputs=np.memmap(output_path, dtype=np.float32, mode="r+", shape=output_shape),
+    )
+    # ワーカーの終了時に共有メモリを閉じる (atexitはワーカープロセスでは呼ばれないので、multiprocessingの終了処理に登録する)
+    util.Finalize(None, _finalize_worker, exitpriority=10)
+
+
+def _finalize_worker():
+    """共有メモリを参照する配列を解放してから閉じる"""
+    _worker_state.pop("inputs", None)
+    _worker_state.pop("outputs", None)
+    input_memory = _worker_state.pop("input_memory", None)
+    if input_memory is not None:
+        input_memory.close()
+
+
+def _convert_chunk(chunk):
+    """[start, stop) のフレームを計算し、共有メモリの出力に書き込む"""
+    start, stop = chunk
+    inputs, outputs = _worker_state["inputs"], _worker_state["outputs"]
+    skeleton_data = dataclasses.replace(_worker_state["skeleton"],
+                                        joints_rotations=inputs[start:stop, :-3],
+                                        root_positions=inputs[start:stop, -3:])
+    local_positions, world_positions = _worker_state["converter"]._calculate_positions(skeleton_data)
+    outputs[0, start:stop] = local_positions
+    outputs[1, start:stop] = world_positions
@@ -0,0 +1,169 @@
+import dataclasses
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.model.skeleton_data import CoordinateData, GraphData, MultiPlotGraphData
+from src.service.kinematics import Kinematics, calculate_kinematics, smoothed_velocity
+
+# 位置情報の座標系
+SPACES = ("local", "world")
+
+# 関節角度の指定 (角度の原点の関節名, ベクトルaの先の関節名, ベクトルbの先の関節名)
+AngleJoints = Tuple[str, str, str]
+
+
+def batch_joint_angles(positions: np.ndarray, triplets: np.ndarray, axes: Sequence[int] = None) -> np.ndarray:
+    """複数の関節の組の角度をまとめて計算する [degree]
+
+    positions: shape (F, J, 3) の位置配列
+    triplets: shape (T, 3) の (原点の関節, 関節a, 関節b) のindex
+    axes: 指定した場合はその座標軸に射影した2次元での角度を計算する
+    返り値: shape (F, T)
+
+    arccosではなくatan2(|a×b|, a・b)で計算するので、0度・180度付近でも精度が落ちずnanにならない。
+    長さ0のベクトルとの角度は従来の計算と同じく90度とする。
+    """
+    triplets = np.asarray(triplets, dtype=np.int64).reshape(-1, 3)
+    gathered = np.asarray(positions)[:, triplets].astype(np.float64)  # (F, T, 3, 3)
+    if axes is not None:
+        gathered = gathered[..., list(axes)]
+    vec_a = gathered[:, :, 1] - gathered[:, :, 0]
+    vec_b = gathered[:, :, 2] - gathered[:, :, 0]
+    inner = np.einsum("ftk,ftk->ft", vec_a, vec_b)
+    if vec_a.shape[-1] == 2:
+        cross_norm = np.abs(vec_a[..., 0] * vec_b[..., 1] - vec_a[..., 1] * vec_b[..., 0])
+    else:
+        cross = np.cross(vec_a, vec_b)
+        cross_norm = np.sqrt(np.einsum("ftk,ftk->ft", cross, cross))
+    angles = np.rad2deg(np.arctan2(cross_norm, inner))
+    is_zero = (np.einsum("ftk,ftk->ft", vec_a, vec_a) == 0) | (np.einsum("ftk,ftk->ft", vec_b, vec_b) == 0)
+    angles[is_zero] = 90.0
+    return angles
+
+
+class MetricContext:
+    """グラフデータの計算に使う中間データ
+
+    計算するグラフが必要とする関節の位置はまとめて一度だけ取り出し、関節角度は全ての組をまとめて一度だけ計算する。
+    速度などの派生データはcachedで一度だけ計算し、複数のグラフで共有する。
+    """
+
+    def __init__(self, coordinate_data: CoordinateData, joint_names: Sequence[str] = (),
+                 angles: Sequence[AngleJoints] = ()):
+        self.coordinate_data: CoordinateData = coordinate_data
+        self.fps: int = coordinate_data.fps
+        joint_names = list(dict.fromkeys(joint_names))
+        self._joint_columns: Dict[str, int] = {name: i for i, name in enumerate(joint_names)}
+        self._joint_indices = np.array([coordinate_data.joint_index[name] for name in joint_names], dtype=np.int64)
+        self._angle_columns: Dict[AngleJoints, int] = {key: i for i, key in enumerate(dict.fromkeys(angles))}
+        self._cache: Dict[Hashable, object] = {}
+
+    def cached(self, key: Hashable, calculate: Callable[[], object]):
+        """keyの中間データ。初回だけcalculateで計算する"""
+        if key not in self._cache:
+            self._cache[key] = calculate()
+        return self._cache[key]
+
+    def positions(self, space: str = "local") -> np.ndarray:
+        """宣言された全ての関節の位置 shape: (F, K, 3)"""
+        if space not in SPACES:
+            raise ValueError(f"unknown space: {space}")
+        pos = self.coordinate_data.local_pos if space == "local" else self.coordinate_data.world_pos
+        return self.cached(("positions", space), lambda: pos[:, self._joint_indices].astype(np.float64))
+
+    def joint(self, joint_name: str, space: str = "local") -> np.ndarray:
+        """宣言された関節の位置 shape: (F, 3)"""
+        return self.positions(space)[:, self._joint_columns[joint_name]]
+
+    def velocity(self, joint_name: str, space: str = "world", window: int = 10) -> np.ndarray:
+        """宣言された関節の速度 shape: (F, 3)。宣言された全ての関節の速度をまとめて一度だけ計算する"""
+        velocities = self.cached(("velocity", space, window),
+                                 lambda: smoothed_velocity(self.positions(space), self.fps, window))
+        return velocities[:, self._joint_columns[joint_name]]
+
+    def kinematics(self, space: str = "world", method: str = "moving_average", **kwargs) -> Kinematics:
+        """宣言された全ての関節の速度・加速度・躍度 shape: (F, K, 3)。引数はcalculate_kinematicsと同じ"""
+        return self.cached(("kinematics", space, method, tuple(sorted(kwargs.items()))),
+                           lambda: calculate_kinematics(self.positions(space), self.fps, method=method, **kwargs))
+
+    def joint_column(self, joint_name: str) -> int:
+        """宣言された関節の、positions()などの2番目の軸でのindex"""
+        return self._joint_columns[joint_name]
+
+    def angle(self, origin_joint_name: str, a_joint_name: str, b_joint_name: str) -> np.ndarray:
+        """宣言された関節角度 (ローカル座標系) shape: (F,)"""
+        angles = self.cached("angles", self._calculate_angles)
+        return angles[:, self._angle_columns[(origin_joint_name, a_joint_name, b_joint_name)]]
+
+    def _calculate_angles(self) -> np.ndarray:
+        joint_index = self.coordinate_data.joint_index
+        triplets = [[joint_index[name] for name in key] for key in self._angle_columns]
+        return batch_joint_angles(self.coordinate_data.local_pos, np.array(triplets, dtype=np.int64))
+
+
+@dataclasses.dataclass
+class GraphMetric:
+    """グラフデータの定義
+
+    calculateはMetricContextから1本の線のデータ、またはlegendsと同じ数の線のデータのリストを計算する。
+    joints, anglesには計算に使う関節と関節角度を宣言する。
+    context_framesには、各フレームの値が前後何フレームの位置から決まるか (先頭・末尾の補完も含む) を宣言する。
+    チャンクごとに計算する場合 (streaming_graph_data) は、その分だけ前後のフレームを持ち越して計算する。
+    """
+    graph_key: str
+    display_name: str
+    calculate: Callable[[MetricContext], Union[np.ndarray, List[np.ndarray]]]
+    joints: Tuple[str, ...] = ()
+    angles: Tuple[AngleJoints, ...] = ()
+    legends: Optional[List[str]] = None
+    context_frames: int = 0
+
+    @property
+    def n_lines(self) -> int:
+        return 1 if self.legends is None else len(self.legends)
+
+    def to_graph_data(self, context: MetricContext) -> GraphData:
+        data = self.calculate(context)
+        if self.legends is not None:
+            return MultiPlotGraphData(data=list(data), display_name=self.display_name, graph_key=self.graph_key,
+                                      legends=list(self.legends))
+        return GraphData(data=data, display_name=self.display_name, graph_key=self.graph_key)
+
+
+class GraphMetricRegistry:
+    """グラフデータの定義の登録先
+
+    evaluateで指定したグラフが宣言した関節・関節角度をまとめたMetricContextを作成し、1回の計算で全てのグラフデータを求める。
+    """
+
+    def __init__(self, metrics: Sequence[GraphMetric] = ()):
+        self._metrics: Dict[str, GraphMetric] = {}
+        for metric in metrics:
+            self.register(metric)
+
+    def register(self, metric: GraphMetric, replace: bool = False):
+        if metric.graph_key in self._metrics and not replace:
+            raise ValueError(f"graph_key is already registered: {metric.graph_key}")
+        self._metrics[metric.graph_key] = metric
+
+    def get(self, graph_key: str) -> GraphMetric:
+        return self._metrics[graph_key]
+
+    def keys(self) -> List[str]:
+        return list(self._metrics)
+
+    def __contains__(self, graph_key: str) -> bool:
+        return graph_key in self._metrics
+
+    def create_context(self, coordinate_data: CoordinateData, graph_keys: Sequence[str]) -> MetricContext:
+        metrics = [self._metrics[key] for key in graph_keys]
+        return MetricContext(coordinate_data,
+                             joint_names=[name for metric in metrics for name in metric.joints],
+                             angles=[angle for metric in metrics for angle in metric.angles])
+
+    def evaluate(self, coordinate_data: CoordinateData, graph_keys: Sequence[str] = None) -> List[GraphData]:
+        """graph_keysのグラフデータをまとめて計算する。省略した場合は登録された全てのグラフデータ"""
+        graph_keys = self.keys() if graph_keys is None else list(graph_keys)
+        context = self.create_context(coordinate_data, graph_keys)
+        return [self._metrics[key].to_graph_data(context) for key in graph_keys]
@@ -0,0 +1,232 @@
+import dataclasses
+import math
+from typing import Tuple
+
+import numpy as np
+
+# 平滑化の方法
+METHODS = ("moving_average", "savgol", "lowpass")
+
+# 平滑化の窓が揃わない端のフレームの扱い
+#   bfill: 先頭は最初に計算できた値で埋め、末尾はnanとする (pandasの rolling(center=True) + bfill() と同じ)
+#   nearest: 先頭・末尾とも最も近い計算できた値で埋める
+#   nan: 埋めない
+EDGES = ("bfill", "nearest", "nan")
+
+
+@dataclasses.dataclass
+class Kinematics:
+    """全関節の速度・加速度・躍度
+
+    いずれも位置と同じshape (F, J, 3) で、単位は位置の単位/s, /s^2, /s^3
+    """
+    velocity: np.ndarray
+    acceleration: np.ndarray
+    jerk: np.ndarray
+
+    def speed(self) -> np.ndarray:
+        """速度の大きさ shape: (F, J)"""
+        return _norm(self.velocity)
+
+    def exceeds(self, speed: float = None, acceleration: float = None, jerk: float = None) -> np.ndarray:
+        """指定した値を越える速度・加速度・躍度の大きさを持つ (フレーム, 関節) shape: (F, J)
+
+        速い動きを探す場合に使う。nanのフレームはFalseとする。
+        """
+        result = np.zeros(self.velocity.shape[:-1], dtype=bool)
+        for values, threshold in ((self.velocity, speed), (self.acceleration, acceleration), (self.jerk, jerk)):
+            if threshold is not None:
+                result |= _norm(values) > threshold
+        return result
+
+
+def _norm(values: np.ndarray) -> np.ndarray:
+    return np.sqrt(np.einsum("...k,...k->...", values, values))
+
+
+def _place(valid: np.ndarray, offset: int, n_frames: int, edge: str) -> np.ndarray:
+    """窓が揃ったフレームだけの値validを、offsetフレーム目から並べた全フレームの配列にし、端をedgeの方法で埋める"""
+    if edge not in EDGES:
+        raise ValueError(f"unknown edge: {edge}")
+    result = np.full((n_frames,) + valid.shape[1:], np.nan)
+    if len(valid) == 0:
+        return result
+    stop = offset + len(valid)
+    result[offset:stop] = valid
+    if edge in ("bfill", "nearest"):
+        result[:offset] = valid[0]
+    if edge == "nearest":
+        result[stop:] = valid[-1]
+    return result
+
+
+def _correlate(values: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """フレーム方向にkernelとの相関をとる。窓が揃ったフレームだけを返す shape: (F - len(kernel) + 1, ...)
+
+    タップごとに全フレーム・全関節をまとめて足し合わせるので、Pythonのループはタップ数だけ。
+    平滑化・微分の係数は左右対称(偶数階)または反対称(奇数階)なので、その場合は対になるタップを先に足し引きして積の回数を半分にする。
+    """
+    n_valid = len(values) - len(kernel) + 1
+    result = np.zeros((max(n_valid, 0),) + values.shape[1:])
+    if n_valid <= 0:
+        return result
+    n_taps = len(kernel)
+    if np.allclose(kernel, kernel[::-1]):
+        sign = 1.0
+    elif np.allclose(kernel, -kernel[::-1]):
+        sign = -1.0
+    else:
+        sign = 0.0
+    buffer = np.empty_like(result)
+    for k in range(n_taps if sign == 0 else (n_taps + 1) // 2):
+        coefficient = kernel[k]
+        if coefficient == 0:
+            continue
+        window = values[k:k + n_valid]
+        mirror = n_taps - 1 - k
+        if sign != 0 and mirror != k:
+            if sign > 0:
+                np.add(window, values[mirror:mirror + n_valid], out=buffer)
+            else:
+                np.subtract(window, values[mirror:mirror + n_valid], out=buffer)
+            buffer *= coefficient
+        else:
+            np.multiply(window, coefficient, out=buffer)
+        result += buffer
+    return result
+
+
+def _moving_average_valid(values: np.ndarray, window: int) -> np.ndarray:
+    """累積和による移動平均。窓が揃ったフレームだけを返す shape: (F - window + 1, ...)"""
+    if len(values) < window:
+        return np.empty((0,) + values.shape[1:])
+    # 累積和の桁落ちを抑えるため、先頭フレームからの差の累積和をとる
+    reference = values[0]
+    cumsum = np.empty((len(values) + 1,) + values.shape[1:])
+    cumsum[0] = 0
+    np.subtract(values, reference, out=cumsum[1:])
+    np.cumsum(cumsum[1:], axis=0, out=cumsum[1:])
+    means = cumsum[window:] - cumsum[:-window]
+    means /= window
+    means += reference
+    return means
+
+
+def moving_average(values: np.ndarray, window: int = 10, edge: str = "nan") -> np.ndarray:
+    """中心化した移動平均 (pandasの rolling(window, center=True).mean() と同じ位置)"""
+    values = np.asarray(values, dtype=np.float64)
+    return _place(_moving_average_valid(values, window), window // 2, len(values), edge)
+
+
+def savgol_coefficients(window: int, polyorder: int, deriv: int = 0, delta: float = 1.0) -> np.ndarray:
+    """Savitzky–Golayフィルタの係数 (窓の中心のフレームでのderiv階微分)。windowは奇数"""
+    if window % 2 != 1:
+        raise ValueError("window must be odd")
+    if not deriv <= polyorder < window:
+        raise ValueError("polyorder must satisfy deriv <= polyorder < window")
+    half = window // 2
+    t = np.arange(-half, half + 1, dtype=np.float64)
+    vander = t[:, None] ** np.arange(polyorder + 1)[None, :]
+    # 最小二乗で当てはめた多項式のderiv次の係数を求める行列の行
+    return np.linalg.pinv(vander)[deriv] * math.factorial(deriv) / delta ** deriv
+
+
+def savgol_filter(values: np.ndarray, window: int = 11, polyorder: int = 3, deriv: int = 0, delta: float = 1.0,
+                  edge: str = "nan") -> np.ndarray:
+    """Savitzky–Golayフィルタ (平滑化、またはderiv階微分)。位相は遅れない"""
+    values = np.asarray(values, dtype=np.float64)
+    kernel = savgol_coefficients(window, polyorder, deriv=deriv, delta=delta)
+    return _place(_correlate(values, kernel), window // 2, len(values), edge)
+
+
+def lowpass_kernel(fps: float, cutoff: float, taps: int = None) -> np.ndarray:
+    """窓関数法(ハミング窓)によるローパスFIRフィルタの係数。左右対称なので位相は遅れない (zero-phase)
+
+    tapsを省略した場合はカットオフ周波数の2周期分とする (奇数)。
+    """
+    if not 0 < cutoff < fps / 2:
+        raise ValueError("cutoff must be between 0 and the Nyquist frequency")
+    if taps is None:
+        taps = 2 * int(round(fps / cutoff)) + 1
+    if taps % 2 != 1:
+        raise ValueError("taps must be odd")
+    n = np.arange(taps) - taps // 2
+    kernel = 2 * cutoff / fps * np.sinc(2 * cutoff / fps * n) * np.hamming(taps)
+    return kernel / kernel.sum()
+
+
+def lowpass_filter(values: np.ndarray, fps: float, cutoff: float = 6.0, taps: int = None,
+                   edge: str = "nan") -> np.ndarray:
+    """ゼロ位相のローパスフィルタ"""
+    values = np.asarray(values, dtype=np.float64)
+    kernel = lowpass_kernel(fps, cutoff, taps)
+    return _place(_correlate(values, kernel), len(kernel) // 2, len(values), edge)
+
+
+def _moving_average_derivatives(values: np.ndarray, fps: float, window: int) -> Tuple[Tuple[np.ndarray, int], ...]:
+    """移動平均の後退差分 (従来のbody speedと同じ)。(窓が揃ったフレームの値, 先頭のフレーム) の組"""
+    means = _moving_average_valid(values, window)
+    velocity = np.diff(means, axis=0) * fps
+    acceleration = np.diff(velocity, axis=0) * fps
+    jerk = np.diff(acceleration, axis=0) * fps
+    offset = window // 2
+    return (velocity, offset + 1), (acceleration, offset + 2), (jerk, offset + 3)
+
+
+def _savgol_derivatives(values: np.ndarray, fps: float, window: int,
+                        polyorder: int) -> Tuple[Tuple[np.ndarray, int], ...]:
+    """Savitzky–Golayフィルタの1〜3階微分"""
+    return tuple((_correlate(values, savgol_coefficients(window, polyorder, deriv=deriv, delta=1 / fps)), window // 2)
+                 for deriv in (1, 2, 3))
+
+
+def _central_difference(values: np.ndarray, fps: float) -> np.ndarray:
+    return (values[2:] - values[:-2]) * (fps / 2)
+
+
+def _lowpass_derivatives(values: np.ndarray, fps: float, cutoff: float,
+                         taps: int = None) -> Tuple[Tuple[np.ndarray, int], ...]:
+    """ローパスフィルタをかけた位置の中心差分 (位相は遅れない)"""
+    kernel = lowpass_kernel(fps, cutoff, taps)
+    smoothed = _correlate(values, kernel)
+    velocity = _central_difference(smoothed, fps)
+    acceleration = _central_difference(velocity, fps)
+    jerk = _central_difference(acceleration, fps)
+    offset = len(kernel) // 2
+    return (velocity, offset + 1), (acceleration, offset + 2), (jerk, offset + 3)
+
+
+def calculate_kinematics(positions: np.ndarray, fps: float, method: str = "moving_average", window: int = None,
+                         polyorder: int = 3, cutoff: float = 6.0, edge: str = "bfill") -> Kinematics:
+    """全関節の速度・加速度・躍度をまとめて計算する
+
+    positions: shape (F, J, 3) (または (F, ..., 3)) の位置配列
+    method:
+        moving_average: 中心化した移動平均 (window, 既定10) の後退差分。従来のbody speedと同じ
+        savgol: Savitzky–Golayフィルタ (window, 既定11, polyorder) による微分
+        lowpass: ゼロ位相のローパスFIRフィルタ (cutoff [Hz]) をかけた位置の中心差分
+    edge: 窓が揃わない端のフレームの扱い (EDGES)
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    if method == "moving_average":
+        derivatives = _moving_average_derivatives(positions, fps, window or 10)
+    elif method == "savgol":
+        derivatives = _savgol_derivatives(positions, fps, window or 11, polyorder)
+    elif method == "lowpass":
+        derivatives = _lowpass_derivatives(positions, fps, cutoff, taps=window)
+    else:
+        raise ValueError(f"unknown method: {method}")
+    velocity, acceleration, jerk = [_place(valid, offset, len(positions), edge) for valid, offset in derivatives]
+    return Kinematics(velocity=velocity, acceleration=acceleration, jerk=jerk)
+
+
+def smoothed_velocity(positions: np.ndarray, fps: int, window: int = 10) -> np.ndarray:
+    """中心化した移動平均 (window) の差分から求めた速度
+
+    positions: shape (F, ...) の位置配列。返り値は同じshapeで、単位は位置の単位/s
+    pandasの rolling(window, center=True).mean() の差分に bfill() したものと同じく、
+    先頭の計算できないフレームは最初に計算できた値で埋め、末尾の計算できないフレームはnanとする。
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    velocity = np.diff(_moving_average_valid(positions, window), axis=0) * fps
+    return _place(velocity, window // 2 + 1, len(positions), "bfill")
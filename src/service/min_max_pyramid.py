@@ -0,0 +1,63 @@
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+
+class MinMaxPyramid:
+    """時系列データの多段の最小値・最大値 (グラフ表示の間引き用)
+
+    段kは2^kフレームごとの区間の最小値・最大値のフレーム位置を持つ。表示する範囲と点の数に応じて、
+    1区間がおおよそ1ピクセルになる段を選び、各区間の最小値と最大値の点だけを描画する。
+    間引いた点は元のデータの点そのものなので、どれだけ間引いてもピークの値と位置は変わらない。
+    nanは最小値・最大値の計算で無視する(区間内が全てnanの場合だけnanになる)。
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values: np.ndarray = np.asarray(values, dtype=np.float64)
+        # levels[k - 1]: 段kの区間ごとの (最小値のフレーム, 最大値のフレーム)
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = []
+        min_indices = max_indices = np.arange(len(self.values))
+        while len(min_indices) > 1:
+            min_indices = self._reduce(min_indices, np.less)
+            max_indices = self._reduce(max_indices, np.greater)
+            self.levels.append((min_indices, max_indices))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _reduce(self, indices: np.ndarray, is_better) -> np.ndarray:
+        """隣り合う2区間をまとめる。同じ値の場合は前の区間の点を選ぶ"""
+        if len(indices) % 2:
+            indices = np.append(indices, indices[-1])
+        left, right = indices[0::2], indices[1::2]
+        left_values, right_values = self.values[left], self.values[right]
+        take_right = is_better(right_values, left_values) | np.isnan(left_values)
+        return np.where(take_right, right, left)
+
+    def level_for(self, n_frames: int, max_points: int) -> int:
+        """n_framesフレームをmax_points点以下(区間ごとに2点)で表示できる最も細かい段"""
+        if n_frames <= max_points:
+            return 0
+        level = math.ceil(math.log2(2 * n_frames / max(max_points, 2)))
+        return min(level, len(self.levels))
+
+    def decimate(self, start: int, stop: int, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+        """[start, stop)のフレームをおおよそmax_points点に間引いた (フレーム, 値)
+
+        範囲の両端の区間は範囲外のフレームを含むことがあるので、点の数はmax_pointsを最大4点越える。
+        """
+        start, stop = max(int(start), 0), min(int(stop), len(self.values))
+        if stop <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        level = self.level_for(stop - start, max_points)
+        if level == 0:
+            frames = np.arange(start, stop)
+            return frames, self.values[start:stop]
+        min_indices, max_indices = self.levels[level - 1]
+        first, last = start >> level, (stop - 1) >> level
+        min_indices, max_indices = min_indices[first:last + 1], max_indices[first:last + 1]
+        # 区間内で先に現れる点から順に並べる
+        frames = np.stack([np.minimum(min_indices, max_indices), np.maximum(min_indices, max_indices)], axis=1)
+        frames = frames.ravel()
+        return frames, self.values[frames]
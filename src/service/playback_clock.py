@@ -0,0 +1,131 @@
+import collections
+import dataclasses
+import math
+from typing import Optional, Tuple
+
+MIN_SPEED = 0.25
+MAX_SPEED = 4.0
+
+
+@dataclasses.dataclass
+class PlaybackStatistics:
+    """再生の統計"""
+    target_fps: float = 0.0  # クリップのfps × 再生速度
+    achieved_fps: float = 0.0  # 直近に実際に描画できたフレームレート
+    dropped_frames: int = 0  # 描画が間に合わず飛ばしたフレーム数
+    held_frames: int = 0  # 描画が速く、次のフレームの時刻前に描画を求められて前のフレームを表示し続けた回数
+    render_time: float = 0.0  # 1フレームの描画時間の移動平均 [s]
+
+
+class PlaybackClock:
+    """経過時間(実時間)からクリップのfpsに従って表示するフレームを決める
+
+    再生開始時の時刻とフレームを基準に、経過時間 × fps × 再生速度 だけフレームを進める。
+    描画が間に合わない場合は途中のフレームを飛ばし(dropped_frames)、描画が速い場合は前のフレームを表示したまま
+    次のフレームの時刻まで待つ(held_frames)。同じフレームを描画し直しても画面は変わらないので、繰り返しは表示の保持として扱う。
+    描画には時間がかかるため、描画時間の移動平均だけ先の時刻のフレームを描画する。
+    ループ範囲 [start, stop) の終わりに達した場合は範囲の先頭に戻る。
+    """
+
+    RENDER_TIME_SMOOTHING = 0.2
+    FPS_WINDOW = 30  # achieved_fpsを計算するフレーム数
+
+    def __init__(self, fps: float, n_frames: int, speed: float = 1.0):
+        if fps <= 0:
+            raise ValueError(f"fps must be positive: {fps}")
+        self.fps: float = fps
+        self.n_frames: int = n_frames
+        self.speed: float = 1.0
+        self.loop_range: Tuple[int, int] = (0, n_frames)
+        self.statistics: PlaybackStatistics = PlaybackStatistics()
+        self.is_playing: bool = False
+        self._anchor_time: float = 0.0
+        self._anchor_position: float = 0.0  # ループ範囲の先頭からのフレーム数(ループしても戻さない)
+        self._last_step: Optional[int] = None
+        self._render_times = collections.deque(maxlen=self.FPS_WINDOW)
+        self.set_speed(speed)
+
+    @property
+    def loop_length(self) -> int:
+        start, stop = self.loop_range
+        return stop - start
+
+    def set_speed(self, speed: float, now: float = None):
+        """再生速度 (MIN_SPEED〜MAX_SPEED倍) を変更する。再生中の場合は現在のフレームから新しい速度で進める"""
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"speed must be between {MIN_SPEED} and {MAX_SPEED}: {speed}")
+        if self.is_playing and now is not None:
+            self._anchor_position = self._position(now)
+            self._anchor_time = now
+        self.speed = speed
+        self.statistics.target_fps = self.fps * speed
+
+    def set_loop_range(self, start: int = 0, stop: int = None, now: float = None):
+        """ループ範囲 [start, stop) を変更する。stopを省略した場合は最後のフレームまで"""
+        stop = self.n_frames if stop is None else stop
+        if not 0 <= start < stop <= self.n_frames:
+            raise ValueError(f"invalid loop range: [{start}, {stop}) for {self.n_frames} frames")
+        frame = self.frame_at(now) if self.is_playing and now is not None else None
+        self.loop_range = (start, stop)
+        if frame is not None:
+            self.seek(frame, now)
+
+    def start(self, frame: int, now: float):
+        """frameから再生を開始する"""
+        self.is_playing = True
+        self.statistics.dropped_frames = 0
+        self.statistics.held_frames = 0
+        self._render_times.clear()
+        self.seek(frame, now)
+
+    def stop(self):
+        self.is_playing = False
+
+    def seek(self, frame: int, now: float):
+        """frameを時刻nowのフレームとする。ループ範囲外のフレームの場合は範囲の先頭から再生する"""
+        start, stop = self.loop_range
+        if not start <= frame < stop:
+            frame = start
+        self._anchor_time = now
+        self._anchor_position = float(frame - start)
+        self._last_step = None
+
+    def _position(self, now: float) -> float:
+        return self._anchor_position + (now - self._anchor_time) * self.fps * self.speed
+
+    def _frame_of_step(self, step: int) -> int:
+        return self.loop_range[0] + step % self.loop_length
+
+    def frame_at(self, now: float) -> int:
+        """時刻nowに表示するフレーム"""
+        return self._frame_of_step(math.floor(self._position(now)))
+
+    def tick(self, now: float) -> Optional[int]:
+        """時刻nowに描画するフレームを返す。前回から表示するフレームが変わらない場合は前のフレームを保持してNone"""
+        step = math.floor(self._position(now + self.statistics.render_time))
+        if self._last_step is not None:
+            if step <= self._last_step:
+                self.statistics.held_frames += 1
+                return None
+            self.statistics.dropped_frames += step - self._last_step - 1
+        self._last_step = step
+        return self._frame_of_step(step)
+
+    def record_render(self, start: float, end: float):
+        """tickで返したフレームの描画にかかった時間 [start, end] を記録する"""
+        render_time = end - start
+        if self._render_times:
+            self.statistics.render_time += self.RENDER_TIME_SMOOTHING * (render_time - self.statistics.render_time)
+        else:
+            self.statistics.render_time = render_time
+        self._render_times.append(end)
+        if len(self._render_times) >= 2:
+            elapsed = self._render_times[-1] - self._render_times[0]
+            self.statistics.achieved_fps = (len(self._render_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def delay_until_next_frame(self, now: float) -> float:
+        """次のフレームを描画し始めるまでの待ち時間 [s]。描画が間に合っていない場合は0"""
+        if self._last_step is None:
+            return 0.0
+        next_time = self._anchor_time + (self._last_step + 1 - self._anchor_position) / (self.fps * self.speed)
+        return max(0.0, next_time - self.statistics.render_time - now)
@@ -0,0 +1,153 @@
+import dataclasses
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# 主成分分析で残す次元数
+DEFAULT_N_COMPONENTS = 16
+
+# 主成分分析に使うフレーム数の上限 (これを越える場合はランダムに選ぶ)
+PCA_SAMPLE_SIZE = 100000
+
+# 総当たりの検索で一度に距離を計算するフレーム数 (一時配列の大きさを抑える)
+SEARCH_BLOCK_SIZE = 65536
+
+
+def pose_features(positions: np.ndarray, root_index: int = 0, normalize_scale: bool = True) -> np.ndarray:
+    """フレームごとの姿勢の特徴ベクトル shape: (F, (J - 1) * 3) float32
+
+    positions: shape (F, J, 3) の位置配列
+    各関節のroot_indexの関節からの相対位置を並べたもの (root自身は常に0なので除く)。
+    normalize_scale=Trueの場合は、rootからの距離の二乗平均平方根で割り、体格の違いによらず比較できるようにする。
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    relative = positions - positions[:, root_index:root_index + 1]
+    relative = np.delete(relative, root_index, axis=1)
+    if normalize_scale:
+        scale = np.sqrt(np.einsum("fjk,fjk->f", relative, relative) / max(relative.shape[1], 1))
+        relative /= np.where(scale > 0, scale, 1.0)[:, None, None]
+    return relative.reshape(len(relative), -1).astype(np.float32)
+
+
+@dataclasses.dataclass
+class PoseMatch:
+    """検索結果の1フレーム"""
+    take: str
+    frame: int
+    distance: float  # 主成分空間でのユークリッド距離
+
+
+@dataclasses.dataclass
+class PosePca:
+    """特徴ベクトルの主成分分析の結果"""
+    mean: np.ndarray  # shape: (D,)
+    components: np.ndarray  # shape: (D, d) 主成分の軸
+
+    @classmethod
+    def fit(cls, features: np.ndarray, n_components: int = DEFAULT_N_COMPONENTS,
+            sample_size: int = PCA_SAMPLE_SIZE, seed: int = 0) -> "PosePca":
+        features = np.asarray(features)
+        if len(features) > sample_size:
+            features = features[np.sort(np.random.default_rng(seed).choice(len(features), sample_size,
+                                                                          replace=False))]
+        features = features.astype(np.float64)
+        mean = features.mean(axis=0)
+        _, _, vt = np.linalg.svd(features - mean, full_matrices=False)
+        n_components = min(n_components, vt.shape[0])
+        return cls(mean=mean.astype(np.float32), components=vt[:n_components].T.astype(np.float32))
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        return ((np.asarray(features, dtype=np.float32) - self.mean) @ self.components).astype(np.float32)
+
+
+class PoseIndex:
+    """複数のテイクの全フレームの姿勢を主成分空間に射影した検索用の索引
+
+    検索は主成分空間での総当たりで、SEARCH_BLOCK_SIZEフレームずつ距離を計算して上位の候補だけを残す。
+    低次元(16次元程度)では木構造の索引より総当たりの行列積の方が速く、距離は厳密に求まる。
+    embeddingsは読み取り専用のメモリマップでもよい。
+    """
+
+    def __init__(self, pca: PosePca, embeddings: np.ndarray, take_names: List[str], take_offsets: np.ndarray):
+        self.pca: PosePca = pca
+        self.embeddings: np.ndarray = embeddings
+        self.take_names: List[str] = list(take_names)
+        self.take_offsets: np.ndarray = np.asarray(take_offsets, dtype=np.int64)  # shape: (T + 1,)
+        self._take_ids = {name: i for i, name in enumerate(self.take_names)}
+        self._square_norms: np.ndarray = np.einsum("nd,nd->n", embeddings, embeddings)
+
+    @classmethod
+    def build(cls, features_list: Sequence[np.ndarray], take_names: Sequence[str],
+              n_components: int = DEFAULT_N_COMPONENTS, pca: PosePca = None) -> "PoseIndex":
+        """テイクごとの特徴ベクトル (pose_features) から作成する。pcaを省略した場合は全テイクのフレームから求める"""
+        if pca is None:
+            pca = PosePca.fit(np.concatenate(features_list), n_components=n_components)
+        embeddings = np.concatenate([pca.transform(features) for features in features_list]) if features_list \
+            else np.empty((0, pca.components.shape[1]), dtype=np.float32)
+        take_offsets = np.concatenate([[0], np.cumsum([len(features) for features in features_list])])
+        return cls(pca=pca, embeddings=embeddings, take_names=take_names, take_offsets=take_offsets)
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.embeddings)
+
+    def take_range(self, take: str) -> Tuple[int, int]:
+        """takeのフレームの索引内での範囲 [start, stop)"""
+        take_id = self._take_ids[take]
+        return int(self.take_offsets[take_id]), int(self.take_offsets[take_id + 1])
+
+    def search(self, query_features: np.ndarray, k: int = 10, take: str = None, exclude_take: str = None,
+               exclude_frame: int = None, exclude_radius: int = 0, min_separation: int = 0) -> List[PoseMatch]:
+        """特徴ベクトル (D,) に近いフレームを近い順にk個返す
+
+        take: 指定した場合はそのテイクの中だけを検索する
+        exclude_take, exclude_frame, exclude_radius: 指定したテイクのフレームの前後exclude_radiusフレームを除く
+            (検索元のフレーム自身とその前後が上位を占めないようにする)
+        min_separation: 同じテイクの結果同士をこのフレーム数より離す (同じ動作の連続したフレームをまとめる)
+        """
+        query = self.pca.transform(np.asarray(query_features).reshape(1, -1))[0]
+        start, stop = self.take_range(take) if take is not None else (0, self.n_frames)
+        excluded = None
+        if exclude_take is not None and exclude_frame is not None:
+            take_start, take_stop = self.take_range(exclude_take)
+            excluded = (max(take_start + exclude_frame - exclude_radius, take_start),
+                        min(take_start + exclude_frame + exclude_radius + 1, take_stop))
+        # 近いフレームを抑制しても k 個残るだけの候補を残す
+        n_candidates = k * (2 * min_separation + 1)
+
+        candidate_rows, candidate_distances = [], []
+        for block_start in range(start, stop, SEARCH_BLOCK_SIZE):
+            block_stop = min(block_start + SEARCH_BLOCK_SIZE, stop)
+            distances = self._square_norms[block_start:block_stop] \
+                - 2 * (self.embeddings[block_start:block_stop] @ query)
+            if excluded is not None and excluded[0] < block_stop and block_start < excluded[1]:
+                distances[max(excluded[0] - block_start, 0):excluded[1] - block_start] = np.inf
+            if len(distances) > n_candidates:
+                rows = np.argpartition(distances, n_candidates)[:n_candidates]
+            else:
+                rows = np.arange(len(distances))
+            candidate_rows.append(rows + block_start)
+            candidate_distances.append(distances[rows])
+        if not candidate_rows:
+            return []
+        rows = np.concatenate(candidate_rows)
+        rows = rows[np.isfinite(np.concatenate(candidate_distances))]
+        # |a|^2 - 2a・b の展開は距離0付近で桁落ちするので、残った候補だけ差から距離を計算し直す
+        differences = self.embeddings[rows] - query
+        distances = np.sqrt(np.einsum("nd,nd->n", differences, differences, dtype=np.float64))
+        order = np.lexsort((rows, distances))
+        return self._select(rows[order], distances[order], k, min_separation)
+
+    def _select(self, rows: np.ndarray, distances: np.ndarray, k: int, min_separation: int) -> List[PoseMatch]:
+        take_ids = np.searchsorted(self.take_offsets, rows, side="right") - 1
+        matches, selected = [], []
+        for row, distance, take_id in zip(rows.tolist(), distances.tolist(), take_ids.tolist()):
+            if len(matches) == k:
+                break
+            if any(take_id == other_take and abs(row - other_row) < min_separation
+                   for other_take, other_row in selected):
+                continue
+            selected.append((take_id, row))
+            matches.append(PoseMatch(take=self.take_names[take_id], frame=row - int(self.take_offsets[take_id]),
+                                     distance=distance))
+        return matches
@@ -0,0 +1,114 @@
+import dataclasses
+from typing import List, Optional
+
+import numpy as np
+
+from src.model.skeleton_data import GraphData, MultiPlotGraphData
+
+# 最小値・最大値のスパーステーブルを作るブロックの大きさ。範囲の両端のブロックに満たない部分は直接走査する
+BLOCK_SIZE = 16
+
+
+@dataclasses.dataclass
+class RangeStatistics:
+    """フレーム範囲 [start, stop) の統計量。nanのフレームは除く"""
+    start: int
+    stop: int
+    count: int  # nanでないフレーム数
+    mean: float
+    std: float  # 標準偏差 (母標準偏差, ddof=0)
+    min: float
+    max: float
+    argmin: Optional[int]  # 最小値のフレーム (同じ値が複数ある場合は最初のフレーム)。全てnanの場合はNone
+    argmax: Optional[int]
+
+
+class RangeQueryIndex:
+    """1本の時系列データの範囲の統計量を、範囲の長さによらない時間で求めるための索引
+
+    平均・標準偏差は値と値の2乗の累積和、最小値・最大値はBLOCK_SIZEごとのブロックのスパーステーブルから求める。
+    累積和の桁落ちを抑えるため、値は全体の平均からの差として累積する。
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        self.n_frames: int = len(values)
+        valid = ~np.isnan(values)
+        self._reference: float = float(values[valid].mean()) if valid.any() else 0.0
+        centered = np.where(valid, values - self._reference, 0.0)
+        self._count = np.concatenate([[0], np.cumsum(valid, dtype=np.int64)])
+        self._sum = np.concatenate([[0.0], np.cumsum(centered)])
+        self._square_sum = np.concatenate([[0.0], np.cumsum(centered * centered)])
+        # nanは最小値・最大値にならないよう、それぞれ+inf, -infとして扱う
+        self._min_values = np.where(valid, values, np.inf)
+        self._max_values = np.where(valid, values, -np.inf)
+        self._min_table = self._build_table(self._min_values, np.argmin, np.less)
+        self._max_table = self._build_table(self._max_values, np.argmax, np.greater)
+
+    @staticmethod
+    def _build_table(values: np.ndarray, arg_best, is_better) -> List[np.ndarray]:
+        """table[k][i]: ブロックi〜i+2^k-1の中で最も良い値のフレーム"""
+        n_blocks = len(values) // BLOCK_SIZE
+        if n_blocks == 0:
+            return []
+        blocks = values[:n_blocks * BLOCK_SIZE].reshape(n_blocks, BLOCK_SIZE)
+        indices = (arg_best(blocks, axis=1) + np.arange(n_blocks) * BLOCK_SIZE).astype(np.int32)
+        table = [indices]
+        half = 1
+        while 2 * half <= n_blocks:
+            previous = table[-1]
+            left, right = previous[:-half], previous[half:]
+            # 同じ値の場合は前のフレームを選ぶ
+            table.append(np.where(is_better(values[right], values[left]), right, left))
+            half *= 2
+        return table
+
+    def _best_frame(self, start: int, stop: int, values: np.ndarray, table: List[np.ndarray], arg_best,
+                    sign: float) -> int:
+        first_block = -(-start // BLOCK_SIZE)
+        last_block = stop // BLOCK_SIZE  # この手前のブロックまでが範囲に含まれる
+        if first_block >= last_block:
+            return start + int(arg_best(values[start:stop]))
+        candidates = []
+        if start < first_block * BLOCK_SIZE:
+            candidates.append(start + int(arg_best(values[start:first_block * BLOCK_SIZE])))
+        level = (last_block - first_block).bit_length() - 1
+        candidates.append(int(table[level][first_block]))
+        candidates.append(int(table[level][last_block - (1 << level)]))
+        if last_block * BLOCK_SIZE < stop:
+            candidates.append(last_block * BLOCK_SIZE + int(arg_best(values[last_block * BLOCK_SIZE:stop])))
+        return min(candidates, key=lambda frame: (sign * values[frame], frame))
+
+    def query(self, start: int, stop: int) -> RangeStatistics:
+        """[start, stop)の統計量。範囲はデータのフレーム数に収める"""
+        start, stop = max(int(start), 0), min(int(stop), self.n_frames)
+        stop = max(stop, start)
+        count = int(self._count[stop] - self._count[start])
+        if count == 0:
+            return RangeStatistics(start=start, stop=stop, count=0, mean=np.nan, std=np.nan, min=np.nan,
+                                   max=np.nan, argmin=None, argmax=None)
+        mean = (self._sum[stop] - self._sum[start]) / count
+        variance = (self._square_sum[stop] - self._square_sum[start]) / count - mean * mean
+        argmin = self._best_frame(start, stop, self._min_values, self._min_table, np.argmin, 1.0)
+        argmax = self._best_frame(start, stop, self._max_values, self._max_table, np.argmax, -1.0)
+        return RangeStatistics(start=start, stop=stop, count=count,
+                               mean=float(mean + self._reference), std=float(np.sqrt(max(variance, 0.0))),
+                               min=float(self._min_values[argmin]), max=float(self._max_values[argmax]),
+                               argmin=argmin, argmax=argmax)
+
+
+class GraphDataStatistics:
+    """グラフデータの線ごとのRangeQueryIndex。グラフデータごとに一度だけ作成する"""
+
+    def __init__(self, graph_data: GraphData):
+        self.graph_data: GraphData = graph_data
+        if isinstance(graph_data, MultiPlotGraphData):
+            self.legends: List[Optional[str]] = list(graph_data.legends)
+            self.indexes: List[RangeQueryIndex] = [RangeQueryIndex(line_data) for line_data in graph_data.data]
+        else:
+            self.legends = [None]
+            self.indexes = [RangeQueryIndex(graph_data.data)]
+
+    def query(self, start: int, stop: int) -> List[RangeStatistics]:
+        """線ごとの[start, stop)の統計量"""
+        return [index.query(start, stop) for index in self.indexes]
@@ -0,0 +1,97 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from src.model.skeleton_data import CoordinateData, GraphData, MultiPlotGraphData
+from src.service.calculate_graph_data import DEFAULT_GRAPH_KEYS, GRAPH_METRICS
+from src.service.graph_metrics import GraphMetric, MetricContext
+
+
+class StreamingGraphDataCalculator(ABC):
+    """チャンクごとに位置情報を受け取り、全フレームのグラフデータを計算する
+
+    update()に先頭から順に重なりのないチャンクを渡し、最後にfinish()で結果を受け取る。
+    結果はCalculateGraphDataで全フレームをまとめて計算した場合と同じになる。
+    """
+
+    @abstractmethod
+    def update(self, chunk: CoordinateData):
+        pass
+
+    @abstractmethod
+    def finish(self) -> GraphData:
+        pass
+
+
+class GraphMetricCalculator(StreamingGraphDataCalculator):
+    """GraphMetricの定義からチャンクごとにグラフデータを計算する
+
+    各フレームの値は前後metric.context_framesフレームの位置だけから決まるので、前後のフレームが揃ったフレームから値を確定させる。
+    そのため確定していないフレームと、その前のcontext_framesフレームの位置を次のチャンクまで持ち越す。
+    ファイルの末尾のフレームはfinish()で確定させるので、先頭・末尾の扱いも全フレームをまとめて計算した場合と同じになる。
+    """
+
+    def __init__(self, metric: GraphMetric):
+        self.metric: GraphMetric = metric
+        self._buffer: Optional[CoordinateData] = None  # 持ち越した位置情報
+        self._buffer_start: int = 0  # 持ち越した位置情報の先頭のフレーム番号
+        self._n_done: int = 0  # 値を確定させたフレーム数
+        self._line_lists: List[List[np.ndarray]] = [[] for _ in range(metric.n_lines)]
+
+    @property
+    def _buffer_stop(self) -> int:
+        return self._buffer_start + (self._buffer.n_frames if self._buffer is not None else 0)
+
+    def update(self, chunk: CoordinateData):
+        if self._buffer is None or self._buffer.n_frames == 0:
+            self._buffer = chunk
+        else:
+            self._buffer = CoordinateData(world_pos=np.concatenate([self._buffer.world_pos, chunk.world_pos]),
+                                          local_pos=np.concatenate([self._buffer.local_pos, chunk.local_pos]),
+                                          joints_hierarchy=chunk.joints_hierarchy, joint_names=chunk.joint_names,
+                                          fps=chunk.fps)
+        self._calculate(self._buffer_stop - self.metric.context_frames)
+
+    def _calculate(self, stop: int):
+        """[確定済みのフレーム数, stop) のフレームの値を確定させ、以降の計算に必要な位置情報だけを残す"""
+        if stop <= self._n_done:
+            return
+        context = MetricContext(self._buffer, joint_names=self.metric.joints, angles=self.metric.angles)
+        data = self.metric.calculate(context)
+        lines = [data] if self.metric.legends is None else data
+        for line_list, line in zip(self._line_lists, lines):
+            # チャンク全体を保持しないようにコピーする
+            line_list.append(np.array(line[self._n_done - self._buffer_start:stop - self._buffer_start]))
+        self._n_done = stop
+        keep_start = max(stop - self.metric.context_frames, self._buffer_start)
+        self._buffer = CoordinateData(world_pos=self._buffer.world_pos[keep_start - self._buffer_start:],
+                                      local_pos=self._buffer.local_pos[keep_start - self._buffer_start:],
+                                      joints_hierarchy=self._buffer.joints_hierarchy,
+                                      joint_names=self._buffer.joint_names, fps=self._buffer.fps)
+        self._buffer_start = keep_start
+
+    def finish(self) -> GraphData:
+        if self._buffer is not None:
+            self._calculate(self._buffer_stop)
+        lines = [np.concatenate(line_list) if line_list else np.empty(0) for line_list in self._line_lists]
+        if self.metric.legends is not None:
+            return MultiPlotGraphData(data=lines, display_name=self.metric.display_name,
+                                      graph_key=self.metric.graph_key, legends=list(self.metric.legends))
+        return GraphData(data=lines[0], display_name=self.metric.display_name, graph_key=self.metric.graph_key)
+
+
+def default_calculators(graph_keys: List[str] = None) -> List[StreamingGraphDataCalculator]:
+    """CalculateGraphData.calculate_default_graph_dataと同じグラフデータ (GRAPH_METRICSの定義) を計算する"""
+    return [GraphMetricCalculator(GRAPH_METRICS.get(key))
+            for key in (DEFAULT_GRAPH_KEYS if graph_keys is None else graph_keys)]
+
+
+def calculate_graph_data_by_chunks(chunks: Iterable[CoordinateData],
+                                   calculators: List[StreamingGraphDataCalculator] = None) -> List[GraphData]:
+    """チャンクごとの位置情報からグラフデータを計算する。メモリ使用量はチャンクの大きさに比例する"""
+    calculators = default_calculators() if calculators is None else calculators
+    for chunk in chunks:
+        for calculator in calculators:
+            calculator.update(chunk)
+    return [calculator.finish() for calculator in calculators]
@@ -0,0 +1,90 @@
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from src.interface.lazy_bvh_reader import LazyBvhReader
+from src.model.skeleton_data import CoordinateData
+from src.service.coordinate_data_converter import CoordinateDataConverter
+
+
+class WindowedPositions:
+    """WindowedCoordinateDataの位置情報を local_pos[frame] の形で参照するためのビュー"""
+    __slots__ = ("_owner", "_attr")
+
+    def __init__(self, owner: "WindowedCoordinateData", attr: str):
+        self._owner = owner
+        self._attr = attr
+
+    def __getitem__(self, frame: int) -> np.ndarray:
+        start, coordinate_data = self._owner.window(frame)
+        return getattr(coordinate_data, self._attr)[frame - start]
+
+    def __len__(self) -> int:
+        return self._owner.n_frames
+
+
+class WindowedCoordinateData:
+    """巨大なbvhファイル用のCoordinateData
+
+    表示中のフレームを含むwindow_sizeフレームだけをLazyBvhReaderから読み込んで位置情報に変換し、保持する。
+    CoordinateDataと同じく local_pos[frame], world_pos[frame] でフレームの位置情報を参照できる。
+    """
+
+    def __init__(self, reader: LazyBvhReader, window_size: int = 1000,
+                 converter: CoordinateDataConverter = None):
+        self.reader: LazyBvhReader = reader
+        self.window_size: int = window_size
+        self.converter: CoordinateDataConverter = converter or CoordinateDataConverter()
+        self._window_start: int = 0
+        self._window: CoordinateData = self._convert(0, window_size)
+        self._local_pos_lim: Tuple[np.ndarray, np.ndarray] = None
+
+        self.joint_names: List[str] = self._window.joint_names
+        self.joints_hierarchy: Dict[str, List[str]] = self._window.joints_hierarchy
+        self.joint_index: Dict[str, int] = self._window.joint_index
+        self.parent_indices: np.ndarray = self._window.parent_indices
+        self.fps: int = self._window.fps
+        self.local_pos: WindowedPositions = WindowedPositions(self, "local_pos")
+        self.world_pos: WindowedPositions = WindowedPositions(self, "world_pos")
+
+    @property
+    def n_frames(self) -> int:
+        return self.reader.n_frames
+
+    def _convert(self, start: int, stop: int) -> CoordinateData:
+        skeleton_data = self.reader.create_skeleton_data(start, stop)
+        return self.converter.convert_to_coordinate_data(skeleton_data=skeleton_data)
+
+    def window(self, frame: int) -> Tuple[int, CoordinateData]:
+        """frameを含むウィンドウ (先頭のフレーム番号, 位置情報)。範囲外であれば読み込み直す"""
+        if not 0 <= frame < self.n_frames:
+            raise IndexError(f"frame {frame} is out of range")
+        if not self._window_start <= frame < self._window_start + self._window.n_frames:
+            # 前後どちらにスクラブしても読み込み直しが少なくなるように、frameがウィンドウの1/4の位置に来るようにする
+            start = min(max(0, frame - self.window_size // 4), max(0, self.n_frames - self.window_size))
+            self._window = self._convert(start, start + self.window_size)
+            self._window_start = start
+        return self._window_start, self._window
+
+    def iter_chunks(self, chunk_size: int = None) -> Iterator[Tuple[int, CoordinateData]]:
+        """先頭から順にchunk_sizeフレームずつ変換した (先頭のフレーム番号, 位置情報) を返す
+
+        表示用のウィンドウは変更しない。全フレームを走査した場合はローカル座標の表示域も求める。
+        """
+        chunk_size = chunk_size or self.window_size
+        pos_min, pos_max = None, None
+        for start in range(0, self.n_frames, chunk_size):
+            chunk = self._convert(start, start + chunk_size)
+            chunk_min, chunk_max = chunk.local_pos_lim()
+            pos_min = chunk_min if pos_min is None else np.minimum(pos_min, chunk_min)
+            pos_max = chunk_max if pos_max is None else np.maximum(pos_max, chunk_max)
+            yield start, chunk
+        # フレームがない場合はCoordinateDataと同じ表示域にする
+        self._local_pos_lim = (pos_min, pos_max) if pos_min is not None else self._window.local_pos_lim()
+
+    def local_pos_lim(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ローカル座標系での位置の最小値・最大値。全フレームを走査していない場合は走査する"""
+        if self._local_pos_lim is None:
+            for _ in self.iter_chunks():
+                pass
+        return self._local_pos_lim
@@ -0,0 +1,127 @@
+"""ディレクトリ内のbvhファイルをまとめて変換するコマンド
+
+python -m src.usecase.batch_convert_usecase <入力ディレクトリ> <出力ディレクトリ> [--workers N]
+
+各ファイルのスケルトンデータ・位置情報・グラフデータを列指向のバイナリ形式で
+<出力ディレクトリ>/<入力ディレクトリからの相対パス (拡張子を含む)>/ に保存し、ファイルごとの結果を summary.json に出力する。
+"""
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.interface.bvh_reader import BvhReader
+from src.model.skeleton_data import SkeletonData, CoordinateData, GraphData
+from src.repository.coordinate_data_repository import CoordinateDataRepository
+from src.repository.graph_data_repository import GraphDataRepository
+from src.repository.skeleton_data_repository import SkeletonDataRepository
+from src.service.calculate_graph_data import CalculateGraphData
+from src.service.coordinate_data_converter import CoordinateDataConverter
+
+BVH_EXTENSION = ".bvh"
+SUMMARY_FILE_NAME = "summary.json"
+
+
+def is_bvh_file(file_name: str) -> bool:
+    """拡張子が.bvhのファイルか (大文字・小文字を区別しない)"""
+    return file_name.lower().endswith(BVH_EXTENSION)
+
+
+@dataclasses.dataclass
+class BatchConvertResult:
+    """1ファイルの変換結果"""
+    file_name: str
+    output_dir: str
+    frames: int = 0
+    fps: int = 0
+    duration: float = 0.0  # [s]
+    timings: Dict[str, float] = dataclasses.field(default_factory=dict)  # 処理ごとの時間 [s]
+    error: Optional[str] = None
+
+
+class BatchConvertUsecase:
+    """ディレクトリ内のbvhファイルをプロセスプールで並列に読み込み・変換し、バイナリ形式で保存する"""
+
+    def __init__(self, workers: int = None):
+        self.workers: int = workers or os.cpu_count() or 1
+
+    @staticmethod
+    def find_bvh_files(input_dir: str) -> List[str]:
+        file_names = []
+        for dir_path, _, names in os.walk(input_dir):
+            file_names.extend(os.path.join(dir_path, name) for name in names if is_bvh_file(name))
+        return sorted(file_names)
+
+    @staticmethod
+    def convert_file(file_name: str, output_dir: str) -> BatchConvertResult:
+        """1ファイルを変換して保存する。失敗した場合は例外を送出せず、エラー内容を結果に記録する"""
+        result = BatchConvertResult(file_name=file_name, output_dir=output_dir)
+        try:
+            start = time.perf_counter()
+            bvh_reader: BvhReader = BvhReader(file_name)
+            result.timings["parse"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            skeleton_data: SkeletonData = bvh_reader.create_skeleton_data()
+            result.timings["skeleton"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            coordinate_data: CoordinateData \
+                = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+            result.timings["convert"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            graph_data_list: List[GraphData] = CalculateGraphData.calculate_default_graph_data(coordinate_data)
+            result.timings["graph"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            SkeletonDataRepository.save(skeleton_data, os.path.join(output_dir, "skeleton"))
+            CoordinateDataRepository.save(coordinate_data, os.path.join(output_dir, "coordinate"))
+            GraphDataRepository.save(graph_data_list, os.path.join(output_dir, "graph"))
+            result.timings["write"] = time.perf_counter() - start
+
+            result.frames = coordinate_data.n_frames
+            result.fps = coordinate_data.fps
+            result.duration = result.frames * bvh_reader.bvh_data.frame_time
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    def run(self, input_dir: str, output_dir: str) -> List[BatchConvertResult]:
+        file_names = self.find_bvh_files(input_dir)
+        # 拡張子だけが異なるファイル (take.bvh と take.BVH) が同じディレクトリに保存されないよう、拡張子も含める
+        output_dirs = [os.path.join(output_dir, os.path.relpath(file_name, input_dir)) for file_name in file_names]
+
+        start = time.perf_counter()
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for result in executor.map(self.convert_file, file_names, output_dirs):
+                status = f"error: {result.error}" if result.error else f"{result.frames} frames"
+                print(f"{result.file_name}: {status}")
+                results.append(result)
+        elapsed = time.perf_counter() - start
+
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, SUMMARY_FILE_NAME), mode="wt", encoding="utf-8") as f:
+            json.dump([dataclasses.asdict(result) for result in results], f, ensure_ascii=False, indent=4)
+
+        n_frames = sum(result.frames for result in results)
+        n_errors = sum(result.error is not None for result in results)
+        print(f"converted {len(results) - n_errors}/{len(results)} files, {n_frames} frames in {elapsed:.2f} s "
+              f"({len(results) / elapsed if elapsed else 0:.2f} files/s, "
+              f"{n_frames / elapsed if elapsed else 0:.1f} frames/s)")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ディレクトリ内のbvhファイルをまとめて変換する")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--workers", type=int, default=None, help="プロセス数 (既定: CPU数)")
+    args = parser.parse_args()
+    BatchConvertUsecase(workers=args.workers).run(input_dir=args.input_dir, output_dir=args.output_dir)
@@ -3,13 +3,16 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(os.getcwd())
 from src.interface.bvh_reader import BvhReader
-from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.presenter.coordinate_data_drawer_wuthout_tkinter import CoordinateDataDrawer
 from src.service.coordinate_data_converter import CoordinateDataConverter
 from src.model.skeleton_data import SkeletonData, CoordinateData
 
 
 class BvhViewerUsecase:
-    """bvh形式のデータファイルを読み込み、位置情報に変換した上で時系列で描画する"""
+    """bvh形式のデータファイルを読み込み、位置情報に変換した上で時系列で描画する
+
+    画面のない環境で動画として確認する場合はsrc.usecase.export_motion_usecaseで画像に書き出す。
+    """
 
     def __init__(self):
         pass
@@ -32,7 +35,7 @@ class BvhViewerUsecase:
         coordinate_data: CoordinateData = coordinate_data_converter.convert_to_coordinate_data(skeleton_data=skeleton_data)
 
         # コーディネートデータを時系列で描画
-        CoordinateDataDrawer.draw_local_pos(coordinate_data=coordinate_data)
+        CoordinateDataDrawer().draw_local_pos(coordinate_data=coordinate_data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+"""bvhファイルの再生を画面を使わずに連番のPNG画像とアニメーションGIFに書き出すコマンド
+
+python -m src.usecase.export_motion_usecase <bvhファイル> <出力ディレクトリ> [--range START:STOP[:STEP] ...]
+    [--gif NAME] [--no-png] [--no-graphs] [--workers N]
+
+スティックピクチャと(--no-graphsを指定しない場合は)3つのグラフを、ビューアと同じレイアウトでAggバックエンドで描画する。
+フレームはプロセスプールで分担して描画し、各プロセスは図を一度だけ作成して使い回す。
+"""
+import argparse
+import dataclasses
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+from PIL import GifImagePlugin, Image, ImageChops
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.model.skeleton_data import MotionData
+from src.presenter.headless_motion_renderer import HeadlessMotionRenderer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+PNG_FILE_NAME_FORMAT = "frame_{:06d}.png"
+
+# 1プロセスあたりのチャンク数。フレームごとの描画時間のばらつきをならすため、プロセス数より多く分割する
+CHUNKS_PER_WORKER = 4
+
+
+@dataclasses.dataclass
+class ExportOptions:
+    """書き出す図の設定"""
+    figsize: tuple = (10, 5)
+    dpi: float = 80
+    draw_graphs: bool = True
+
+
+@dataclasses.dataclass
+class ExportResult:
+    """書き出しの結果"""
+    frames: List[int]  # 書き出したフレーム (重複は除く)
+    png_files: List[str] = dataclasses.field(default_factory=list)
+    gif_file: Optional[str] = None
+    render_time: float = 0.0  # PNGの描画と書き出しの時間 [s]
+    gif_time: float = 0.0  # GIFの作成の時間 [s]
+
+    @property
+    def render_fps(self) -> float:
+        """1秒あたりに描画したフレーム数"""
+        return len(self.frames) / self.render_time if self.render_time else 0.0
+
+
+def parse_frame_range(text: str, n_frames: int) -> range:
+    """"START:STOP[:STEP]" 形式のフレーム範囲。STARTとSTOPは省略でき、負の値は末尾からのフレーム数"""
+    values = text.split(":")
+    if not 1 <= len(values) <= 3:
+        raise ValueError(f"invalid frame range: {text}")
+    if len(values) == 1:
+        values.append(str(int(values[0]) + 1) if values[0] not in ("", "-1") else "")
+    return range(n_frames)[slice(*[int(value) if value else None for value in values])]
+
+
+def frame_durations(frame_ranges: Sequence[range], fps: float) -> List[float]:
+    """frame_rangesのフレームを順に並べたときの、GIFのフレームごとの表示時間 [s] (範囲のSTEPフレーム分の時間)"""
+    return [abs(frame_range.step) / fps for frame_range in frame_ranges for _ in frame_range]
+
+
+def _durations_to_next_frame(frames: Sequence[int], fps: float) -> List[float]:
+    """次のフレームまでの時間 [s]。次のフレームが前に戻る場合と最後のフレームは、直前のフレームと同じ時間にする"""
+    durations = []
+    for frame, next_frame in zip(frames, list(frames[1:]) + [None]):
+        if next_frame is not None and next_frame > frame:
+            durations.append((next_frame - frame) / fps)
+        else:
+            durations.append(durations[-1] if durations else 1 / fps)
+    return durations
+
+
+# ワーカープロセスごとの描画用クラス。プロセスの初期化時に一度だけ作成する
+_worker_renderer: Optional[HeadlessMotionRenderer] = None
+
+
+def _init_worker(motion_data: MotionData, options: ExportOptions):
+    global _worker_renderer
+    _worker_renderer = HeadlessMotionRenderer(motion_data, figsize=options.figsize, dpi=options.dpi,
+                                              draw_graphs=options.draw_graphs)
+
+
+def _render_chunk(frames: Sequence[int], output_dir: str) -> List[str]:
+    png_files = []
+    for frame in frames:
+        png_file = os.path.join(output_dir, PNG_FILE_NAME_FORMAT.format(frame))
+        _worker_renderer.save_png(frame, png_file)
+        png_files.append(png_file)
+    return png_files
+
+
+class ExportMotionUsecase:
+    """位置情報とグラフデータを、フレームを分担したプロセスプールで画像に書き出す"""
+
+    def __init__(self, workers: int = None, options: ExportOptions = None):
+        self.workers: int = workers or os.cpu_count() or 1
+        self.options: ExportOptions = options or ExportOptions()
+
+    def render_png(self, motion_data: MotionData, frames: Sequence[int], output_dir: str) -> List[str]:
+        """framesを連番のPNG画像として書き出し、フレーム順のファイル名を返す"""
+        os.makedirs(output_dir, exist_ok=True)
+        n_chunks = min(len(frames), self.workers * CHUNKS_PER_WORKER)
+        chunks = [list(chunk) for chunk in np.array_split(np.asarray(frames, dtype=np.int64), n_chunks)] \
+            if n_chunks else []
+        if self.workers == 1:
+            # 1プロセスの場合は位置情報を受け渡さずにこのプロセスで描画する
+            _init_worker(motion_data, self.options)
+            return [png_file for chunk in chunks for png_file in _render_chunk(chunk, output_dir)]
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(motion_data, self.options)) as executor:
+            results = executor.map(_render_chunk, chunks, [output_dir] * len(chunks))
+            return [png_file for png_files in results for png_file in png_files]
+
+    @staticmethod
+    def write_gif(png_files: Sequence[str], gif_file: str, durations: Sequence[float]):
+        """PNG画像をつなげてループするアニメーションGIFを作成する。durations: フレームごとの表示時間 [s]
+
+        PNG画像は1枚ずつ読み込んでGIFに書き足すので、フレーム数によらず画像1〜2枚分のメモリしか使わない。
+        2枚目以降は前のフレームから変化した範囲だけを書き込む。
+        """
+        palette_image, previous = None, None
+        with open(gif_file, mode="wb") as f:
+            for png_file, duration in zip(png_files, durations):
+                with Image.open(png_file) as png:
+                    image = png.convert("RGB")
+                if palette_image is None:
+                    # 全フレームで最初のフレームのパレットを使い、フレームごとの色のちらつきを防ぐ
+                    palette_image = image.quantize(colors=256)
+                    header, _ = GifImagePlugin.getheader(palette_image.copy(), info={"loop": 0})
+                    f.write(b"".join(header))
+                frame = image.quantize(palette=palette_image, dither=Image.Dither.NONE)
+                bbox = (0, 0) + frame.size if previous is None \
+                    else ImageChops.difference(frame.convert("L"), previous.convert("L")).getbbox() or (0, 0, 1, 1)
+                f.write(b"".join(GifImagePlugin.getdata(frame.crop(bbox), offset=bbox[:2],
+                                                        duration=max(round(duration * 1000), 10))))
+                previous = frame
+            f.write(b";")  # GIFの終端
+
+    def export(self, motion_data: MotionData, frames: Sequence[int], output_dir: str, gif_name: str = None,
+               write_png: bool = True, durations: Sequence[float] = None) -> ExportResult:
+        """framesをoutput_dirに連番のPNG画像として書き出す。gif_nameを指定した場合はアニメーションGIFも作成する
+
+        重複したフレームは最初の1つだけを書き出す。
+        durations: GIFのフレームごとの表示時間 [s]。省略した場合は次のフレームまでの時間
+        write_png=Falseの場合はPNG画像を一時ディレクトリに書き出し、GIFの作成後に削除する。
+        """
+        if durations is None:
+            durations = _durations_to_next_frame(frames, motion_data.coordinate_data.fps)
+        # 最初に現れたフレームの表示時間を使う
+        frame_to_duration = {}
+        for frame, duration in zip(frames, durations):
+            frame_to_duration.setdefault(frame, duration)
+        frames = list(frame_to_duration)
+        result = ExportResult(frames=frames)
+        os.makedirs(output_dir, exist_ok=True)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            start = time.perf_counter()
+            png_files = self.render_png(motion_data, frames, output_dir if write_png else temp_dir)
+            result.render_time = time.perf_counter() - start
+            if write_png:
+                result.png_files = png_files
+
+            if gif_name is not None and png_files:
+                start = time.perf_counter()
+                result.gif_file = os.path.join(output_dir, gif_name)
+                self.write_gif(png_files, result.gif_file, durations=list(frame_to_duration.values()))
+                result.gif_time = time.perf_counter() - start
+        return result
+
+    def run(self, file_name: str, output_dir: str, frame_ranges: Sequence[str] = (":",), gif_name: str = None,
+            write_png: bool = True) -> ExportResult:
+        motion_data: MotionData = LoadBvhUsecase().load(file_name)
+        n_frames = motion_data.coordinate_data.n_frames
+        ranges = [parse_frame_range(text, n_frames) for text in frame_ranges]
+        frames = [frame for frame_range in ranges for frame in frame_range]
+        result = self.export(motion_data, frames, output_dir, gif_name=gif_name, write_png=write_png,
+                             durations=frame_durations(ranges, motion_data.coordinate_data.fps))
+        print(f"rendered {len(result.frames)} frames in {result.render_time:.2f} s "
+              f"({result.render_fps:.1f} frames/s, {self.workers} workers)")
+        if result.gif_file is not None:
+            print(f"wrote {result.gif_file} in {result.gif_time:.2f} s")
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bvhファイルの再生を連番のPNG画像とアニメーションGIFに書き出す")
+    parser.add_argument("file_name")
+    parser.add_argument("output_dir")
+    parser.add_argument("--range", dest="frame_ranges", action="append", default=None,
+                        help="書き出すフレームの範囲 START:STOP[:STEP] (複数指定可, 既定: 全フレーム)")
+    parser.add_argument("--gif", dest="gif_name", default=None, help="作成するアニメーションGIFのファイル名")
+    parser.add_argument("--no-png", dest="write_png", action="store_false", help="PNG画像を残さない")
+    parser.add_argument("--no-graphs", dest="draw_graphs", action="store_false", help="スティックピクチャだけを描画する")
+    parser.add_argument("--dpi", type=float, default=80)
+    parser.add_argument("--workers", type=int, default=None, help="プロセス数 (既定: CPU数)")
+    args = parser.parse_args()
+    ExportMotionUsecase(workers=args.workers, options=ExportOptions(dpi=args.dpi, draw_graphs=args.draw_graphs)) \
+        .run(file_name=args.file_name, output_dir=args.output_dir, frame_ranges=args.frame_ranges or [":"],
+             gif_name=args.gif_name, write_png=args.write_png)
@@ -0,0 +1,196 @@
+import dataclasses
+import threading
+from typing import Callable, Optional, List
+
+import numpy as np
+
+from src.interface.bvh_reader import BvhReader
+from src.interface.lazy_bvh_reader import LazyBvhReader
+from src.model.skeleton_data import SkeletonData, CoordinateData, MotionData, GraphData
+from src.repository.conversion_cache import ConversionCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from src.repository.memory_cache import MotionDataMemoryCache
+from src.service.calculate_graph_data import CalculateGraphData
+from src.service.coordinate_data_converter import CoordinateDataConverter
+from src.service.streaming_graph_data import calculate_graph_data_by_chunks
+from src.service.windowed_coordinate_data import WindowedCoordinateData
+
+# 読み込みの段階と、全体の処理時間に占めるおおよその割合
+LOADING_STAGES = {"cache": 0.02, "parse": 0.3, "skeleton": 0.03, "positions": 0.55, "graph": 0.05, "save": 0.05}
+
+# 進捗を報告しながら位置情報を変換する場合の1回あたりのフレーム数
+PROGRESS_CHUNK_SIZE = 2000
+
+
+class LoadingCancelled(Exception):
+    """読み込みが中止された"""
+
+
+@dataclasses.dataclass
+class LoadingProgress:
+    """読み込みの進捗"""
+    stage: str  # LOADING_STAGESのいずれか
+    fraction: float  # 段階内の進捗 (0〜1)
+    preview: Optional[CoordinateData] = None  # 位置情報の変換中に、変換済みの先頭のフレームだけを含む位置情報
+
+    @property
+    def overall(self) -> float:
+        """読み込み全体の進捗 (0〜1)"""
+        done = 0.0
+        for stage, weight in LOADING_STAGES.items():
+            if stage == self.stage:
+                return done + weight * self.fraction
+            done += weight
+        return done
+
+
+ProgressListener = Callable[[LoadingProgress], None]
+
+
+def _report(on_progress: Optional[ProgressListener], cancel_event: Optional[threading.Event],
+            stage: str, fraction: float, preview: CoordinateData = None):
+    """進捗を通知する。中止が要求されていればLoadingCancelledを送出する"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadingCancelled(stage)
+    if on_progress is not None:
+        on_progress(LoadingProgress(stage=stage, fraction=fraction, preview=preview))
+
+
+class LoadBvhUsecase:
+    """bvh形式のデータファイルを読み込み、位置情報とグラフデータに変換する
+
+    cacheを指定した場合は変換結果をキャッシュし、同じ内容のファイルは読み込みと変換を省略する。
+    memory_cacheを指定した場合は読み込んだ結果をプロセス内にも保持し、同じファイルはキャッシュからの読み込みも省略する。
+    キャッシュはどちらも複数のスレッドから使えるので、読み込み用のスレッドと先読み用のスレッドから並行して呼び出せる。
+    """
+
+    def __init__(self, cache: Optional[ConversionCache] = None, memory_cache: Optional[MotionDataMemoryCache] = None):
+        self.cache: Optional[ConversionCache] = cache
+        self.memory_cache: Optional[MotionDataMemoryCache] = memory_cache
+
+    @staticmethod
+    def cache_version() -> str:
+        """変換処理のバージョン。変換結果が変わる場合はキャッシュを無効にする"""
+        return f"converter={CoordinateDataConverter.VERSION};graph={CalculateGraphData.VERSION}"
+
+    @classmethod
+    def with_cache(cls, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                   memory_max_bytes: int = None) -> "LoadBvhUsecase":
+        """memory_max_bytesを指定した場合はプロセス内のキャッシュも使う"""
+        memory_cache = None if memory_max_bytes is None else MotionDataMemoryCache(max_bytes=memory_max_bytes)
+        return cls(cache=ConversionCache(version=cls.cache_version(), cache_dir=cache_dir, max_bytes=max_bytes),
+                   memory_cache=memory_cache)
+
+    def load(self, file_name: str, on_progress: ProgressListener = None,
+             cancel_event: threading.Event = None) -> MotionData:
+        """on_progressを指定した場合は段階ごとの進捗を通知する。
+
+        位置情報はPROGRESS_CHUNK_SIZEフレームずつ変換し、最初のチャンクの変換後に先頭のフレームの位置情報をpreviewとして通知する。
+        cancel_eventがセットされた場合は次の進捗の通知時にLoadingCancelledを送出する。
+        """
+        _report(on_progress, cancel_event, "cache", 0.0)
+        if self.memory_cache is not None:
+            motion_data = self.memory_cache.get(file_name)
+            if motion_data is not None:
+                return motion_data
+        if self.cache is not None:
+            motion_data = self.cache.load(file_name)
+            if motion_data is not None:
+                if self.memory_cache is not None:
+                    self.memory_cache.put(file_name, motion_data)
+                return motion_data
+
+        # bvh形式のデータを読み込み、スケルトンデータに変換する
+        _report(on_progress, cancel_event, "parse", 0.0)
+        bvh_reader: BvhReader = BvhReader(file_name)
+        _report(on_progress, cancel_event, "skeleton", 0.0)
+        skeleton_data: SkeletonData = bvh_reader.create_skeleton_data()
+
+        # スケルトンデータをコーディネートデータ（位置情報）に変換する
+        _report(on_progress, cancel_event, "positions", 0.0)
+        if on_progress is None and cancel_event is None:
+            coordinate_data: CoordinateData \
+                = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+        else:
+            coordinate_data: CoordinateData = self._convert_by_chunks(bvh_reader, skeleton_data,
+                                                                      on_progress, cancel_event)
+
+        # グラフデータの計算
+        _report(on_progress, cancel_event, "graph", 0.0)
+        motion_data = MotionData(skeleton_data=skeleton_data,
+                                 coordinate_data=coordinate_data,
+                                 graph_data_list=CalculateGraphData.calculate_default_graph_data(coordinate_data))
+
+        if self.memory_cache is not None:
+            self.memory_cache.put(file_name, motion_data)
+        if self.cache is not None:
+            _report(on_progress, cancel_event, "save", 0.0)
+            self.cache.save(file_name, motion_data)
+        return motion_data
+
+    @staticmethod
+    def _convert_by_chunks(bvh_reader: BvhReader, skeleton_data: SkeletonData,
+                           on_progress: Optional[ProgressListener],
+                           cancel_event: Optional[threading.Event]) -> CoordinateData:
+        """PROGRESS_CHUNK_SIZEフレームずつ位置情報に変換し、チャンクごとに進捗を通知する"""
+        n_frames = bvh_reader.n_frames
+        n_joints = len(skeleton_data.joints_names)
+        local_pos = np.empty((n_frames, n_joints, 3), dtype=np.float32)
+        world_pos = np.empty((n_frames, n_joints, 3), dtype=np.float32)
+        converter = CoordinateDataConverter()
+        start = 0
+        for chunk in converter.iter_convert(bvh_reader.iter_skeleton_data(PROGRESS_CHUNK_SIZE)):
+            stop = start + chunk.n_frames
+            local_pos[start:stop] = chunk.local_pos
+            world_pos[start:stop] = chunk.world_pos
+            _report(on_progress, cancel_event, "positions", stop / n_frames, preview=chunk if start == 0 else None)
+            start = stop
+        return CoordinateData(world_pos=world_pos,
+                              local_pos=local_pos,
+                              joint_names=skeleton_data.joints_names,
+                              joints_hierarchy=skeleton_data.joints_hierarchy,
+                              fps=skeleton_data.fps)
+
+    @staticmethod
+    def load_lazy(file_name: str, window_size: int = 1000, on_progress: ProgressListener = None,
+                  cancel_event: threading.Event = None, persist_index: bool = True) -> MotionData:
+        """巨大なファイル用。HIERARCHYとフレーム位置のインデックスだけを読み込み、位置情報は必要な範囲だけ変換する
+
+        グラフデータは全フレームをwindow_sizeフレームずつ変換しながら計算するので、位置情報のメモリ使用量はwindow_sizeに比例する。
+        on_progress, cancel_eventはloadと同じ。グラフデータの計算はチャンクごとに進捗を通知する。
+        persist_index=Trueの場合は、次に開くときのためにフレーム位置のインデックスをファイルの隣に保存する。
+        """
+        _report(on_progress, cancel_event, "parse", 0.0)
+        reader: LazyBvhReader = LazyBvhReader(file_name, persist_index=persist_index)
+        try:
+            coordinate_data: WindowedCoordinateData = WindowedCoordinateData(reader=reader, window_size=window_size)
+            n_frames = coordinate_data.n_frames
+
+            def iter_chunks():
+                for start, chunk in coordinate_data.iter_chunks():
+                    yield chunk
+                    _report(on_progress, cancel_event, "graph", (start + chunk.n_frames) / n_frames)
+
+            # フレームがない場合はチャンクがないので、進捗は完了だけを通知する
+            if n_frames == 0:
+                graph_data_list = calculate_graph_data_by_chunks([])
+                _report(on_progress, cancel_event, "graph", 1.0)
+            else:
+                graph_data_list = calculate_graph_data_by_chunks(iter_chunks())
+        except BaseException:
+            # 中止・エラーの場合は開いたファイルを閉じる
+            reader.close()
+            raise
+        return MotionData(skeleton_data=None,
+                          coordinate_data=coordinate_data,
+                          graph_data_list=graph_data_list)
+
+    @staticmethod
+    def stream_graph_data(file_name: str, chunk_size: int = 1000) -> List[GraphData]:
+        """全フレームをchunk_sizeフレームずつ読み込み・変換しながらグラフデータを計算する
+
+        位置情報は保持しないので、どれだけ長いファイルでもメモリ使用量はchunk_sizeに比例する。
+        1回だけ先頭から読むので、フレーム位置のインデックスは保存しない。
+        """
+        with LazyBvhReader(file_name, persist_index=False) as reader:
+            coordinate_data_chunks = CoordinateDataConverter().iter_convert(reader.iter_skeleton_data(chunk_size))
+            return calculate_graph_data_by_chunks(coordinate_data_chunks)
@@ -0,0 +1,186 @@
+"""bvhファイルのライブラリから似た姿勢のフレームを検索するコマンド
+
+python -m src.usecase.pose_search_usecase build <入力ディレクトリ> <索引ディレクトリ> [--components N] [--no-normalize]
+    [--workers N]
+python -m src.usecase.pose_search_usecase query <索引ディレクトリ> <bvhファイル> <フレーム> [-k K]
+
+buildはディレクトリ内の全てのbvhファイルの全フレームの姿勢を主成分空間に射影した索引を作成して保存する。
+queryは指定したファイルのフレームの姿勢に近いフレームを、索引の全てのファイルから近い順に表示する。
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.interface.lazy_bvh_reader import LazyBvhReader
+from src.model.skeleton_data import CoordinateData
+from src.repository.pose_index_repository import PoseIndexRepository
+from src.service.coordinate_data_converter import CoordinateDataConverter
+from src.service.pose_search import DEFAULT_N_COMPONENTS, PoseIndex, PoseMatch, pose_features
+from src.service.windowed_coordinate_data import WindowedCoordinateData
+from src.usecase.batch_convert_usecase import BatchConvertUsecase
+
+# 特徴ベクトルを計算するときに一度に変換するフレーム数
+FEATURE_CHUNK_SIZE = 2000
+
+
+class PoseSearchUsecase:
+    """姿勢の類似検索の索引の作成・保存・検索"""
+
+    def __init__(self, n_components: int = DEFAULT_N_COMPONENTS, normalize_scale: bool = True, workers: int = None,
+                 n_joints: int = None):
+        """n_jointsは検索する索引の関節数。指定した場合は関節数の異なるモーションを検索しない"""
+        self.n_components: int = n_components
+        self.normalize_scale: bool = normalize_scale
+        self.workers: int = workers or os.cpu_count() or 1
+        self.n_joints: Optional[int] = n_joints
+
+    def features_of(self, coordinate_data: Union[CoordinateData, WindowedCoordinateData],
+                    on_progress: Callable[[float], None] = None) -> np.ndarray:
+        """全フレームの特徴ベクトル。WindowedCoordinateDataは先頭から順に変換しながら計算する
+
+        on_progressを指定した場合は、計算したフレームの割合 (0〜1) を通知する。
+        """
+        if not isinstance(coordinate_data, WindowedCoordinateData):
+            features = pose_features(coordinate_data.world_pos, normalize_scale=self.normalize_scale)
+            if on_progress is not None:
+                on_progress(1.0)
+            return features
+        features_list = []
+        for start, chunk in coordinate_data.iter_chunks(FEATURE_CHUNK_SIZE):
+            features_list.append(pose_features(chunk.world_pos, normalize_scale=self.normalize_scale))
+            if on_progress is not None:
+                on_progress((start + chunk.n_frames) / coordinate_data.n_frames)
+        return np.concatenate(features_list)
+
+    def frame_features(self, coordinate_data: Union[CoordinateData, WindowedCoordinateData],
+                       frame: int) -> np.ndarray:
+        """1フレームの特徴ベクトル"""
+        positions = np.asarray(coordinate_data.world_pos[frame])[None]
+        return pose_features(positions, normalize_scale=self.normalize_scale)[0]
+
+    def index_motion(self, coordinate_data: Union[CoordinateData, WindowedCoordinateData],
+                     take_name: str, on_progress: Callable[[float], None] = None) -> PoseIndex:
+        """1つのテイクの索引 (表示中のファイル内の検索用)。on_progressは特徴ベクトルの計算の進捗 (0〜1)"""
+        return PoseIndex.build([self.features_of(coordinate_data, on_progress=on_progress)], [take_name],
+                               n_components=self.n_components)
+
+    @staticmethod
+    def file_features(file_name: str, normalize_scale: bool = True) -> Tuple[Optional[np.ndarray], Optional[str]]:
+        """bvhファイルの全フレームの特徴ベクトル。位置情報は保持せずFEATURE_CHUNK_SIZEフレームずつ変換する
+
+        失敗した場合は例外を送出せず、(None, エラー内容)を返す。フレーム位置のインデックスは保存しない。
+        """
+        try:
+            with LazyBvhReader(file_name, persist_index=False) as reader:
+                chunks = CoordinateDataConverter().iter_convert(reader.iter_skeleton_data(FEATURE_CHUNK_SIZE))
+                return np.concatenate([pose_features(chunk.world_pos, normalize_scale=normalize_scale)
+                                       for chunk in chunks]), None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    def build_library(self, input_dir: str, index_dir: str = None) -> PoseIndex:
+        """ディレクトリ内の全てのbvhファイルの索引を作成する。index_dirを指定した場合は保存する
+
+        テイク名はファイルの絶対パス。関節構成が最初のファイルと異なるファイルは索引に含めない。
+        """
+        file_names = [os.path.abspath(file_name) for file_name in BatchConvertUsecase.find_bvh_files(input_dir)]
+        features_list, take_names = [], []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            normalize = [self.normalize_scale] * len(file_names)
+            for file_name, (features, error) in zip(file_names,
+                                                    executor.map(self.file_features, file_names, normalize)):
+                if error is None and features_list and features.shape[1] != features_list[0].shape[1]:
+                    error = f"joint count differs from {take_names[0]}"
+                if error is not None:
+                    print(f"{file_name}: error: {error}")
+                    continue
+                features_list.append(features)
+                take_names.append(file_name)
+        if not features_list:
+            raise ValueError(f"no bvh files could be indexed in {input_dir}")
+
+        pose_index = PoseIndex.build(features_list, take_names, n_components=self.n_components)
+        if index_dir is not None:
+            PoseIndexRepository.save(pose_index, index_dir, {"normalize_scale": self.normalize_scale,
+                                                             "n_joints": features_list[0].shape[1] // 3 + 1})
+        return pose_index
+
+    @classmethod
+    def load_library(cls, index_dir: str, workers: int = None) -> Tuple["PoseSearchUsecase", PoseIndex]:
+        """保存した索引と、その作成条件と同じ条件で特徴ベクトルを計算するPoseSearchUsecase
+
+        関節数を記録していない索引は、特徴ベクトルの次元から関節数を求める。
+        """
+        metadata = PoseIndexRepository.load_metadata(index_dir)
+        pose_index = PoseIndexRepository.load(index_dir)
+        usecase = cls(n_components=pose_index.pca.components.shape[1],
+                      normalize_scale=metadata.get("normalize_scale", True), workers=workers,
+                      n_joints=metadata.get("n_joints", pose_index.pca.mean.shape[0] // 3 + 1))
+        return usecase, pose_index
+
+    def accepts(self, coordinate_data: Union[CoordinateData, WindowedCoordinateData]) -> bool:
+        """coordinate_dataの姿勢を索引で検索できるか (関節数が索引と同じか)"""
+        return self.n_joints is None or len(coordinate_data.joint_names) == self.n_joints
+
+    def search_frame(self, pose_index: PoseIndex, coordinate_data: Union[CoordinateData, WindowedCoordinateData],
+                     frame: int, take_name: str = None, k: int = 10, within_take: bool = False,
+                     exclude_radius: int = None, min_separation: int = None) -> List[PoseMatch]:
+        """coordinate_dataのframeの姿勢に近いフレームを近い順にk個返す
+
+        take_nameが索引に含まれる場合は、そのテイクのframeの前後exclude_radiusフレーム(既定: 0.5秒)を除く。
+        within_take=Trueの場合はtake_nameのテイクの中だけを検索する。
+        同じテイクの結果同士はmin_separationフレーム(既定: 0.5秒)以上離す。
+        """
+        if not self.accepts(coordinate_data):
+            raise ValueError(f"joint count {len(coordinate_data.joint_names)} differs from "
+                             f"the index ({self.n_joints})")
+        half_second = max(int(coordinate_data.fps) // 2, 1)
+        exclude_radius = half_second if exclude_radius is None else exclude_radius
+        min_separation = half_second if min_separation is None else min_separation
+        indexed = take_name in pose_index.take_names
+        return pose_index.search(self.frame_features(coordinate_data, frame), k=k,
+                                 take=take_name if within_take else None,
+                                 exclude_take=take_name if indexed else None,
+                                 exclude_frame=frame if indexed else None,
+                                 exclude_radius=exclude_radius, min_separation=min_separation)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bvhファイルのライブラリから似た姿勢のフレームを検索する")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="索引を作成する")
+    build_parser.add_argument("input_dir")
+    build_parser.add_argument("index_dir")
+    build_parser.add_argument("--components", type=int, default=DEFAULT_N_COMPONENTS, help="主成分の数")
+    build_parser.add_argument("--no-normalize", action="store_true", help="体格の違いを正規化しない")
+    build_parser.add_argument("--workers", type=int, default=None, help="プロセス数 (既定: CPU数)")
+    query_parser = subparsers.add_parser("query", help="似た姿勢のフレームを検索する")
+    query_parser.add_argument("index_dir")
+    query_parser.add_argument("file_name")
+    query_parser.add_argument("frame", type=int)
+    query_parser.add_argument("-k", type=int, default=10, help="表示する件数")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = PoseSearchUsecase(n_components=args.components, normalize_scale=not args.no_normalize,
+                                  workers=args.workers).build_library(args.input_dir, args.index_dir)
+        print(f"indexed {len(index.take_names)} files, {index.n_frames} frames "
+              f"in {time.perf_counter() - start:.2f} s")
+    else:
+        usecase, index = PoseSearchUsecase.load_library(args.index_dir)
+        with LazyBvhReader(args.file_name, persist_index=False) as bvh_reader:
+            coordinate_data = WindowedCoordinateData(reader=bvh_reader)
+            start = time.perf_counter()
+            matches = usecase.search_frame(index, coordinate_data, args.frame,
+                                           take_name=os.path.abspath(args.file_name), k=args.k)
+            elapsed = time.perf_counter() - start
+        for match in matches:
+            print(f"{match.distance:10.4f}  {match.frame:8d}  {match.take}")
+        print(f"searched {index.n_frames} frames in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+from typing import List, Optional
+
+from src.usecase.batch_convert_usecase import is_bvh_file
+from src.usecase.load_bvh_usecase import LoadBvhUsecase, LoadingCancelled
+
+# ファイルを開いてから先読みを始めるまでの時間 [s]。開いたファイルの描画などを先に行う
+DEFAULT_PREFETCH_DELAY = 0.5
+
+# 先読み用のスレッドの優先度 (nice値の増分)
+PREFETCH_NICENESS = 10
+
+
+class PrefetchBvhUsecase:
+    """開いたファイルと同じディレクトリにある前後のファイルを、バックグラウンドで読み込んでおく
+
+    読み込んだ結果はload_bvh_usecaseのキャッシュに保持されるので、前後のファイルに切り替えた場合は変換を省略できる。
+    先読みは1つのスレッドで1ファイルずつ行い、Linuxではスレッドの優先度を下げる。
+    別のファイルを開いた場合などはcancelで中止する。
+    """
+
+    def __init__(self, load_bvh_usecase: LoadBvhUsecase, neighbours: int = 1, max_file_size: int = None,
+                 delay: float = DEFAULT_PREFETCH_DELAY):
+        self.load_bvh_usecase: LoadBvhUsecase = load_bvh_usecase
+        self.neighbours: int = neighbours
+        self.max_file_size: Optional[int] = max_file_size
+        self.delay: float = delay
+        self.prefetched: List[str] = []
+        self._cancel_event: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def find_sibling_files(file_name: str, neighbours: int = 1) -> List[str]:
+        """同じディレクトリのbvhファイルのうち、名前順で前後neighbours個のファイル。近い順に 次, 前, 2つ次, ... とする"""
+        dir_name = os.path.dirname(os.path.abspath(file_name))
+        file_names = sorted(os.path.join(dir_name, name) for name in os.listdir(dir_name)
+                            if is_bvh_file(name))
+        try:
+            index = file_names.index(os.path.abspath(file_name))
+        except ValueError:
+            return []
+        siblings = []
+        for distance in range(1, neighbours + 1):
+            for sibling_index in [index + distance, index - distance]:
+                if 0 <= sibling_index < len(file_names):
+                    siblings.append(file_names[sibling_index])
+        return siblings
+
+    def start(self, file_name: str):
+        """file_nameの前後のファイルの先読みを開始する。実行中の先読みは中止する"""
+        self.cancel()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run,
+                                        args=(self.find_sibling_files(file_name, self.neighbours),
+                                              self._cancel_event),
+                                        name="bvh-prefetcher", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def join(self, timeout: float = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @staticmethod
+    def _lower_priority():
+        if sys.platform.startswith("linux") and hasattr(os, "setpriority"):
+            try:
+                # Linuxではスレッドごとに優先度を設定できる
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(),
+                               os.getpriority(os.PRIO_PROCESS, 0) + PREFETCH_NICENESS)
+            except OSError:
+                pass
+
+    def _run(self, file_names: List[str], cancel_event: threading.Event):
+        if cancel_event.wait(self.delay):
+            return
+        self._lower_priority()
+        memory_cache = self.load_bvh_usecase.memory_cache
+        for file_name in file_names:
+            if cancel_event.is_set():
+                return
+            if memory_cache is not None and file_name in memory_cache:
+                continue
+            if self.max_file_size is not None and os.path.getsize(file_name) > self.max_file_size:
+                continue
+            try:
+                self.load_bvh_usecase.load(file_name, cancel_event=cancel_event)
+            except LoadingCancelled:
+                return
+            except Exception as e:
+                print(f"failed to prefetch {file_name}: {e}")
+                continue
+            self.prefetched.append(file_name)
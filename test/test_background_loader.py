@@ -0,0 +1,91 @@
+import threading
+import time
+
+from src.presenter.background_loader import BackgroundLoader
+from src.usecase.load_bvh_usecase import LoadBvhUsecase, LoadingCancelled
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+class FakeWidget:
+    """afterで登録された処理を手動で実行するためのウィジェット"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, func):
+        self.jobs.append(func)
+        return func
+
+    def run_until_idle(self, timeout: float = 30):
+        deadline = time.monotonic() + timeout
+        while self.jobs and time.monotonic() < deadline:
+            func = self.jobs.pop(0)
+            time.sleep(0.001)
+            func()
+
+
+class TestBackgroundLoader:
+
+    def test_load_with_progress(self):
+
+        # given
+        widget = FakeWidget()
+        loader = BackgroundLoader(widget, load=LoadBvhUsecase().load)
+        progress_list, results = [], []
+
+        # when
+        loader.start(FILE_NAME, on_progress=progress_list.append, on_done=results.append, on_error=results.append)
+        widget.run_until_idle()
+
+        # then
+        assert len(results) == 1
+        motion_data = results[0]
+        assert [progress.stage for progress in progress_list][:3] == ["cache", "parse", "skeleton"]
+        previews = [progress.preview for progress in progress_list if progress.preview is not None]
+        assert len(previews) == 1
+        assert previews[0].n_frames == min(2000, motion_data.coordinate_data.n_frames)
+        assert previews[0].local_pos[0].tolist() == motion_data.coordinate_data.local_pos[0].tolist()
+        assert all(earlier.overall <= later.overall for earlier, later in zip(progress_list, progress_list[1:]))
+        assert not loader.is_loading
+
+    def test_cancel_by_starting_another_load(self):
+
+        # given
+        widget = FakeWidget()
+        started = threading.Event()
+
+        def load(file_name, on_progress, cancel_event):
+            if file_name == "slow.bvh":
+                started.set()
+                cancel_event.wait(10)
+                raise LoadingCancelled()
+            return file_name
+
+        loader = BackgroundLoader(widget, load=load)
+        results = []
+        loader.start("slow.bvh", on_progress=results.append, on_done=results.append, on_error=results.append)
+        started.wait(10)
+
+        # when
+        loader.start("fast.bvh", on_progress=results.append, on_done=results.append, on_error=results.append)
+        widget.run_until_idle()
+
+        # then
+        assert results == ["fast.bvh"]
+
+    def test_error(self):
+
+        # given
+        widget = FakeWidget()
+        loader = BackgroundLoader(widget, load=LoadBvhUsecase().load)
+        errors = []
+
+        # when
+        loader.start("not_found.bvh", on_progress=lambda progress: None, on_done=errors.append,
+                     on_error=errors.append)
+        widget.run_until_idle()
+
+        # then
+        assert len(errors) == 1
+        assert isinstance(errors[0], FileNotFoundError)
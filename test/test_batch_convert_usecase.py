@@ -0,0 +1,40 @@
+import json
+import os
+import shutil
+
+from src.repository.coordinate_data_repository import CoordinateDataRepository
+from src.usecase.batch_convert_usecase import BatchConvertUsecase, SUMMARY_FILE_NAME
+
+
+class TestBatchConvertUsecase:
+
+    def test_run(self, tmp_path):
+
+        # given
+        input_dir = tmp_path / "data"
+        os.makedirs(input_dir / "day2")
+        shutil.copyfile("test/data/MCPM_20230410_150228.BVH", input_dir / "take_1.BVH")
+        shutil.copyfile("test/data/MCPM_20230410_150228.BVH", input_dir / "day2" / "take_2.bvh")
+        shutil.copyfile("test/data/MCPM_20230410_150228.BVH", input_dir / "day2" / "take_2.Bvh")
+        with open(input_dir / "broken.bvh", mode="w") as f:
+            f.write("HIERARCHY\nROOT root\n{\n")
+        output_dir = tmp_path / "output"
+
+        # when
+        results = BatchConvertUsecase(workers=2).run(input_dir=str(input_dir), output_dir=str(output_dir))
+
+        # then
+        results = {os.path.basename(result.file_name): result for result in results}
+        assert sorted(results) == ["broken.bvh", "take_1.BVH", "take_2.Bvh", "take_2.bvh"]
+        assert results["broken.bvh"].error is not None
+        assert results["take_1.BVH"].error is None
+        assert results["take_1.BVH"].frames == 369
+        assert results["take_1.BVH"].fps == 50
+        assert abs(results["take_1.BVH"].duration - 7.38) < 1e-6
+        assert set(results["take_1.BVH"].timings) == {"parse", "skeleton", "convert", "graph", "write"}
+        coordinate_data = CoordinateDataRepository.load(str(output_dir / "day2" / "take_2.bvh" / "coordinate"))
+        assert coordinate_data.n_frames == 369
+        assert len({result.output_dir for result in results.values()}) == 4
+        with open(output_dir / SUMMARY_FILE_NAME) as f:
+            summary = json.load(f)
+        assert len(summary) == 4
@@ -0,0 +1,71 @@
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+from matplotlib.backend_bases import ResizeEvent
+
+from src.presenter.blit_manager import BlitManager
+from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.presenter.graph_data_drawer import GraphDataDrawer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+
+def create_figure(motion_data, blit: bool):
+    fig = plt.figure(figsize=(6, 3))
+    coordinate_drawer = CoordinateDataDrawer(ax=fig.add_subplot(121, projection='3d'),
+                                             coordinate_data=motion_data.coordinate_data)
+    coordinate_drawer.draw_local_pos_at_initial_frame()
+    graph_drawer = GraphDataDrawer(ax=fig.add_subplot(122), graph_data=motion_data.graph_data_list[0], blit=False)
+    graph_drawer.draw_graph_data_at_specific_frame(frame=0)
+    blit_manager = BlitManager(fig.canvas,
+                               animated_artists=coordinate_drawer.animated_artists + graph_drawer.animated_artists,
+                               enabled=blit)
+    fig.canvas.draw()
+    return fig, coordinate_drawer, graph_drawer, blit_manager
+
+
+def update(coordinate_drawer, graph_drawer, blit_manager, frame: int):
+    coordinate_drawer.draw_local_pos_at_specific_frame(frame=frame)
+    graph_drawer.draw_graph_data_at_specific_frame(frame=frame)
+    blit_manager.update()
+
+
+class TestBlitManager:
+
+    def test_blit_same_as_full_redraw(self):
+
+        # given
+        motion_data = LoadBvhUsecase().load("test/data/MCPM_20230410_150228.BVH")
+        blit_fig, *blit_drawers = create_figure(motion_data, blit=True)
+        full_fig, *full_drawers = create_figure(motion_data, blit=False)
+
+        # when
+        update(*blit_drawers, frame=30)
+        update(*full_drawers, frame=30)
+        full_fig.canvas.draw()
+
+        # then
+        np.testing.assert_array_equal(np.array(blit_fig.canvas.buffer_rgba()),
+                                      np.array(full_fig.canvas.buffer_rgba()))
+        plt.close(blit_fig)
+        plt.close(full_fig)
+
+    def test_invalidate_background_on_resize(self):
+
+        # given
+        motion_data = LoadBvhUsecase().load("test/data/MCPM_20230410_150228.BVH")
+        fig, coordinate_drawer, graph_drawer, blit_manager = create_figure(motion_data, blit=True)
+        assert blit_manager.background is not None
+
+        # when
+        fig.set_size_inches(8, 4)
+        ResizeEvent("resize_event", fig.canvas)._process()
+        background_after_resize = blit_manager.background
+        update(coordinate_drawer, graph_drawer, blit_manager, frame=10)
+
+        # then
+        assert background_after_resize is None
+        assert blit_manager.background is not None
+        assert blit_manager.background.get_extents()[2] == fig.canvas.get_width_height()[0]
+        plt.close(fig)
@@ -2,14 +2,20 @@ import json
 from dataclasses import asdict
 from typing import List
 
+import numpy as np
+import pandas as pd
+import pytest
 from icecream import ic
 from matplotlib import pyplot as plt
 
 from src.interface.bvh_reader import BvhReader
 from src.model.skeleton_data import SkeletonData, CoordinateData, GraphData, MultiPlotGraphData
 from src.presenter.graph_data_drawer import GraphDataDrawer, MultiPlotGraphDataDrawer
-from src.service.calculate_graph_data import CalculateGraphData
+from src.service.calculate_graph_data import CalculateGraphData, GRAPH_METRICS, DEFAULT_GRAPH_KEYS, \
+    angle_between_vectors_2d
+from src.service.graph_metrics import GraphMetric, GraphMetricRegistry, batch_joint_angles
 from src.service.coordinate_data_converter import CoordinateDataConverter
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
 
 
 class TestCalculateGraphData:
@@ -20,8 +26,7 @@ class TestCalculateGraphData:
         json_file_path = "test/data/MCPM_20230410_150228_coordinate.json"
         with open(json_file_path) as f:
             json_data = json.load(f)
-        coordinate_data_schema = CoordinateData.schema()
-        coordinate_data: CoordinateData = coordinate_data_schema.loads(json_data)
+        coordinate_data: CoordinateData = CoordinateData.from_json(json_data)
 
         # when
         graph_data: GraphData \
@@ -38,8 +43,7 @@ class TestCalculateGraphData:
         json_file_path = "test/data/MCPM_20230410_150228_coordinate.json"
         with open(json_file_path) as f:
             json_data = json.load(f)
-        coordinate_data_schema = CoordinateData.schema()
-        coordinate_data: CoordinateData = coordinate_data_schema.loads(json_data)
+        coordinate_data: CoordinateData = CoordinateData.from_json(json_data)
 
         # when
         graph_data: GraphData \
@@ -64,8 +68,7 @@ class TestCalculateGraphData:
         json_file_path = "test/data/MCPM_20230410_150228_coordinate.json"
         with open(json_file_path) as f:
             json_data = json.load(f)
-        coordinate_data_schema = CoordinateData.schema()
-        coordinate_data: CoordinateData = coordinate_data_schema.loads(json_data)
+        coordinate_data: CoordinateData = CoordinateData.from_json(json_data)
 
         # when
         multi_graph_data: MultiPlotGraphData \
@@ -84,3 +87,124 @@ class TestCalculateGraphData:
             drawer: MultiPlotGraphDataDrawer = MultiPlotGraphDataDrawer(ax=ax, multi_graph_data=multi_graph_data)
             drawer.draw_graph_data_at_specific_frame(frame=0)
             plt.show()
+
+
+class TestBatchJointAngles:
+
+    def test_same_as_arccos(self):
+
+        # given
+        rng = np.random.default_rng(0)
+        positions = rng.normal(size=(50, 4, 3))
+        triplets = np.array([[0, 1, 2], [1, 2, 3], [3, 0, 1]])
+
+        # when
+        angles = batch_joint_angles(positions, triplets)
+
+        # then
+        assert angles.shape == (50, 3)
+        for i, (origin, a, b) in enumerate(triplets):
+            vec_a = positions[:, a] - positions[:, origin]
+            vec_b = positions[:, b] - positions[:, origin]
+            cos = np.sum(vec_a * vec_b, axis=1) / np.linalg.norm(vec_a, axis=1) / np.linalg.norm(vec_b, axis=1)
+            np.testing.assert_allclose(angles[:, i], np.rad2deg(np.arccos(cos)), atol=1e-9)
+
+    def test_straight_and_zero_length(self):
+
+        # given
+        positions = np.array([[[0, 0, 0], [1, 0, 0], [-1, 1e-9, 0]],
+                              [[0, 0, 0], [1, 0, 0], [1, 1e-9, 0]],
+                              [[0, 0, 0], [0, 0, 0], [1, 0, 0]]], dtype=np.float64)
+
+        # when
+        angles = batch_joint_angles(positions, np.array([[0, 1, 2]]))[:, 0]
+
+        # then
+        assert not np.isnan(angles).any()
+        np.testing.assert_allclose(angles, [180.0, 0.0, 90.0], atol=1e-6)
+
+    def test_2d(self):
+
+        # given
+        positions = np.array([[[0, 0, 0], [1, 5, 0], [0, -3, 1]]], dtype=np.float64)
+        joint_index = {"o": 0, "a": 1, "b": 2}
+
+        # when
+        angle = angle_between_vectors_2d(positions, joint_index, "o", "a", "b")
+
+        # then
+        np.testing.assert_allclose(angle, [90.0])
+
+
+class TestGraphMetricRegistry:
+
+    def test_evaluate_shares_intermediates(self):
+
+        # given
+        coordinate_data = LoadBvhUsecase().load("test/data/MCPM_20230410_150228.BVH").coordinate_data
+        registry = GraphMetricRegistry([GRAPH_METRICS.get(key) for key in DEFAULT_GRAPH_KEYS])
+        registry.register(GraphMetric(graph_key="head_speed", display_name="Head speed [cm/s]",
+                                      calculate=lambda context: np.linalg.norm(context.velocity("head"), axis=1),
+                                      joints=("head", "torso_1")))
+        registry.register(GraphMetric(graph_key="elbow_angle", display_name="Elbow angle [degree]",
+                                      calculate=lambda context: context.angle("l_low_arm", "l_hand", "l_up_arm"),
+                                      angles=(("l_low_arm", "l_hand", "l_up_arm"),)))
+
+        # when
+        context = registry.create_context(coordinate_data, registry.keys())
+        graph_data_list = [registry.get(key).to_graph_data(context) for key in registry.keys()]
+
+        # then
+        assert [graph_data.graph_key for graph_data in graph_data_list] \
+            == ["head_pos_z", "knee_angle", "body_speed", "head_speed", "elbow_angle"]
+        assert context.positions("world").shape == (coordinate_data.n_frames, 2, 3)  # head, torso_1
+        assert context.cached("angles", None).shape == (coordinate_data.n_frames, 3)
+        assert set(key[0] for key in context._cache if isinstance(key, tuple)) == {"positions", "velocity"}
+        expected = CalculateGraphData.calculate_default_graph_data(coordinate_data)
+        for actual, expected in zip(graph_data_list, expected):
+            np.testing.assert_array_equal(np.asarray(actual.data), np.asarray(expected.data))
+
+    def test_same_as_previous_implementation(self):
+
+        # given
+        # 変更前の実装 (フレームごとの内積とarccos、pandasのrolling・bfill) で計算した値と比べる
+        coordinate_data = LoadBvhUsecase().load("test/data/MCPM_20230410_150228.BVH").coordinate_data
+        joint_index = coordinate_data.joint_index
+
+        def previous_angle(origin_joint_name: str, a_joint_name: str, b_joint_name: str) -> np.ndarray:
+            positions = coordinate_data.local_pos
+            origin_pos = positions[:, joint_index[origin_joint_name]].astype(np.float64)
+            vec_a = positions[:, joint_index[a_joint_name]].astype(np.float64) - origin_pos
+            vec_b = positions[:, joint_index[b_joint_name]].astype(np.float64) - origin_pos
+            inner = np.array([np.dot(vec_a_i, vec_b_i) for vec_a_i, vec_b_i in zip(vec_a, vec_b)])
+            norm_dot = np.linalg.norm(vec_a, axis=1) * np.linalg.norm(vec_b, axis=1)
+            norm_dot = [data if data != 0 else 1 for data in norm_dot]
+            return np.rad2deg(np.arccos(inner / norm_dot))
+
+        def previous_body_speed() -> np.ndarray:
+            torso_1_pos_m = coordinate_data.world_pos[:, joint_index["torso_1"]].astype(np.float64) * 0.01
+            df_pos = pd.DataFrame(torso_1_pos_m, columns=["x", "y", "z"]).rolling(window=10, center=True).mean()
+            df_vel = ((df_pos - df_pos.shift(1)) * coordinate_data.fps).bfill()
+            return ((df_vel["x"] ** 2 + df_vel["y"] ** 2 + df_vel["z"] ** 2) ** 0.5).to_numpy()
+
+        # when
+        graph_data_list = CalculateGraphData.calculate_default_graph_data(coordinate_data)
+
+        # then
+        head_pos_z, knee_angle, body_speed = graph_data_list
+        np.testing.assert_array_equal(head_pos_z.data, coordinate_data.local_pos[:, joint_index["head"], 1])
+        expected_angles = [previous_angle("l_low_leg", "l_foot", "l_up_leg"),
+                           previous_angle("r_low_leg", "r_foot", "r_up_leg")]
+        assert not np.isnan(expected_angles).any()
+        # arccosは0度・180度付近で桁落ちするので、その分だけ許容する
+        np.testing.assert_allclose(knee_angle.data, expected_angles, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(body_speed.data, previous_body_speed(), rtol=0, atol=1e-12)
+
+    def test_register_duplicated_key(self):
+
+        # given
+        registry = GraphMetricRegistry([GRAPH_METRICS.get("head_pos_z")])
+
+        # when, then
+        with pytest.raises(ValueError):
+            registry.register(GRAPH_METRICS.get("head_pos_z"))
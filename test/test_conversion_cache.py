@@ -0,0 +1,154 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.model.skeleton_data import MotionData, MultiPlotGraphData
+from src.repository.conversion_cache import ConversionCache
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+
+class TestConversionCache:
+
+    @staticmethod
+    def _copy_bvh(tmp_path, name: str = "take.bvh") -> str:
+        file_name = str(tmp_path / name)
+        shutil.copyfile("test/data/MCPM_20230410_150228.BVH", file_name)
+        return file_name
+
+    def test_hit_after_miss(self, tmp_path):
+
+        # given
+        file_name = self._copy_bvh(tmp_path)
+        usecase = LoadBvhUsecase.with_cache(cache_dir=str(tmp_path / "cache"))
+
+        # when
+        expected: MotionData = usecase.load(file_name)
+        actual: MotionData = usecase.load(file_name)
+
+        # then
+        assert usecase.cache.statistics.misses == 1
+        assert usecase.cache.statistics.hits == 1
+        np.testing.assert_array_equal(actual.coordinate_data.world_pos, expected.coordinate_data.world_pos)
+        np.testing.assert_array_equal(actual.skeleton_data.joints_rotations, expected.skeleton_data.joints_rotations)
+        assert [graph.graph_key for graph in actual.graph_data_list] \
+            == [graph.graph_key for graph in expected.graph_data_list]
+        assert isinstance(actual.graph_data_list[1], MultiPlotGraphData)
+        np.testing.assert_array_equal(actual.graph_data_list[2].data, expected.graph_data_list[2].data)
+
+    def test_hit_from_new_instance(self, tmp_path):
+
+        # given
+        file_name = self._copy_bvh(tmp_path)
+        LoadBvhUsecase.with_cache(cache_dir=str(tmp_path / "cache")).load(file_name)
+
+        # when
+        usecase = LoadBvhUsecase.with_cache(cache_dir=str(tmp_path / "cache"))
+        usecase.load(file_name)
+
+        # then
+        assert usecase.cache.statistics.hits == 1
+
+    def test_invalidate_modified_file(self, tmp_path):
+
+        # given
+        file_name = self._copy_bvh(tmp_path)
+        usecase = LoadBvhUsecase.with_cache(cache_dir=str(tmp_path / "cache"))
+        usecase.load(file_name)
+
+        # when
+        with open(file_name, mode="a") as f:
+            f.write("\n")
+        os.utime(file_name, ns=(0, 0))
+        usecase.load(file_name)
+
+        # then
+        assert usecase.cache.statistics.misses == 2
+        assert usecase.cache.statistics.invalidations == 1
+
+    def test_keep_entry_shared_by_other_path(self, tmp_path):
+
+        # given
+        file_name = self._copy_bvh(tmp_path, "take.bvh")
+        copied_file_name = self._copy_bvh(tmp_path, "copied.bvh")
+        usecase = LoadBvhUsecase.with_cache(cache_dir=str(tmp_path / "cache"))
+        usecase.load(file_name)
+        usecase.load(copied_file_name)
+
+        # when
+        with open(file_name, mode="a") as f:
+            f.write("\n")
+        os.utime(file_name, ns=(0, 0))
+        usecase.load(file_name)
+        usecase.load(copied_file_name)
+
+        # then
+        assert usecase.cache.statistics.invalidations == 0
+        assert usecase.cache.statistics.hits == 2
+
+    def test_invalidate_other_version(self, tmp_path):
+
+        # given
+        file_name = self._copy_bvh(tmp_path)
+        LoadBvhUsecase.with_cache(cache_dir=str(tmp_path / "cache")).load(file_name)
+
+        # when
+        cache = ConversionCache(version="other", cache_dir=str(tmp_path / "cache"))
+        motion_data = cache.load(file_name)
+
+        # then
+        assert motion_data is None
+        assert cache.statistics.invalidations == 1
+        assert cache.total_bytes == 0
+
+    def test_evict_least_recently_used(self, tmp_path):
+
+        # given
+        file_names = [self._copy_bvh(tmp_path, f"take_{i}.bvh") for i in range(3)]
+        # 内容を変えて別のエントリにする
+        for i, file_name in enumerate(file_names):
+            with open(file_name, mode="a") as f:
+                f.write("\n" * (i + 1))
+        usecase = LoadBvhUsecase.with_cache(cache_dir=str(tmp_path / "cache"))
+        usecase.load(file_names[0])
+        entry_bytes = usecase.cache.total_bytes
+        usecase.cache.max_bytes = int(entry_bytes * 2.5)
+
+        # when
+        usecase.load(file_names[1])
+        usecase.load(file_names[0])
+        usecase.load(file_names[2])
+
+        # then
+        assert usecase.cache.statistics.evictions == 1
+        assert usecase.cache.total_bytes <= usecase.cache.max_bytes
+        assert sorted(usecase.cache._index["files"]) == sorted(os.path.abspath(name) for name in file_names[::2])
+        assert usecase.cache.load(file_names[0]) is not None
+        assert usecase.cache.load(file_names[1]) is None
+
+    def test_load_and_save_from_threads(self, tmp_path):
+
+        # given
+        file_names = [self._copy_bvh(tmp_path, f"take_{i}.bvh") for i in range(4)]
+        for i, file_name in enumerate(file_names[2:]):
+            with open(file_name, mode="a") as f:
+                f.write("\n" * (i + 1))
+        motion_data = LoadBvhUsecase().load(file_names[0])
+        cache = ConversionCache(version="test", cache_dir=str(tmp_path / "cache"))
+
+        # when
+        def load_and_save(file_name: str):
+            for _ in range(3):
+                if cache.load(file_name) is None:
+                    cache.save(file_name, motion_data)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(load_and_save, file_names))
+
+        # then
+        # take_0とtake_1は同じ内容なので1つのエントリを共有する
+        assert len(cache._index["entries"]) == 3
+        assert sorted(os.listdir(tmp_path / "cache")) == sorted(list(cache._index["entries"]) + ["index.json"])
+        assert cache.statistics.hits + cache.statistics.misses == 12
+        assert all(cache.load(file_name) is not None for file_name in file_names)
@@ -1,6 +1,7 @@
 import json
 from dataclasses import asdict
 
+import numpy as np
 from icecream import ic
 
 from src.interface.bvh_reader import BvhReader
@@ -37,3 +38,38 @@ class TestCoordinateDataConverter:
         json_file_path = "test/data/MCPM_20230410_150228_coordinate.json"
         with open(json_file_path, mode="wt", encoding="utf-8") as f:
             json.dump(coordinate_data.to_json(), f, ensure_ascii=False, indent=4)
+
+    def test_vectorized_engine_matches_loop_engine(self):
+
+        # given
+        file_name: str = "test/data/MCPM_20230410_150228.BVH"
+        skeleton_data: SkeletonData = BvhReader(file_name).create_skeleton_data()
+
+        # when
+        expected: CoordinateData \
+            = CoordinateDataConverter(engine="loop").convert_to_coordinate_data(skeleton_data=skeleton_data)
+        actual: CoordinateData \
+            = CoordinateDataConverter(engine="vectorized").convert_to_coordinate_data(skeleton_data=skeleton_data)
+
+        # then
+        assert actual.local_pos.shape == expected.local_pos.shape == (369, 27, 3)
+        np.testing.assert_allclose(actual.local_pos, expected.local_pos, atol=1e-3)
+        np.testing.assert_allclose(actual.world_pos, expected.world_pos, atol=1e-3)
+
+    def test_parallel_matches_single_process(self):
+
+        # given
+        file_name: str = "test/data/MCPM_20230410_150228.BVH"
+        skeleton_data: SkeletonData = BvhReader(file_name).create_skeleton_data()
+
+        # when
+        expected: CoordinateData = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+        actual: CoordinateData = CoordinateDataConverter(workers=2, chunk_size=100) \
+            .convert_to_coordinate_data(skeleton_data=skeleton_data)
+
+        # then
+        np.testing.assert_array_equal(actual.local_pos, expected.local_pos)
+        np.testing.assert_array_equal(actual.world_pos, expected.world_pos)
+        # 共有メモリの出力をコピーせずに参照する
+        assert actual.local_pos.base is not None and actual.world_pos.base is not None
+        assert actual.local_pos.base is actual.world_pos.base
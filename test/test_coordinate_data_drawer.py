@@ -0,0 +1,40 @@
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from src.presenter.coordinate_data_drawer import CoordinateDataDrawer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+
+class TestCoordinateDataDrawer:
+
+    def test_update_bone_segments(self):
+
+        # given
+        coordinate_data = LoadBvhUsecase().load("test/data/MCPM_20230410_150228.BVH").coordinate_data
+        fig = plt.figure()
+        ax = fig.add_subplot(111, projection='3d')
+        drawer = CoordinateDataDrawer(ax=ax, coordinate_data=coordinate_data)
+        drawer.draw_local_pos_at_initial_frame()
+        fig.canvas.draw()
+
+        # when
+        frame = 10
+        drawer.draw_local_pos_at_specific_frame(frame=frame)
+        fig.canvas.draw()
+
+        # then
+        assert len(ax.collections) == 1
+        local_pos = coordinate_data.local_pos_list[frame]
+        segments = drawer.calc_segments(frame)
+        index = 0
+        for joint_name in coordinate_data.joint_names[1:]:
+            parent_joint = coordinate_data.joints_hierarchy[joint_name][0]
+            if parent_joint == "root": continue
+            np.testing.assert_array_equal(segments[index, 0], np.asarray(local_pos[parent_joint])[[0, 2, 1]])
+            np.testing.assert_array_equal(segments[index, 1], np.asarray(local_pos[joint_name])[[0, 2, 1]])
+            index += 1
+        assert index == len(segments)
+        plt.close(fig)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.interface.bvh_reader import BvhReader
+from src.model.skeleton_data import CoordinateData, SkeletonData
+from src.repository.coordinate_data_repository import CoordinateDataRepository
+from src.repository.skeleton_data_repository import SkeletonDataRepository
+
+
+class TestCoordinateDataRepository:
+
+    def test_convert_json(self, tmp_path):
+
+        # given
+        json_file_path = "test/data/MCPM_20230410_150228_coordinate.json"
+        dir_path = str(tmp_path / "MCPM_20230410_150228_coordinate")
+
+        # when
+        expected: CoordinateData = CoordinateDataRepository.convert_json(json_file_path, dir_path)
+        actual: CoordinateData = CoordinateDataRepository.load(dir_path)
+
+        # then
+        assert isinstance(actual.world_pos.base, np.memmap)
+        assert not actual.world_pos.flags.writeable
+        np.testing.assert_array_equal(actual.world_pos, expected.world_pos)
+        np.testing.assert_array_equal(actual.local_pos, expected.local_pos)
+        assert actual.joint_names == expected.joint_names
+        assert actual.joints_hierarchy == expected.joints_hierarchy
+        assert actual.fps == expected.fps
+
+    def test_load_other_kind(self, tmp_path):
+
+        # given
+        skeleton_data: SkeletonData = BvhReader("test/data/MCPM_20230410_150228.BVH").create_skeleton_data()
+        SkeletonDataRepository.save(skeleton_data, str(tmp_path / "skeleton"))
+
+        # when, then
+        with pytest.raises(ValueError):
+            CoordinateDataRepository.load(str(tmp_path / "skeleton"))
+
+
+class TestSkeletonDataRepository:
+
+    def test_save_and_load(self, tmp_path):
+
+        # given
+        skeleton_data: SkeletonData = BvhReader("test/data/MCPM_20230410_150228.BVH").create_skeleton_data()
+
+        # when
+        SkeletonDataRepository.save(skeleton_data, str(tmp_path / "skeleton"))
+        actual: SkeletonData = SkeletonDataRepository.load(str(tmp_path / "skeleton"))
+
+        # then
+        assert actual.joints_names == skeleton_data.joints_names
+        assert actual.joints_hierarchy == skeleton_data.joints_hierarchy
+        assert actual.joints_saved_angles == skeleton_data.joints_saved_angles
+        assert actual.fps == skeleton_data.fps
+        np.testing.assert_array_equal(actual.joints_rotations, skeleton_data.joints_rotations)
+        np.testing.assert_array_equal(actual.root_positions, skeleton_data.root_positions)
+        for joint in skeleton_data.joints_names:
+            np.testing.assert_array_equal(actual.joints_offsets[joint], skeleton_data.joints_offsets[joint])
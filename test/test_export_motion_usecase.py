@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.presenter.headless_motion_renderer import HeadlessMotionRenderer
+from src.usecase.export_motion_usecase import ExportMotionUsecase, ExportOptions, parse_frame_range, \
+    PNG_FILE_NAME_FORMAT
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+class TestParseFrameRange:
+
+    @pytest.mark.parametrize("text, expected", [
+        (":", range(10)),
+        ("2:8:3", range(2, 8, 3)),
+        ("5", range(5, 6)),
+        ("-1", range(9, 10)),
+        ("-3:", range(7, 10)),
+        (":4", range(4)),
+    ])
+    def test_parse(self, text, expected):
+        assert list(parse_frame_range(text, 10)) == list(expected)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_frame_range("1:2:3:4", 10)
+
+
+class TestExportMotionUsecase:
+
+    def test_parallel_same_as_serial(self, tmp_path):
+
+        # given
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+        frames = list(range(0, 40, 4))
+        options = ExportOptions(figsize=(6, 3), dpi=50)
+
+        # when
+        serial = ExportMotionUsecase(workers=1, options=options).export(motion_data, frames, str(tmp_path / "serial"))
+        parallel = ExportMotionUsecase(workers=2, options=options).export(motion_data, frames,
+                                                                          str(tmp_path / "parallel"),
+                                                                          gif_name="take.gif")
+
+        # then
+        assert [os.path.basename(f) for f in parallel.png_files] == [PNG_FILE_NAME_FORMAT.format(f) for f in frames]
+        for serial_file, parallel_file in zip(serial.png_files, parallel.png_files):
+            np.testing.assert_array_equal(np.array(Image.open(serial_file)), np.array(Image.open(parallel_file)))
+        assert parallel.render_fps > 0
+        with Image.open(parallel.gif_file) as gif:
+            assert gif.n_frames == len(frames)
+            assert gif.size == (300, 150)
+            assert gif.info["duration"] == 80  # 4フレームごと, 50fps
+
+    def test_gif_only(self, tmp_path):
+
+        # given
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+
+        # when
+        result = ExportMotionUsecase(workers=1, options=ExportOptions(figsize=(3, 3), dpi=40, draw_graphs=False)) \
+            .export(motion_data, range(5), str(tmp_path), gif_name="take.gif", write_png=False)
+
+        # then
+        assert result.png_files == []
+        assert os.listdir(tmp_path) == ["take.gif"]
+        with Image.open(result.gif_file) as gif:
+            assert gif.n_frames == 5
+
+
+    def test_overlapping_ranges_with_mixed_steps(self, tmp_path):
+
+        # given
+        usecase = ExportMotionUsecase(workers=1, options=ExportOptions(figsize=(3, 3), dpi=40, draw_graphs=False))
+
+        # when
+        result = usecase.run(FILE_NAME, str(tmp_path), frame_ranges=["0:4", "2:10:4"], gif_name="take.gif")
+
+        # then
+        # 重複したフレーム2は1回だけ書き出す
+        assert result.frames == [0, 1, 2, 3, 6]
+        assert sorted(os.listdir(tmp_path)) == sorted([PNG_FILE_NAME_FORMAT.format(f) for f in result.frames]
+                                                      + ["take.gif"])
+        with Image.open(result.gif_file) as gif:
+            durations = []
+            for index in range(gif.n_frames):
+                gif.seek(index)
+                durations.append(gif.info["duration"])
+        # 各フレームはその範囲のSTEPフレーム分 (50fps) だけ表示する
+        assert durations == [20, 20, 20, 20, 80]
+
+    def test_gif_same_as_png(self, tmp_path):
+
+        # given
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+        usecase = ExportMotionUsecase(workers=1, options=ExportOptions(figsize=(3, 3), dpi=40, draw_graphs=False))
+
+        # when
+        result = usecase.export(motion_data, [0, 100, 100, 0], str(tmp_path), gif_name="take.gif")
+
+        # then
+        assert result.frames == [0, 100]
+        with Image.open(result.gif_file) as gif:
+            for index, png_file in enumerate(result.png_files):
+                gif.seek(index)
+                expected = Image.open(png_file).convert("RGB").quantize(
+                    palette=Image.open(result.png_files[0]).convert("RGB").quantize(colors=256),
+                    dither=Image.Dither.NONE).convert("RGB")
+                np.testing.assert_array_equal(np.array(gif.convert("RGB")), np.array(expected))
+
+
+class TestHeadlessMotionRenderer:
+
+    def test_same_as_full_redraw(self):
+
+        # given
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+        renderer = HeadlessMotionRenderer(motion_data, figsize=(6, 3), dpi=50)
+        full_renderer = HeadlessMotionRenderer(motion_data, figsize=(6, 3), dpi=50)
+        full_renderer.blit_manager.disconnect()
+        for artist in full_renderer.motion_figure.animated_artists:
+            artist.set_animated(False)
+
+        # when
+        image = renderer.render(30).copy()
+        full_renderer.motion_figure.draw_at_specific_frame(30)
+        full_renderer.canvas.draw()
+
+        # then
+        np.testing.assert_array_equal(image, np.asarray(full_renderer.canvas.buffer_rgba()))
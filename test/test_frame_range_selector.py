@@ -0,0 +1,76 @@
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.presenter.frame_range_selector import FrameRangeSelector
+
+
+def send(canvas, name: str, ax, frame: float, button=1):
+    x, y = ax.transData.transform((frame, 0.5))
+    MouseEvent(name, canvas, x, y, button=button)._process()
+
+
+class TestFrameRangeSelector:
+
+    def _create(self):
+        figure = Figure(figsize=(6, 3))
+        canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot(111)
+        ax.plot(np.linspace(0, 1, 100))
+        ax.set_xlim(0, 99)
+        ax.set_ylim(0, 1)
+        changes = []
+        selector = FrameRangeSelector(canvas, on_change=lambda frame_range, finished: changes.append(
+            (frame_range, finished)))
+        selector.set_target([ax], n_frames=100)
+        return canvas, ax, selector, changes
+
+    def test_drag(self):
+
+        # given
+        canvas, ax, selector, changes = self._create()
+
+        # when
+        send(canvas, "button_press_event", ax, 60)
+        send(canvas, "motion_notify_event", ax, 40)
+        send(canvas, "motion_notify_event", ax, 20.2)
+        send(canvas, "motion_notify_event", ax, 150)  # 軸の外
+        send(canvas, "button_release_event", ax, 150)
+
+        # then
+        assert changes == [((40, 61), False), ((20, 61), False), ((60, 100), False), ((60, 100), True)]
+        assert selector.frame_range == (60, 100)
+
+    def test_click_clears_selection(self):
+
+        # given
+        canvas, ax, selector, changes = self._create()
+        send(canvas, "button_press_event", ax, 10)
+        send(canvas, "motion_notify_event", ax, 30)
+        send(canvas, "button_release_event", ax, 30)
+
+        # when
+        send(canvas, "button_press_event", ax, 50)
+        send(canvas, "button_release_event", ax, 50)
+
+        # then
+        assert changes[-1] == (None, True)
+        assert selector.frame_range is None
+
+    def test_ignore_other_axes_and_buttons(self):
+
+        # given
+        canvas, ax, selector, changes = self._create()
+        selector.set_target([], n_frames=100)
+
+        # when
+        send(canvas, "button_press_event", ax, 10)
+        send(canvas, "motion_notify_event", ax, 30)
+        send(canvas, "button_release_event", ax, 30)
+
+        # then
+        assert changes == []
@@ -0,0 +1,136 @@
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from src.model.skeleton_data import GraphData, MultiPlotGraphData
+from src.presenter.graph_data_drawer import GraphDataDrawer, MultiPlotGraphDataDrawer
+
+
+class TestGraphDataDrawer:
+
+    def test_draw_static_content_once(self):
+
+        # given
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+        graph_data = GraphData(data=np.sin(np.linspace(0, 10, 300)), display_name="sin", graph_key="sin")
+        drawer = GraphDataDrawer(ax=ax, graph_data=graph_data)
+
+        # when
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+        fig.canvas.draw()
+        lines = list(ax.lines)
+        for frame in range(1, 50):
+            drawer.draw_graph_data_at_specific_frame(frame=frame)
+
+        # then
+        assert list(ax.lines) == lines
+        assert drawer.v_lines.get_segments()[0][0][0] == 49
+        plt.close(fig)
+
+    def test_blit_same_as_full_redraw(self):
+
+        # given
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+        graph_data = MultiPlotGraphData(data=[np.linspace(0, 1, 300), np.linspace(1, 0, 300)],
+                                        display_name="lines", graph_key="lines", legends=["a", "b"])
+        drawer = MultiPlotGraphDataDrawer(ax=ax, multi_graph_data=graph_data)
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+        fig.canvas.draw()
+
+        # when
+        drawer.draw_graph_data_at_specific_frame(frame=200)
+        blitted = np.array(fig.canvas.buffer_rgba())
+        fig.canvas.draw()
+        redrawn = np.array(fig.canvas.buffer_rgba())
+
+        # then
+        np.testing.assert_array_equal(blitted, redrawn)
+        plt.close(fig)
+
+    def test_more_lines_than_colors(self):
+
+        # given
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+        graph_data = MultiPlotGraphData(data=[np.full(100, i, dtype=float) for i in range(3)],
+                                        display_name="three", graph_key="three", legends=["a", "b", "c"])
+        drawer = MultiPlotGraphDataDrawer(ax=ax, multi_graph_data=graph_data)
+
+        # when
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+
+        # then
+        assert [line.get_label() for line in drawer.lines] == ["a", "b", "c"]
+        assert drawer.lines[2].get_color() == drawer.lines[0].get_color()
+        plt.close(fig)
+
+    def test_decimate_long_data(self):
+
+        # given
+        fig = plt.figure(figsize=(4, 2), dpi=100)
+        ax = fig.add_subplot(111)
+        data = np.random.default_rng(0).normal(size=180000)
+        data[123457] = 50.0
+        drawer = GraphDataDrawer(ax=ax, graph_data=GraphData(data=data, display_name="noise", graph_key="noise"))
+
+        # when
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+        line = ax.lines[0]
+        n_points = len(line.get_xdata())
+        ax.set_xlim(123300, 123500)
+        zoomed_frames = line.get_xdata()
+
+        # then
+        assert n_points <= drawer.max_points() + 4
+        assert np.max(line.get_ydata()) == 50.0
+        assert ax.get_xlim()[0] == 123300
+        assert zoomed_frames[0] <= 123300 and zoomed_frames[-1] >= 123500
+        np.testing.assert_array_equal(np.diff(zoomed_frames), 1)  # 拡大すると間引かない
+        assert np.max(line.get_ydata()) == 50.0
+        plt.close(fig)
+
+    def test_set_data_keeps_full_range(self):
+
+        # given
+        fig = plt.figure(figsize=(4, 2), dpi=100)
+        ax = fig.add_subplot(111)
+        drawer = GraphDataDrawer(ax=ax, graph_data=GraphData(data=np.zeros(100), display_name="a", graph_key="a"))
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+
+        # when
+        drawer.set_data(GraphData(data=np.linspace(-1, 1, 50000), display_name="b", graph_key="b"))
+
+        # then
+        x_min, x_max = ax.get_xlim()
+        assert x_min <= 0 and x_max >= 49999
+        line = ax.lines[0]
+        assert len(line.get_xdata()) <= drawer.max_points() + 4
+        assert np.min(line.get_ydata()) == -1 and np.max(line.get_ydata()) == 1
+        plt.close(fig)
+
+    def test_blit_selection_same_as_full_redraw(self):
+
+        # given
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+        graph_data = GraphData(data=np.sin(np.linspace(0, 10, 300)), display_name="sin", graph_key="sin")
+        drawer = GraphDataDrawer(ax=ax, graph_data=graph_data)
+        drawer.draw_graph_data_at_specific_frame(frame=0)
+        fig.canvas.draw()
+
+        # when
+        drawer.set_selection((100, 150))
+        drawer.draw_graph_data_at_specific_frame(frame=120)
+        blitted = np.array(fig.canvas.buffer_rgba())
+        fig.canvas.draw()
+        redrawn = np.array(fig.canvas.buffer_rgba())
+
+        # then
+        assert drawer.selection_span.get_visible()
+        assert drawer.selection_span.get_x() == 99.5 and drawer.selection_span.get_width() == 50
+        np.testing.assert_array_equal(blitted, redrawn)
+        plt.close(fig)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.service.kinematics import calculate_kinematics, moving_average, savgol_filter, lowpass_filter, \
+    smoothed_velocity
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+def pandas_kinematics(positions: np.ndarray, fps: int, window: int = 10):
+    """従来のbody speedと同じpandasでの計算を全関節に広げたもの"""
+    n_frames = len(positions)
+    df_pos = pd.DataFrame(positions.reshape(n_frames, -1)).rolling(window=window, center=True).mean()
+    df_vel = (df_pos - df_pos.shift(1)) * fps
+    df_acc = (df_vel - df_vel.shift(1)) * fps
+    df_jerk = (df_acc - df_acc.shift(1)) * fps
+    return [df.bfill().to_numpy().reshape(positions.shape) for df in (df_vel, df_acc, df_jerk)]
+
+
+class TestKinematics:
+
+    def test_moving_average_same_as_pandas(self):
+
+        # given
+        coordinate_data = LoadBvhUsecase().load(FILE_NAME).coordinate_data
+        positions = coordinate_data.world_pos.astype(np.float64)
+
+        # when
+        kinematics = calculate_kinematics(positions, fps=coordinate_data.fps)
+
+        # then
+        expected = pandas_kinematics(positions, fps=coordinate_data.fps)
+        for actual, expected_values in zip([kinematics.velocity, kinematics.acceleration, kinematics.jerk], expected):
+            assert actual.shape == positions.shape
+            np.testing.assert_allclose(actual, expected_values, rtol=1e-9, atol=1e-6)
+        assert kinematics.speed().shape == positions.shape[:2]
+
+    def test_smoothed_velocity_short(self):
+
+        # given
+        positions = np.arange(30, dtype=np.float64).reshape(10, 3)
+
+        # when
+        velocity = smoothed_velocity(positions, fps=50, window=10)
+
+        # then
+        assert np.isnan(velocity).all()
+
+    def test_savgol_exact_for_cubic(self):
+
+        # given
+        fps = 100
+        t = np.arange(200) / fps
+        positions = np.stack([2 * t ** 3 - t, t ** 2, np.ones_like(t)], axis=1)[:, None, :]  # (F, 1, 3)
+
+        # when
+        kinematics = calculate_kinematics(positions, fps=fps, method="savgol", window=9, edge="nan")
+
+        # then
+        valid = slice(4, -4)
+        np.testing.assert_allclose(kinematics.velocity[valid, 0, 0], (6 * t ** 2 - 1)[valid], atol=1e-8)
+        np.testing.assert_allclose(kinematics.acceleration[valid, 0, 1], 2, atol=1e-6)
+        np.testing.assert_allclose(kinematics.jerk[valid, 0, 0], 12, atol=1e-4)
+        assert np.isnan(kinematics.velocity[:4]).all() and np.isnan(kinematics.velocity[-4:]).all()
+
+    def test_lowpass_zero_phase(self):
+
+        # given
+        fps = 100
+        t = np.arange(500) / fps
+        slow = np.sin(2 * np.pi * 1 * t)
+        fast = np.sin(2 * np.pi * 30 * t)
+
+        # when
+        filtered = lowpass_filter((slow + fast)[:, None], fps=fps, cutoff=6, edge="nan")[:, 0]
+
+        # then
+        valid = ~np.isnan(filtered)
+        np.testing.assert_allclose(filtered[valid], slow[valid], atol=0.02)  # 遅れずに低周波だけが残る
+
+    def test_lowpass_velocity_of_linear_motion(self):
+
+        # given
+        positions = (np.arange(100, dtype=np.float64)[:, None, None] * np.array([1.0, 2.0, -3.0]))
+
+        # when
+        kinematics = calculate_kinematics(positions, fps=50, method="lowpass", cutoff=5, edge="nearest")
+
+        # then
+        np.testing.assert_allclose(kinematics.velocity[:, 0], np.tile([50.0, 100.0, -150.0], (100, 1)))
+        np.testing.assert_allclose(kinematics.jerk, 0, atol=1e-6)
+
+    @pytest.mark.parametrize("edge, expected", [
+        ("nan", [np.nan, 1.0, 2.0, np.nan]),
+        ("bfill", [1.0, 1.0, 2.0, np.nan]),
+        ("nearest", [1.0, 1.0, 2.0, 2.0]),
+    ])
+    def test_edge(self, edge, expected):
+
+        # when
+        actual = moving_average(np.arange(4, dtype=np.float64), window=3, edge=edge)
+
+        # then
+        np.testing.assert_allclose(actual, expected)
+
+    def test_savgol_smoothing_keeps_polynomial(self):
+
+        # given
+        x = np.linspace(-1, 1, 50) ** 2
+
+        # when
+        smoothed = savgol_filter(x, window=7, polyorder=2, edge="nan")
+
+        # then
+        np.testing.assert_allclose(smoothed[3:-3], x[3:-3], atol=1e-12)
+
+    def test_exceeds(self):
+
+        # given
+        positions = np.zeros((40, 2, 3))
+        positions[20:, 1, 0] = 100.0  # 2番目の関節だけが20フレーム目で動く
+
+        # when
+        fast = calculate_kinematics(positions, fps=50).exceeds(speed=100.0)
+
+        # then
+        assert not fast[:, 0].any()
+        assert fast[16:25, 1].all()
@@ -0,0 +1,162 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from src.interface.bvh_reader import BvhReader
+from src.interface.lazy_bvh_reader import LazyBvhReader
+from src.model.skeleton_data import MotionData
+from src.service.windowed_coordinate_data import WindowedCoordinateData
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+class TestLazyBvhReader:
+
+    def test_read_frames(self):
+
+        # given
+        expected = BvhReader(FILE_NAME).bvh_data.motion
+
+        # when
+        with LazyBvhReader(FILE_NAME, persist_index=False) as reader:
+            frames = reader.read_frames(100, 150)
+            all_frames = reader.read_frames(0, reader.n_frames)
+            n_frames = reader.n_frames
+
+        # then
+        assert n_frames == 369
+        np.testing.assert_array_equal(frames, expected[100:150])
+        np.testing.assert_array_equal(all_frames, expected)
+
+    def test_blank_lines_and_crlf(self, tmp_path):
+
+        # given
+        with open(FILE_NAME) as f:
+            data = f.read()
+        file_name = str(tmp_path / "take.bvh")
+        with open(file_name, mode="w", newline="") as f:
+            f.write(data.replace("\n", "\r\n").replace("\r\n0 ", "\r\n\r\n0 ", 3))
+
+        # when
+        with LazyBvhReader(file_name, persist_index=False) as reader:
+            frames = reader.read_frames(0, reader.n_frames)
+
+        # then
+        np.testing.assert_array_equal(frames, BvhReader(FILE_NAME).bvh_data.motion)
+
+    def test_persist_index(self, tmp_path):
+
+        # given
+        file_name = str(tmp_path / "take.bvh")
+        shutil.copyfile(FILE_NAME, file_name)
+        with LazyBvhReader(file_name) as reader:
+            expected = reader.frame_starts
+
+        # when
+        with LazyBvhReader(file_name) as reader:
+            actual = reader.frame_starts
+
+        # then
+        assert os.path.exists(f"{file_name}.frame_index.npz")
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_frame_count_mismatch(self, tmp_path):
+
+        # given
+        with open(FILE_NAME) as f:
+            data = f.read()
+        file_name = str(tmp_path / "take.bvh")
+        with open(file_name, mode="w") as f:
+            f.write("\n".join(data.rstrip().splitlines()[:-1]) + "\n")
+
+        # when, then
+        with pytest.raises(ValueError):
+            LazyBvhReader(file_name, persist_index=False)
+
+
+class TestWindowedCoordinateData:
+
+    def test_frames_match_full_conversion(self):
+
+        # given
+        expected: MotionData = LoadBvhUsecase().load(FILE_NAME)
+
+        # when
+        with LazyBvhReader(FILE_NAME, persist_index=False) as reader:
+            coordinate_data = WindowedCoordinateData(reader=reader, window_size=50)
+            frames = [0, 49, 50, 368, 200, 10]
+            local_pos = [coordinate_data.local_pos[frame] for frame in frames]
+            world_pos = [coordinate_data.world_pos[frame] for frame in frames]
+            pos_min, pos_max = coordinate_data.local_pos_lim()
+
+        # then
+        assert len(coordinate_data.local_pos) == 369
+        for frame, local, world in zip(frames, local_pos, world_pos):
+            np.testing.assert_allclose(local, expected.coordinate_data.local_pos[frame], atol=1e-4)
+            np.testing.assert_allclose(world, expected.coordinate_data.world_pos[frame], atol=1e-4)
+        expected_min, expected_max = expected.coordinate_data.local_pos_lim()
+        np.testing.assert_allclose(pos_min, expected_min, atol=1e-4)
+        np.testing.assert_allclose(pos_max, expected_max, atol=1e-4)
+
+    def test_load_lazy_graph_data(self):
+
+        # given
+        expected: MotionData = LoadBvhUsecase().load(FILE_NAME)
+
+        # when
+        actual: MotionData = LoadBvhUsecase.load_lazy(FILE_NAME, window_size=64, persist_index=False)
+
+        # then
+        np.testing.assert_allclose(actual.graph_data_list[0].data, expected.graph_data_list[0].data, atol=1e-4)
+        for actual_line, expected_line in zip(actual.graph_data_list[1].data, expected.graph_data_list[1].data):
+            np.testing.assert_allclose(actual_line, expected_line, atol=1e-3)
+        np.testing.assert_allclose(actual.graph_data_list[2].data, expected.graph_data_list[2].data, atol=1e-4)
+        actual.coordinate_data.reader.close()
+
+    def test_load_lazy_without_frames(self, tmp_path):
+
+        # given
+        with open(FILE_NAME) as f:
+            lines = f.read().splitlines()
+        motion_start = next(i for i, line in enumerate(lines) if line.startswith("Frame Time:")) + 1
+        file_name = str(tmp_path / "empty.bvh")
+        with open(file_name, mode="w") as f:
+            f.write("\n".join("Frames: 0" if line.startswith("Frames:") else line
+                              for line in lines[:motion_start]) + "\n")
+        progress = []
+
+        # when
+        actual: MotionData = LoadBvhUsecase.load_lazy(file_name, on_progress=progress.append)
+
+        # then
+        assert actual.coordinate_data.n_frames == 0
+        assert [len(graph_data.data) for graph_data in actual.graph_data_list[::2]] == [0, 0]
+        assert (progress[-1].stage, progress[-1].fraction) == ("graph", 1.0)
+        actual.coordinate_data.reader.close()
+
+    def test_load_lazy_closes_reader_on_error(self, monkeypatch):
+
+        # given
+        closed = []
+        original_close = LazyBvhReader.close
+
+        def close(reader):
+            closed.append(reader.file_name)
+            original_close(reader)
+
+        def on_progress(progress):
+            if progress.stage == "graph":
+                raise RuntimeError("failed")
+
+        monkeypatch.setattr(LazyBvhReader, "close", close)
+
+        # when
+        with pytest.raises(RuntimeError):
+            LoadBvhUsecase.load_lazy(FILE_NAME, window_size=64, on_progress=on_progress,
+                                      persist_index=False)
+
+        # then
+        assert closed == [FILE_NAME]
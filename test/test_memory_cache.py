@@ -0,0 +1,93 @@
+import os
+import shutil
+
+from src.model.skeleton_data import MotionData
+from src.repository.coordinate_data_repository import CoordinateDataRepository
+from src.repository.memory_cache import MotionDataMemoryCache, motion_data_nbytes
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+class TestMotionDataMemoryCache:
+
+    @staticmethod
+    def _copy_bvh(tmp_path, names):
+        file_names = []
+        for name in names:
+            file_name = str(tmp_path / name)
+            shutil.copyfile(FILE_NAME, file_name)
+            file_names.append(file_name)
+        return file_names
+
+    def test_hit_without_loading_again(self, tmp_path):
+
+        # given
+        file_name, = self._copy_bvh(tmp_path, ["take.bvh"])
+        usecase = LoadBvhUsecase(memory_cache=MotionDataMemoryCache())
+
+        # when
+        expected = usecase.load(file_name)
+        actual = usecase.load(file_name)
+
+        # then
+        assert actual is expected
+        assert usecase.memory_cache.statistics.hits == 1
+        assert usecase.memory_cache.statistics.misses == 1
+        assert usecase.memory_cache.total_bytes == motion_data_nbytes(expected)
+        assert motion_data_nbytes(expected) >= expected.coordinate_data.local_pos.nbytes * 2
+
+    def test_evict_least_recently_used(self, tmp_path):
+
+        # given
+        file_names = self._copy_bvh(tmp_path, ["a.bvh", "b.bvh", "c.bvh"])
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+        cache = MotionDataMemoryCache(max_bytes=int(motion_data_nbytes(motion_data) * 2.5))
+
+        # when
+        cache.put(file_names[0], motion_data)
+        cache.put(file_names[1], motion_data)
+        cache.get(file_names[0])
+        cache.put(file_names[2], motion_data)
+
+        # then
+        assert file_names[0] in cache
+        assert file_names[1] not in cache
+        assert file_names[2] in cache
+        assert cache.statistics.evictions == 1
+        assert cache.total_bytes <= cache.max_bytes
+
+    def test_invalidate_modified_file(self, tmp_path):
+
+        # given
+        file_name, = self._copy_bvh(tmp_path, ["take.bvh"])
+        cache = MotionDataMemoryCache()
+        cache.put(file_name, LoadBvhUsecase().load(file_name))
+
+        # when
+        stat = os.stat(file_name)
+        os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        # then
+        assert cache.get(file_name) is None
+        assert cache.statistics.invalidations == 1
+        assert len(cache) == 0
+
+    def test_not_count_memory_mapped_arrays(self, tmp_path):
+
+        # given
+        coordinate_data = LoadBvhUsecase().load(FILE_NAME).coordinate_data
+        CoordinateDataRepository.save(coordinate_data, str(tmp_path / "coordinate"))
+
+        # when
+        mapped = motion_data_nbytes(MotionData(
+            skeleton_data=None, coordinate_data=CoordinateDataRepository.load(str(tmp_path / "coordinate"), mmap=True),
+            graph_data_list=[]))
+        loaded = motion_data_nbytes(MotionData(
+            skeleton_data=None, coordinate_data=CoordinateDataRepository.load(str(tmp_path / "coordinate"), mmap=False),
+            graph_data_list=[]))
+
+        # then
+        # ファイルのメモリマップはページキャッシュに載るだけなので数えない
+        assert mapped == 0
+        assert loaded == coordinate_data.world_pos.nbytes + coordinate_data.local_pos.nbytes
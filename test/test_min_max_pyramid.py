@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.service.min_max_pyramid import MinMaxPyramid
+
+
+class TestMinMaxPyramid:
+
+    @pytest.mark.parametrize("n_frames", [1, 2, 3, 1000, 180001])
+    def test_keep_peaks(self, n_frames):
+
+        # given
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=n_frames)
+        values[n_frames // 3] = 100.0  # スパイク
+        values[-1] = -100.0
+        pyramid = MinMaxPyramid(values)
+
+        # when
+        frames, decimated = pyramid.decimate(0, n_frames, max_points=500)
+
+        # then
+        assert len(frames) <= 504
+        assert np.all(np.diff(frames) >= 0)
+        np.testing.assert_array_equal(decimated, values[frames])
+        assert decimated.max() == values.max()
+        assert decimated.min() == values.min()
+        assert frames[np.argmax(decimated)] == np.argmax(values)
+
+    def test_bins_cover_each_pixel(self):
+
+        # given
+        values = np.sin(np.linspace(0, 100, 10000))
+        pyramid = MinMaxPyramid(values)
+
+        # when
+        frames, decimated = pyramid.decimate(2000, 6000, max_points=200)
+
+        # then
+        level = pyramid.level_for(4000, 200)
+        size = 2 ** level
+        for first in range(2000 - 2000 % size, 6000, size):
+            in_bin = (frames >= first) & (frames < first + size)
+            assert decimated[in_bin].max() == values[first:first + size].max()
+            assert decimated[in_bin].min() == values[first:first + size].min()
+
+    def test_small_range_not_decimated(self):
+
+        # given
+        values = np.arange(1000, dtype=np.float64)
+        pyramid = MinMaxPyramid(values)
+
+        # when
+        frames, decimated = pyramid.decimate(100, 150, max_points=500)
+
+        # then
+        np.testing.assert_array_equal(frames, np.arange(100, 150))
+        np.testing.assert_array_equal(decimated, values[100:150])
+
+    def test_nan(self):
+
+        # given
+        values = np.full(1024, np.nan)
+        values[10:500] = np.linspace(0, 1, 490)
+
+        # when
+        frames, decimated = MinMaxPyramid(values).decimate(0, 1024, max_points=64)
+
+        # then
+        assert np.nanmax(decimated) == 1.0
+        assert np.nanmin(decimated) == 0.0
+        assert np.isnan(decimated[-1])  # 全てnanの区間はnanのまま (線が途切れる)
@@ -0,0 +1,184 @@
+import gc
+import os
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.model.skeleton_data import MotionData
+from src.presenter.blit_manager import BlitManager
+from src.presenter.motion_figure import MotionFigure
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+def resident_bytes():
+    """プロセスの現在の物理メモリ使用量 (RSS)。/proc/self/statm が無い環境では None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def write_truncated_bvh(file_name: str, n_frames: int):
+    """テスト用のbvhファイルのフレームをn_framesフレームにしたファイルを作成する (足りない場合は先頭から繰り返す)"""
+    with open(FILE_NAME) as f:
+        lines = f.read().splitlines()
+    motion_start = next(i for i, line in enumerate(lines) if line.startswith("Frame Time:")) + 1
+    frame_lines = [line for line in lines[motion_start:] if line.strip()]
+    lines = [f"Frames: {n_frames}" if line.startswith("Frames:") else line for line in lines[:motion_start]] \
+        + [frame_lines[i % len(frame_lines)] for i in range(n_frames)]
+    with open(file_name, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def count_figures() -> int:
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+class TestMotionFigure:
+
+    def test_set_data_in_place(self):
+
+        # given
+        motion_figure = MotionFigure()
+        FigureCanvasAgg(motion_figure.figure)
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+        motion_figure.set_data(motion_data)
+        motion_figure.figure.canvas.draw()
+        collection = motion_figure.coordinate_drawer.bone_collection
+        lines = [list(ax.lines) for ax in motion_figure.graph_ax_list]
+
+        # when
+        motion_figure.draw_at_specific_frame(frame=100)
+        motion_figure.set_data(motion_data)
+
+        # then
+        assert motion_figure.coordinate_drawer.bone_collection is collection
+        assert [list(ax.lines) for ax in motion_figure.graph_ax_list] == lines
+        assert motion_figure.coordinate_drawer.current_frame == 0
+        assert motion_figure.coordinate_drawer.frame_text.get_text() == "frame: 0"
+
+    def test_preview_without_graph_data(self):
+
+        # given
+        motion_figure = MotionFigure()
+        FigureCanvasAgg(motion_figure.figure)
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+
+        # when
+        motion_figure.set_data(MotionData(skeleton_data=None, coordinate_data=motion_data.coordinate_data,
+                                          graph_data_list=[]))
+        hidden = [ax.get_visible() for ax in motion_figure.graph_ax_list]
+        motion_figure.set_data(motion_data)
+
+        # then
+        assert hidden == [False, False, False]
+        assert [ax.get_visible() for ax in motion_figure.graph_ax_list] == [True, True, True]
+        assert len(motion_figure.animated_artists) == 2 + 3 * 2  # スティックピクチャ + グラフごとの選択範囲とカーソル
+
+    def test_more_graphs_than_axes(self):
+
+        # given
+        motion_figure = MotionFigure()
+        FigureCanvasAgg(motion_figure.figure)
+        motion_data = LoadBvhUsecase().load(FILE_NAME)
+        many_graphs = MotionData(skeleton_data=None, coordinate_data=motion_data.coordinate_data,
+                                 graph_data_list=motion_data.graph_data_list + motion_data.graph_data_list[:2])
+
+        # when
+        motion_figure.set_data(many_graphs)
+        motion_figure.figure.canvas.draw()
+        titles = [ax.get_title() for ax in motion_figure.visible_graph_axes]
+        tops = [ax.get_position().y1 for ax in motion_figure.graph_ax_list]
+        motion_figure.set_data(motion_data)
+        motion_figure.figure.canvas.draw()
+
+        # then
+        assert titles == [graph_data.display_name for graph_data in many_graphs.graph_data_list]
+        assert tops == sorted(tops, reverse=True)
+        assert len(motion_figure.graph_ax_list) == 3
+        assert len(motion_figure.figure.axes) == 1 + 3
+        assert [ax.get_title() for ax in motion_figure.visible_graph_axes] == \
+            [graph_data.display_name for graph_data in motion_data.graph_data_list]
+
+    def test_set_data_without_frames(self, tmp_path):
+
+        # given
+        file_name = str(tmp_path / "empty.bvh")
+        write_truncated_bvh(file_name, 0)
+        motion_figure = MotionFigure()
+        FigureCanvasAgg(motion_figure.figure)
+        blit_manager = BlitManager(motion_figure.figure.canvas)
+        lazy_motion_data = LoadBvhUsecase.load_lazy(file_name)
+
+        # when
+        for motion_data in [LoadBvhUsecase().load(file_name), lazy_motion_data,
+                            LoadBvhUsecase().load(FILE_NAME), LoadBvhUsecase().load(file_name)]:
+            motion_figure.set_data(motion_data)
+            blit_manager.set_artists(motion_figure.animated_artists)
+            motion_figure.figure.canvas.draw()
+            blit_manager.update()
+
+        # then
+        assert len(motion_figure.coordinate_drawer.calc_segments(0)) == 0
+        assert motion_figure.coordinate_drawer.local_pos_min.tolist() == [-1] * 3
+        assert motion_figure.coordinate_drawer.local_pos_max.tolist() == [1] * 3
+        assert [(drawer.y_min, drawer.y_max) for drawer in motion_figure.graph_drawer_list] == [(0, 1)] * 3
+        lazy_motion_data.coordinate_data.reader.close()
+
+    def test_open_many_files(self, tmp_path):
+
+        # given
+        file_names = []
+        for i, n_frames in enumerate([300, 500, 800, 1200]):
+            file_name = os.path.join(tmp_path, f"take_{i}.bvh")
+            write_truncated_bvh(file_name, n_frames)
+            file_names.append(file_name)
+        usecase = LoadBvhUsecase()
+        motion_figure = MotionFigure()
+        FigureCanvasAgg(motion_figure.figure)
+        blit_manager = BlitManager(motion_figure.figure.canvas)
+        figure_nums = plt.get_fignums()
+
+        def open_file(file_name: str):
+            motion_figure.set_data(usecase.load(file_name))
+            blit_manager.set_artists(motion_figure.animated_artists)
+            motion_figure.figure.canvas.draw()
+            for frame in range(0, 300, 30):
+                motion_figure.draw_at_specific_frame(frame=frame)
+                blit_manager.update()
+
+        # 1周目で表示に必要なものを作成しておく
+        for file_name in file_names:
+            open_file(file_name)
+        figures = count_figures()
+        tracemalloc.start()
+        gc.collect()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        resident_before = resident_bytes()
+
+        # when
+        for _ in range(5):
+            for file_name in file_names:
+                open_file(file_name)
+        gc.collect()
+        memory_after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resident_after = resident_bytes()
+
+        # then
+        assert plt.get_fignums() == figure_nums
+        assert count_figures() == figures
+        # 同じファイルを開いている状態なので、メモリ使用量はほとんど増えない
+        assert memory_after - memory_before < 2 * 1024 ** 2
+        # Aggの描画バッファなどtracemallocで追跡されない確保も含め、プロセス全体でも増えない
+        if resident_before is not None:
+            assert resident_after - resident_before < 16 * 1024 ** 2
@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.presenter.orbit_camera import OrbitCamera, MAX_ELEVATION
+
+
+class TestOrbitCamera:
+
+    def test_project_front_view(self):
+
+        # given
+        camera = OrbitCamera(center=np.zeros(3), radius=1.0, azimuth=0.0, elevation=0.0)
+        points = np.array([[0.0, 0.0, 0.0],
+                           [1.0, 0.0, 0.0],
+                           [0.0, 1.0, 0.0],
+                           [0.0, 0.0, 1.0]])
+
+        # when
+        screen = camera.project(points, width=200, height=100)
+
+        # then
+        np.testing.assert_allclose(screen, [[100, 50], [150, 50], [100, 0], [100, 50]], atol=1e-9)
+
+    def test_same_as_rotation_of_each_point(self):
+
+        # given
+        camera = OrbitCamera.fit(pos_min=[-1.0, 0.0, -1.0], pos_max=[1.0, 2.0, 1.0], azimuth=30.0, elevation=15.0)
+        camera.zoom_by(1.5)
+        points = np.random.default_rng(0).normal(size=(27, 3))
+
+        # when
+        screen = camera.project(points, width=640, height=480)
+
+        # then
+        rotated = (points - camera.center) @ camera.rotation().T
+        scale = camera.zoom * 480 / (2 * camera.radius)
+        expected = np.c_[320 + scale * rotated[:, 0], 240 - scale * rotated[:, 1]]
+        np.testing.assert_allclose(screen, expected)
+
+    def test_orbit_limits_elevation(self):
+
+        # given
+        camera = OrbitCamera(center=np.zeros(3), radius=1.0, azimuth=350.0, elevation=80.0)
+
+        # when
+        camera.orbit(d_azimuth=20.0, d_elevation=30.0)
+
+        # then
+        assert camera.azimuth == 10.0
+        assert camera.elevation == MAX_ELEVATION
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from src.interface.parser import Bvh
+
+
+class TestBvh:
+
+    @staticmethod
+    def _read_test_bvh() -> str:
+        with open("test/data/MCPM_20230410_150228.BVH") as f:
+            return f.read()
+
+    def test_motion(self):
+
+        # given
+        data = self._read_test_bvh()
+        frame_lines = data.split("Frame Time:")[1].strip().splitlines()[1:]
+        expected = np.array([line.split() for line in frame_lines]).astype('float32')
+
+        # when
+        bvh = Bvh(data)
+
+        # then
+        assert bvh.motion.dtype == np.float32
+        assert bvh.motion.shape == (bvh.nframes, 162)
+        np.testing.assert_array_equal(bvh.motion, expected)
+        assert bvh.frames is bvh.motion
+        assert bvh.frame_time == pytest.approx(0.02)
+        assert len(bvh.get_joints_names()) == 27
+
+    def test_crlf(self):
+
+        # given
+        data = self._read_test_bvh()
+
+        # when
+        bvh = Bvh(data.replace("\n", "\r\n"))
+
+        # then
+        np.testing.assert_array_equal(bvh.motion, Bvh(data).motion)
+
+    def test_malformed_motion(self):
+
+        # given
+        data = self._read_test_bvh() + "1 2 3\n"
+
+        # when, then
+        with pytest.raises(ValueError):
+            Bvh(data)
+
+    def test_frame_count_mismatch(self):
+
+        # given
+        data = self._read_test_bvh()
+        frame_lines = data.rstrip().splitlines()
+        missing_frame = "\n".join(frame_lines[:-1]) + "\n"
+        # 1フレーム分の値の数だけずれても、Frames: の値と合わなければエラーにする
+        extra_frame = data.rstrip() + "\n" + frame_lines[-1] + "\n"
+
+        # when, then
+        for malformed in (missing_frame, extra_frame):
+            with pytest.raises(ValueError):
+                Bvh(malformed)
+
+    def test_joint_tables(self):
+
+        # given
+        bvh = Bvh(self._read_test_bvh())
+        names = bvh.get_joints_names()
+
+        # when
+        parent_names = [bvh.joint_parent(name) for name in names]
+
+        # then
+        assert parent_names[0] is None
+        for name, parent, parent_index in zip(names, parent_names, bvh.parent_indices):
+            if parent is not None:
+                assert parent.name == names[parent_index]
+                assert bvh.get_joint(name) in bvh.joint_direct_children(parent.name)
+        assert bvh.get_joint_channels_index("torso_1") == 6
+        assert bvh.get_joint_channel_index("torso_1", "Xrotation") == 4
+        assert bvh.get_joint_channel_index("torso_1", "Wrotation") == -1
+        with pytest.raises(LookupError):
+            bvh.get_joint("not_a_joint")
+
+    def test_frames_joint_channels(self):
+
+        # given
+        bvh = Bvh(self._read_test_bvh())
+        channels = ["Xrotation", "Yrotation", "Wrotation"]
+
+        # when
+        values = bvh.frames_joint_channels("l_low_leg", channels, value=0.0)
+
+        # then
+        assert values.shape == (bvh.nframes, 3)
+        for frame_index in [0, 100, bvh.nframes - 1]:
+            assert values[frame_index].tolist() == bvh.frame_joint_channels(frame_index, "l_low_leg", channels,
+                                                                             value=0.0)
@@ -0,0 +1,92 @@
+import pytest
+
+from src.service.playback_clock import PlaybackClock
+
+
+class TestPlaybackClock:
+
+    def test_frame_follows_wall_clock(self):
+
+        # given
+        clock = PlaybackClock(fps=30, n_frames=300)
+
+        # when
+        clock.start(frame=10, now=100.0)
+
+        # then
+        assert clock.frame_at(100.0) == 10
+        assert clock.frame_at(101.0) == 40
+        assert clock.frame_at(101.02) == 40
+
+    def test_speed(self):
+
+        # given
+        clock = PlaybackClock(fps=30, n_frames=300)
+        clock.start(frame=0, now=0.0)
+
+        # when
+        clock.set_speed(0.25, now=1.0)
+
+        # then
+        assert clock.frame_at(1.0) == 30
+        assert clock.frame_at(2.0) == 37
+        assert clock.statistics.target_fps == 7.5
+        with pytest.raises(ValueError):
+            clock.set_speed(8)
+
+    def test_repeat_from_loop_start(self):
+
+        # given
+        clock = PlaybackClock(fps=10, n_frames=100)
+
+        # when
+        clock.start(frame=90, now=0.0)
+        frame_after_end = clock.frame_at(1.5)
+        clock.set_loop_range(20, 30, now=1.5)
+        frames_in_range = [clock.frame_at(1.55 + t / 10) for t in range(12)]
+
+        # then
+        assert frame_after_end == 5
+        assert frames_in_range == [20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 20, 21]
+
+    def test_drop_frames_when_rendering_is_slow(self):
+
+        # given
+        clock = PlaybackClock(fps=100, n_frames=1000)
+        clock.start(frame=0, now=0.0)
+
+        # when
+        frames = []
+        now = 0.0
+        for _ in range(5):
+            frame = clock.tick(now)
+            frames.append(frame)
+            clock.record_render(now, now + 0.05)
+            now += 0.05
+
+        # then
+        assert frames[0] == 0
+        assert all(later > earlier for earlier, later in zip(frames, frames[1:]))
+        assert clock.statistics.dropped_frames == frames[-1] - frames[0] - (len(frames) - 1)
+        assert clock.statistics.achieved_fps == pytest.approx(20)
+        assert clock.delay_until_next_frame(now) == 0.0
+
+    def test_wait_when_rendering_is_fast(self):
+
+        # given
+        clock = PlaybackClock(fps=10, n_frames=100)
+        clock.start(frame=0, now=0.0)
+
+        # when
+        first_frame = clock.tick(0.0)
+        clock.record_render(0.0, 0.01)
+        repeated_frame = clock.tick(0.02)
+        delay = clock.delay_until_next_frame(0.02)
+
+        # then
+        assert first_frame == 0
+        assert repeated_frame is None
+        assert delay == pytest.approx(0.07)
+        assert clock.tick(0.02 + delay) == 1
+        assert clock.statistics.dropped_frames == 0
+        assert clock.statistics.held_frames == 1
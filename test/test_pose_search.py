@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+import src.service.pose_search as pose_search
+from src.repository.pose_index_repository import PoseIndexRepository
+from src.service.pose_search import PoseIndex, PosePca, pose_features
+
+
+def brute_force(index: PoseIndex, query_features: np.ndarray) -> np.ndarray:
+    query = index.pca.transform(query_features[None])[0]
+    return np.linalg.norm(index.embeddings.astype(np.float64) - query, axis=1)
+
+
+class TestPoseFeatures:
+
+    def test_invariant_to_root_position_and_scale(self):
+
+        # given
+        positions = np.random.default_rng(0).normal(size=(5, 4, 3))
+        moved = positions * 1.7 + np.array([10.0, 0.0, -3.0])
+
+        # when
+        features = pose_features(positions)
+        moved_features = pose_features(moved)
+        unnormalized = pose_features(moved, normalize_scale=False)
+
+        # then
+        assert features.shape == (5, 9) and features.dtype == np.float32
+        np.testing.assert_allclose(features, moved_features, atol=1e-5)
+        np.testing.assert_allclose(unnormalized, (moved[:, 1:] - moved[:, :1]).reshape(5, -1), rtol=1e-5)
+        np.testing.assert_allclose(np.sqrt(np.mean(features.reshape(5, 3, 3) ** 2, axis=(1, 2)) * 3), 1.0,
+                                   rtol=1e-5)
+
+
+class TestPoseIndex:
+
+    @pytest.fixture
+    def index_and_features(self, monkeypatch):
+        # ブロックの境界をまたぐようにブロックを小さくする
+        monkeypatch.setattr(pose_search, "SEARCH_BLOCK_SIZE", 64)
+        rng = np.random.default_rng(1)
+        features_list = [rng.normal(size=(n_frames, 30)).astype(np.float32) for n_frames in (150, 1, 300)]
+        return PoseIndex.build(features_list, ["a", "b", "c"], n_components=8), features_list
+
+    def test_same_as_brute_force(self, index_and_features):
+
+        # given
+        index, features_list = index_and_features
+        query_features = features_list[2][42]
+
+        # when
+        matches = index.search(query_features, k=10)
+
+        # then
+        distances = brute_force(index, query_features)
+        expected = np.argsort(distances, kind="stable")[:10]
+        rows = [index.take_range(match.take)[0] + match.frame for match in matches]
+        assert rows == expected.tolist()
+        np.testing.assert_allclose([match.distance for match in matches], distances[expected], atol=1e-3)
+        assert (matches[0].take, matches[0].frame) == ("c", 42)
+
+    def test_take_and_exclusion(self, index_and_features):
+
+        # given
+        index, features_list = index_and_features
+        query_features = features_list[0][20]
+
+        # when
+        within = index.search(query_features, k=5, take="a", exclude_take="a", exclude_frame=20, exclude_radius=3)
+        separated = index.search(query_features, k=5, min_separation=30)
+
+        # then
+        assert len(within) == 5
+        assert all(match.take == "a" and abs(match.frame - 20) > 3 for match in within)
+        assert len(separated) == 5
+        for i, match in enumerate(separated):
+            for other in separated[:i]:
+                assert match.take != other.take or abs(match.frame - other.frame) >= 30
+        distances = [match.distance for match in separated]
+        assert distances == sorted(distances)
+
+    def test_fewer_frames_than_k(self, index_and_features):
+
+        # given
+        index, features_list = index_and_features
+
+        # when
+        matches = index.search(features_list[1][0], k=5, take="b", exclude_take="b", exclude_frame=0)
+
+        # then
+        assert matches == []
+
+    def test_pca_keeps_main_axes(self):
+
+        # given
+        rng = np.random.default_rng(2)
+        features = np.zeros((1000, 6))
+        features[:, 0] = rng.normal(scale=10, size=1000)
+        features[:, 3] = rng.normal(scale=5, size=1000)
+        features += rng.normal(scale=0.01, size=features.shape)
+
+        # when
+        pca = PosePca.fit(features, n_components=2, sample_size=500)
+
+        # then
+        assert pca.components.shape == (6, 2)
+        np.testing.assert_allclose(np.abs(pca.components[[0, 3]]), np.eye(2), atol=1e-2)
+
+
+class TestPoseIndexRepository:
+
+    def test_save_load(self, tmp_path):
+
+        # given
+        features = np.random.default_rng(3).normal(size=(100, 12)).astype(np.float32)
+        index = PoseIndex.build([features[:40], features[40:]], ["x", "y"], n_components=4)
+
+        # when
+        PoseIndexRepository.save(index, str(tmp_path / "index"), {"normalize_scale": False})
+        loaded = PoseIndexRepository.load(str(tmp_path / "index"))
+
+        # then
+        assert loaded.take_names == ["x", "y"]
+        assert isinstance(loaded.embeddings, np.memmap)
+        assert PoseIndexRepository.load_metadata(str(tmp_path / "index"))["normalize_scale"] is False
+        loaded_matches, matches = loaded.search(features[70], k=3), index.search(features[70], k=3)
+        assert [(m.take, m.frame) for m in loaded_matches] == [(m.take, m.frame) for m in matches]
+        assert [m.distance for m in loaded_matches] == pytest.approx([m.distance for m in matches], abs=1e-5)
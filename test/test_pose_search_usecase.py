@@ -0,0 +1,106 @@
+import os
+import shutil
+
+import pytest
+
+from src.interface.bvh_reader import BvhReader
+from src.interface.lazy_bvh_reader import LazyBvhReader
+from src.model.skeleton_data import CoordinateData
+from src.service.coordinate_data_converter import CoordinateDataConverter
+from src.service.windowed_coordinate_data import WindowedCoordinateData
+from src.usecase.pose_search_usecase import PoseSearchUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+class TestPoseSearchUsecase:
+
+    def test_search_within_take(self):
+
+        # given
+        skeleton_data = BvhReader(FILE_NAME).create_skeleton_data()
+        coordinate_data = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+        usecase = PoseSearchUsecase()
+        index = usecase.index_motion(coordinate_data, "take")
+
+        # when
+        matches = usecase.search_frame(index, coordinate_data, 100, take_name="take", k=5)
+        including_self = usecase.search_frame(index, coordinate_data, 100, k=1)
+
+        # then
+        assert index.n_frames == 369
+        assert len(matches) == 5
+        assert all(abs(match.frame - 100) > coordinate_data.fps // 2 for match in matches)
+        assert including_self[0].frame == 100 and including_self[0].distance < 1e-5
+
+    def test_windowed_same_as_full(self):
+
+        # given
+        skeleton_data = BvhReader(FILE_NAME).create_skeleton_data()
+        coordinate_data = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+        usecase = PoseSearchUsecase()
+
+        progress = []
+
+        # when
+        with LazyBvhReader(FILE_NAME, persist_index=False) as reader:
+            windowed_features = usecase.features_of(WindowedCoordinateData(reader=reader, window_size=100),
+                                                    on_progress=progress.append)
+
+        # then
+        assert windowed_features.shape == usecase.features_of(coordinate_data).shape
+        assert abs(windowed_features - usecase.features_of(coordinate_data)).max() < 1e-5
+        assert progress == sorted(progress) and progress[-1] == 1.0
+
+    def test_build_and_load_library(self, tmp_path):
+
+        # given
+        input_dir = tmp_path / "data"
+        os.makedirs(input_dir / "day2")
+        shutil.copyfile(FILE_NAME, input_dir / "take_1.BVH")
+        shutil.copyfile(FILE_NAME, input_dir / "day2" / "take_2.bvh")
+        with open(input_dir / "broken.bvh", mode="w") as f:
+            f.write("HIERARCHY\nROOT root\n{\n")
+        index_dir = str(tmp_path / "index")
+        skeleton_data = BvhReader(FILE_NAME).create_skeleton_data()
+        coordinate_data = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+
+        # when
+        PoseSearchUsecase(n_components=8, normalize_scale=False, workers=2).build_library(str(input_dir), index_dir)
+        usecase, index = PoseSearchUsecase.load_library(index_dir)
+        take_1 = os.path.abspath(str(input_dir / "take_1.BVH"))
+        matches = usecase.search_frame(index, coordinate_data, 200, take_name=take_1, k=3)
+
+        # then
+        assert [os.path.basename(name) for name in index.take_names] == ["take_2.bvh", "take_1.BVH"]
+        assert index.n_frames == 2 * 369
+        assert usecase.n_components == 8 and usecase.normalize_scale is False
+        assert usecase.n_joints == len(coordinate_data.joint_names)
+        # 同じ内容の別のファイルの同じフレームが最も近い
+        assert (os.path.basename(matches[0].take), matches[0].frame) == ("take_2.bvh", 200)
+        assert matches[0].distance < 1e-3
+
+    def test_library_with_other_joints(self, tmp_path):
+
+        # given
+        input_dir = tmp_path / "data"
+        os.makedirs(input_dir)
+        shutil.copyfile(FILE_NAME, input_dir / "take.bvh")
+        index_dir = str(tmp_path / "index")
+        skeleton_data = BvhReader(FILE_NAME).create_skeleton_data()
+        coordinate_data = CoordinateDataConverter().convert_to_coordinate_data(skeleton_data=skeleton_data)
+        # 末端の関節を1つ除いたモーション
+        other_data = CoordinateData(world_pos=coordinate_data.world_pos[:, :-1],
+                                    local_pos=coordinate_data.local_pos[:, :-1],
+                                    joints_hierarchy=coordinate_data.joints_hierarchy,
+                                    joint_names=coordinate_data.joint_names[:-1], fps=coordinate_data.fps)
+        PoseSearchUsecase(n_components=8, workers=1).build_library(str(input_dir), index_dir)
+
+        # when
+        usecase, index = PoseSearchUsecase.load_library(index_dir)
+
+        # then
+        assert usecase.accepts(coordinate_data)
+        assert not usecase.accepts(other_data)
+        with pytest.raises(ValueError, match="joint count"):
+            usecase.search_frame(index, other_data, 100)
@@ -0,0 +1,66 @@
+import os
+import shutil
+
+from src.repository.memory_cache import MotionDataMemoryCache
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+from src.usecase.prefetch_bvh_usecase import PrefetchBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+class TestPrefetchBvhUsecase:
+
+    @staticmethod
+    def _copy_bvh(tmp_path, names):
+        file_names = []
+        for name in names:
+            file_name = str(tmp_path / name)
+            shutil.copyfile(FILE_NAME, file_name)
+            file_names.append(file_name)
+        return file_names
+
+    def test_find_sibling_files(self, tmp_path):
+
+        # given
+        file_names = self._copy_bvh(tmp_path, ["take_1.bvh", "take_2.bvh", "take_3.bvh", "take_4.bvh"])
+        (tmp_path / "notes.txt").write_text("not a bvh file")
+
+        # when
+        siblings = PrefetchBvhUsecase.find_sibling_files(file_names[1], neighbours=2)
+
+        # then
+        assert siblings == [file_names[2], file_names[0], file_names[3]]
+
+    def test_prefetch_neighbours(self, tmp_path):
+
+        # given
+        file_names = self._copy_bvh(tmp_path, ["take_1.bvh", "take_2.bvh", "take_3.bvh", "take_4.bvh"])
+        load_bvh_usecase = LoadBvhUsecase(memory_cache=MotionDataMemoryCache())
+        load_bvh_usecase.load(file_names[1])
+        prefetcher = PrefetchBvhUsecase(load_bvh_usecase, delay=0)
+
+        # when
+        prefetcher.start(file_names[1])
+        prefetcher.join(timeout=60)
+
+        # then
+        assert prefetcher.prefetched == [file_names[2], file_names[0]]
+        assert load_bvh_usecase.memory_cache.statistics.misses == 3
+        load_bvh_usecase.load(file_names[2])
+        assert load_bvh_usecase.memory_cache.statistics.hits == 1
+
+    def test_cancel(self, tmp_path):
+
+        # given
+        file_names = self._copy_bvh(tmp_path, ["take_1.bvh", "take_2.bvh"])
+        load_bvh_usecase = LoadBvhUsecase(memory_cache=MotionDataMemoryCache())
+        prefetcher = PrefetchBvhUsecase(load_bvh_usecase, delay=10)
+
+        # when
+        prefetcher.start(file_names[0])
+        prefetcher.cancel()
+        prefetcher.join(timeout=10)
+
+        # then
+        assert prefetcher.prefetched == []
+        assert os.path.abspath(file_names[1]) not in load_bvh_usecase.memory_cache
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from src.model.skeleton_data import MultiPlotGraphData
+from src.service.range_statistics import RangeQueryIndex, GraphDataStatistics, BLOCK_SIZE
+
+
+class TestRangeQueryIndex:
+
+    @pytest.mark.parametrize("n_frames", [1, BLOCK_SIZE - 1, BLOCK_SIZE, 3 * BLOCK_SIZE + 5, 2000])
+    def test_same_as_numpy(self, n_frames):
+
+        # given
+        rng = np.random.default_rng(n_frames)
+        values = np.round(rng.normal(size=n_frames), 1)  # 同じ値が現れるように丸める
+        values[rng.integers(0, n_frames, n_frames // 10)] = np.nan
+        index = RangeQueryIndex(values)
+        ranges = [(0, n_frames)] + [tuple(sorted(rng.integers(0, n_frames + 1, 2))) for _ in range(300)]
+
+        for start, stop in ranges:
+            # when
+            statistics = index.query(start, stop)
+
+            # then
+            segment = values[start:stop]
+            assert statistics.count == np.count_nonzero(~np.isnan(segment))
+            if statistics.count == 0:
+                assert statistics.argmin is None and np.isnan(statistics.mean)
+                continue
+            assert statistics.mean == pytest.approx(np.nanmean(segment))
+            assert statistics.std == pytest.approx(np.nanstd(segment), abs=1e-6)
+            assert statistics.argmin == start + np.nanargmin(segment)
+            assert statistics.argmax == start + np.nanargmax(segment)
+            assert statistics.min == np.nanmin(segment) and statistics.max == np.nanmax(segment)
+
+    def test_clip_range(self):
+
+        # given
+        index = RangeQueryIndex(np.arange(10, dtype=np.float64))
+
+        # when
+        statistics = index.query(-5, 100)
+
+        # then
+        assert (statistics.start, statistics.stop, statistics.count) == (0, 10, 10)
+        assert (statistics.argmin, statistics.argmax) == (0, 9)
+
+    def test_precision_with_offset(self):
+
+        # given
+        values = 1e6 + np.sin(np.arange(100000))
+
+        # when
+        statistics = RangeQueryIndex(values).query(50000, 50100)
+
+        # then
+        assert statistics.mean == pytest.approx(values[50000:50100].mean(), abs=1e-9)
+        assert statistics.std == pytest.approx(values[50000:50100].std(), rel=1e-6)
+
+
+class TestGraphDataStatistics:
+
+    def test_multi_plot(self):
+
+        # given
+        graph_data = MultiPlotGraphData(data=[np.arange(100.0), -np.arange(100.0)], display_name="lines",
+                                        graph_key="lines", legends=["a", "b"])
+
+        # when
+        statistics = GraphDataStatistics(graph_data).query(10, 20)
+
+        # then
+        assert [s.max for s in statistics] == [19.0, -10.0]
+        assert GraphDataStatistics(graph_data).legends == ["a", "b"]
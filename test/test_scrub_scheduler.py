@@ -0,0 +1,94 @@
+from src.presenter.scrub_scheduler import ScrubScheduler
+
+
+class FakeWidget:
+    """after_idle / afterで登録された処理を手動で実行するためのウィジェット"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after_idle(self, func):
+        self.jobs.append((0, func))
+        return len(self.jobs)
+
+    def after(self, ms, func):
+        self.jobs.append((ms, func))
+        return len(self.jobs)
+
+    def after_cancel(self, job):
+        self.jobs[job - 1] = (None, None)
+
+    def run(self):
+        jobs, self.jobs = self.jobs, []
+        for ms, func in jobs:
+            if func is not None:
+                func()
+        return [ms for ms, func in jobs if func is not None]
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScrubScheduler:
+
+    def test_render_latest_frame_only(self):
+
+        # given
+        widget = FakeWidget()
+        clock = FakeClock()
+        rendered = []
+        scheduler = ScrubScheduler(widget, rendered.append, min_interval=0.02, clock=clock)
+
+        # when
+        for frame in range(10):
+            scheduler.request(frame)
+            clock.now += 0.001
+        widget.run()
+
+        # then
+        assert rendered == [9]
+        assert scheduler.statistics.requests == 10
+        assert scheduler.statistics.dropped == 9
+        assert scheduler.statistics.last_latency == clock.now
+
+    def test_render_at_most_once_per_interval(self):
+
+        # given
+        widget = FakeWidget()
+        clock = FakeClock()
+        rendered = []
+        scheduler = ScrubScheduler(widget, rendered.append, min_interval=0.02, clock=clock)
+        scheduler.request(1)
+        widget.run()
+
+        # when
+        clock.now += 0.005
+        scheduler.request(2)
+        scheduler.request(3)
+        delays = widget.run()
+
+        # then
+        assert rendered == [1, 3]
+        assert delays == [15]
+
+    def test_cancel(self):
+
+        # given
+        widget = FakeWidget()
+        rendered = []
+        scheduler = ScrubScheduler(widget, rendered.append, clock=FakeClock())
+        scheduler.request(5)
+
+        # when
+        scheduler.cancel()
+        widget.run()
+
+        # then
+        assert rendered == []
+        assert scheduler.pending_frame is None
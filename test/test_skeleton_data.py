@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.model.skeleton_data import CoordinateData
+
+
+class TestCoordinateData:
+
+    @staticmethod
+    def _load_coordinate_data() -> CoordinateData:
+        with open("test/data/MCPM_20230410_150228_coordinate.json") as f:
+            return CoordinateData.from_json(json.load(f))
+
+    def test_columnar_arrays(self):
+
+        # given, when
+        coordinate_data = self._load_coordinate_data()
+
+        # then
+        assert coordinate_data.local_pos.shape == (369, 27, 3)
+        assert coordinate_data.world_pos.dtype == np.float32
+        assert coordinate_data.world_pos.flags.c_contiguous
+        assert coordinate_data.n_frames == 369
+        assert coordinate_data.joint_index["root"] == 0
+        assert coordinate_data.parent_indices[0] == -1
+        torso_1 = coordinate_data.joint_index["torso_1"]
+        assert coordinate_data.parent_indices[torso_1] == 0
+        assert not hasattr(coordinate_data, "__dict__")
+
+    def test_pos_list_view(self):
+
+        # given
+        coordinate_data = self._load_coordinate_data()
+
+        # when
+        local_pos_list = coordinate_data.local_pos_list
+
+        # then
+        assert len(local_pos_list) == 369
+        assert list(local_pos_list[10].keys()) == coordinate_data.joint_names
+        head = coordinate_data.joint_index["head"]
+        np.testing.assert_array_equal(local_pos_list[10]["head"], coordinate_data.local_pos[10, head])
+        assert len(local_pos_list[5:15]) == 10
+        with pytest.raises(ValueError):
+            local_pos_list[10]["head"][0] = 0
+
+    def test_json_round_trip(self):
+
+        # given
+        coordinate_data = self._load_coordinate_data()
+
+        # when
+        restored = CoordinateData.from_json(coordinate_data.to_json())
+
+        # then
+        np.testing.assert_array_equal(restored.world_pos, coordinate_data.world_pos)
+        np.testing.assert_array_equal(restored.local_pos, coordinate_data.local_pos)
+        assert restored.joints_hierarchy == coordinate_data.joints_hierarchy
+        assert restored.fps == coordinate_data.fps
@@ -0,0 +1,92 @@
+import os
+import shutil
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.interface.bvh_reader import BvhReader
+from src.model.skeleton_data import CoordinateData, GraphData
+from src.service.calculate_graph_data import CalculateGraphData
+from src.service.coordinate_data_converter import CoordinateDataConverter
+from src.service.graph_metrics import GraphMetric, GraphMetricRegistry
+from src.service.streaming_graph_data import GraphMetricCalculator, StreamingGraphDataCalculator, \
+    calculate_graph_data_by_chunks
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+FILE_NAME = "test/data/MCPM_20230410_150228.BVH"
+
+
+class TestStreamingGraphData:
+
+    @staticmethod
+    def _assert_graph_data_equal(actual_list: List[GraphData], expected_list: List[GraphData]):
+        assert [x.graph_key for x in actual_list] == [x.graph_key for x in expected_list]
+        for actual, expected in zip(actual_list, expected_list):
+            actual_lines = actual.data if isinstance(actual.data, list) else [actual.data]
+            expected_lines = expected.data if isinstance(expected.data, list) else [expected.data]
+            for actual_line, expected_line in zip(actual_lines, expected_lines):
+                assert len(actual_line) == len(expected_line)
+                np.testing.assert_allclose(actual_line, expected_line, rtol=1e-9, atol=1e-12)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 10, 64, 369, 1000])
+    def test_same_as_batch(self, chunk_size):
+
+        # given
+        reader = BvhReader(FILE_NAME)
+        converter = CoordinateDataConverter()
+        coordinate_data: CoordinateData = converter.convert_to_coordinate_data(reader.create_skeleton_data())
+        expected = CalculateGraphData.calculate_default_graph_data(coordinate_data=coordinate_data)
+
+        # when
+        actual = calculate_graph_data_by_chunks(converter.iter_convert(reader.iter_skeleton_data(chunk_size)))
+
+        # then
+        self._assert_graph_data_equal(actual, expected)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 369])
+    def test_registered_metric(self, chunk_size):
+
+        # given
+        reader = BvhReader(FILE_NAME)
+        converter = CoordinateDataConverter()
+        coordinate_data: CoordinateData = converter.convert_to_coordinate_data(reader.create_skeleton_data())
+        metric = GraphMetric(graph_key="hand_speed", display_name="Hand speed [cm/s]",
+                             calculate=lambda context: [np.linalg.norm(context.velocity(name, window=6), axis=1)
+                                                        for name in ["l_hand", "r_hand"]],
+                             joints=("l_hand", "r_hand"), legends=["left", "right"], context_frames=6)
+        expected = GraphMetricRegistry([metric]).evaluate(coordinate_data)
+
+        # when
+        actual = calculate_graph_data_by_chunks(converter.iter_convert(reader.iter_skeleton_data(chunk_size)),
+                                                calculators=[GraphMetricCalculator(metric)])
+
+        # then
+        self._assert_graph_data_equal(actual, expected)
+        assert actual[0].legends == ["left", "right"]
+
+    def test_stream_graph_data(self, tmp_path):
+
+        # given
+        file_name = str(tmp_path / "take.bvh")
+        shutil.copyfile(FILE_NAME, file_name)
+        expected = LoadBvhUsecase().load(file_name).graph_data_list
+
+        # when
+        actual = LoadBvhUsecase.stream_graph_data(file_name, chunk_size=50)
+
+        # then
+        self._assert_graph_data_equal(actual, expected)
+        # 読むだけなので、フレーム位置のインデックスをファイルの隣に残さない
+        assert os.listdir(tmp_path) == ["take.bvh"]
+
+    def test_incomplete_calculator(self):
+
+        # given
+        class UpdateOnlyCalculator(StreamingGraphDataCalculator):
+            def update(self, chunk: CoordinateData):
+                pass
+
+        # when, then
+        with pytest.raises(TypeError):
+            UpdateOnlyCalculator()
@@ -0,0 +1,42 @@
+import tkinter as tk
+
+import numpy as np
+import pytest
+
+from src.presenter.tk_canvas_skeleton_drawer import TkCanvasSkeletonDrawer
+from src.usecase.load_bvh_usecase import LoadBvhUsecase
+
+
+@pytest.fixture
+def canvas():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    canvas = tk.Canvas(root, width=400, height=300)
+    canvas.pack()
+    root.update()
+    yield canvas
+    root.destroy()
+
+
+class TestTkCanvasSkeletonDrawer:
+
+    def test_update_line_items_in_place(self, canvas):
+
+        # given
+        coordinate_data = LoadBvhUsecase().load("test/data/MCPM_20230410_150228.BVH").coordinate_data
+        drawer = TkCanvasSkeletonDrawer(canvas=canvas, coordinate_data=coordinate_data)
+        drawer.draw_local_pos_at_initial_frame()
+        items = canvas.find_all()
+
+        # when
+        frame = 10
+        drawer.draw_local_pos_at_specific_frame(frame=frame)
+
+        # then
+        assert canvas.find_all() == items
+        screen = drawer.camera.project(coordinate_data.local_pos[frame], canvas.winfo_width(), canvas.winfo_height())
+        parent_index, child_index = drawer.bone_indices[0]
+        np.testing.assert_allclose(canvas.coords(drawer.bone_items[0]),
+                                   np.r_[screen[parent_index], screen[child_index]], atol=1e-3)